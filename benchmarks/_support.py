@@ -0,0 +1,60 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Importing this module makes the repository root importable, so the scripts
+can be run directly: ``python benchmarks/<script>.py``.
+"""
+
+import asyncio
+import contextlib
+import socket
+import sys
+import time
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def free_port() -> int:
+    """Get a free TCP port on localhost."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def running_server(server):
+    """Run an AsyncServer in the background for the duration of the block."""
+    task = asyncio.create_task(server.up())
+    while not server._running:
+        await asyncio.sleep(0.01)
+    try:
+        yield server
+    finally:
+        await server.down()
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def report(title: str, rows: list[tuple[str, str]]) -> None:
+    """Print a small aligned result table."""
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f"  {name.ljust(width)}  {value}")
+
+
+class Timer:
+    """Context manager measuring elapsed wall time in seconds."""
+
+    def __enter__(self) -> 'Timer':
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.start
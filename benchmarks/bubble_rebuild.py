@@ -0,0 +1,77 @@
+"""
+Bubble rebuild: cost of rebuilding the message list of an open chat.
+
+Times building a MessageBubble for every message, as ChatView does on each
+set_messages, now that the text and time label are read from fields the
+Message computed once. For comparison it also times the per-bubble work the
+constructor used to repeat on every rebuild: joining the contents and
+parsing and formatting created_at.
+
+Usage:
+    python benchmarks/bubble_rebuild.py [messages] [rebuilds]
+"""
+
+import sys
+
+from datetime import datetime
+
+from _support import Timer, report
+
+from src.common.models import AccountMap, Message
+from src.messages.components import MessageBubble
+
+
+def make_messages(count: int) -> list[Message]:
+    return Message.from_dicts([
+        {
+            "message_id": i,
+            "chat_id": 1,
+            "sender_user": {"account_id": i % 2, "username": f"user{i % 2}", "display_name": f"User {i % 2}"},
+            "contents": [{"type": "text", "resource_name": "db", "content": f"message number {i}"}],
+            "created_at": f"2026-01-01T{i // 60 % 24:02d}:{i % 60:02d}:00",
+        }
+        for i in range(count)
+    ], AccountMap())
+
+
+def legacy_display(message: Message) -> tuple[str, str]:
+    parts = []
+    for chunk in message.contents:
+        if isinstance(chunk, dict):
+            if "text" in chunk:
+                parts.append(chunk["text"])
+            elif chunk.get("type") == "text":
+                parts.append(chunk.get("content", ""))
+        elif isinstance(chunk, str):
+            parts.append(chunk)
+    time_str = ""
+    if message.created_at:
+        try:
+            time_str = datetime.fromisoformat(str(message.created_at)).strftime("%H:%M")
+        except (ValueError, TypeError):
+            pass
+    return "".join(parts), time_str
+
+
+def main(count: int, rebuilds: int) -> None:
+    messages = make_messages(count)
+
+    with Timer() as bubbles:
+        for _ in range(rebuilds):
+            [MessageBubble(m, m.sender_user.account_id == 0) for m in messages]
+
+    with Timer() as legacy:
+        for _ in range(rebuilds):
+            [legacy_display(m) for m in messages]
+
+    report(f"Bubble rebuild ({count} messages, {rebuilds} rebuilds)", [
+        ("rebuild", f"{bubbles.elapsed / rebuilds * 1000:.2f} ms"),
+        ("removed per-rebuild work", f"{legacy.elapsed / rebuilds * 1000:.2f} ms"),
+    ])
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
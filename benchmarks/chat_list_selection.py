@@ -0,0 +1,61 @@
+"""
+Chat list selection: cost of moving the selection highlight in ChatListView.
+
+Compares rebuilding every tile on each click (what selection used to do)
+with the keyed path that restyles only the previous and the new tile, and
+times a full refresh with unchanged chats, which now reuses every tile.
+
+Usage:
+    python benchmarks/chat_list_selection.py [chats] [clicks]
+"""
+
+import sys
+
+from _support import Timer, report
+
+from src.chats.chat_list_view import ChatListView
+from src.common.models import Account, Chat
+
+
+def make_chats(count: int) -> list[Chat]:
+    accounts = [Account(account_id=i, username=f"user{i}", display_name=f"User {i}") for i in range(50)]
+    return [
+        Chat(chat_id=i, chat_name=f"Chat {i}", owner=accounts[i % 50], members=accounts[i % 47:i % 47 + 3])
+        for i in range(count)
+    ]
+
+
+def main(count: int, clicks: int) -> None:
+    chats = make_chats(count)
+    view = ChatListView(page=None, on_chat_selected=None, on_settings_click=None, on_new_chat=None)
+
+    with Timer() as build:
+        view.update_chats(chats)
+
+    with Timer() as rebuild:
+        for i in range(clicks):
+            view.selected_chat_id = chats[i * 7 % count].chat_id
+            view._tiles.clear()
+            view._tile_state.clear()
+            view.update_chats(view.chats)
+
+    with Timer() as keyed:
+        for i in range(clicks):
+            view.select_chat(chats[i * 7 % count].chat_id)
+
+    with Timer() as refresh:
+        view.update_chats(chats)
+
+    report(f"Chat list selection ({count:,} chats, {clicks} clicks)", [
+        ("initial build", f"{build.elapsed * 1000:.1f} ms"),
+        ("rebuild per click", f"{rebuild.elapsed / clicks * 1000:.2f} ms"),
+        ("keyed per click", f"{keyed.elapsed / clicks * 1000:.4f} ms"),
+        ("refresh, unchanged", f"{refresh.elapsed * 1000:.2f} ms"),
+    ])
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
@@ -0,0 +1,83 @@
+"""
+Connect storm: how fast the servers accept and tear down short-lived clients.
+
+Each client connects, performs the handshake, calls one transaction and
+disconnects. Reported rate is completed connections per second.
+
+Usage:
+    python benchmarks/connect_storm.py [connections] [concurrency]
+"""
+
+import asyncio
+import sys
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from _support import Timer, free_port, report, running_server
+
+from src.htcp import AsyncClient, AsyncServer, Client, Server
+
+
+async def async_storm(total: int, concurrency: int) -> float:
+    port = free_port()
+    server = AsyncServer(name="bench", host="127.0.0.1", port=port, max_connections=0)
+
+    @server.transaction(code="ping")
+    async def ping() -> str:
+        return "pong"
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_client() -> None:
+        async with semaphore:
+            async with AsyncClient(server_port=port) as client:
+                await client.call(transaction="ping")
+
+    async with running_server(server):
+        with Timer() as timer:
+            await asyncio.gather(*(one_client() for _ in range(total)))
+
+    return total / timer.elapsed
+
+
+def sync_storm(total: int, concurrency: int) -> float:
+    port = free_port()
+    server = Server(name="bench", host="127.0.0.1", port=port, max_connections=0)
+
+    @server.transaction(code="ping")
+    def ping() -> str:
+        return "pong"
+
+    threading.Thread(target=server.up, daemon=True).start()
+    while not server._running:
+        threading.Event().wait(0.01)
+
+    def one_client(_) -> None:
+        with Client(server_port=port) as client:
+            client.call(transaction="ping")
+
+    try:
+        with Timer() as timer, ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one_client, range(total)))
+    finally:
+        server.down()
+
+    return total / timer.elapsed
+
+
+def main(total: int, concurrency: int) -> None:
+    async_rate = asyncio.run(async_storm(total, concurrency))
+    sync_rate = sync_storm(total, concurrency)
+
+    report(f"Connect storm ({total} connections, concurrency {concurrency})", [
+        ("AsyncServer", f"{async_rate:,.0f} conn/s"),
+        ("Server", f"{sync_rate:,.0f} conn/s"),
+    ])
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 64,
+    )
@@ -0,0 +1,62 @@
+"""
+Import time: cold import cost of the client app, from ``python -X importtime``.
+
+Each run imports the module in a fresh interpreter. Reported times are the
+median over the runs: the module's cumulative import time, the share spent
+in src.htcp, and the modules with the largest self time.
+
+Usage:
+    python benchmarks/import_time.py [module] [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+
+from _support import ROOT, report
+
+TOP_MODULES = 10
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Import a module in a fresh interpreter; map each imported module to (self, cumulative) microseconds."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"importing {module} failed: {proc.stderr.strip().splitlines()[-1]}")
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main(module: str, runs: int) -> None:
+    samples = [import_times(module) for _ in range(runs)]
+
+    def median(name: str, index: int) -> float:
+        return statistics.median(s.get(name, (0, 0))[index] for s in samples)
+
+    htcp = [sum(t[0] for n, t in s.items() if n.startswith("src.htcp")) for s in samples]
+    names = set().union(*samples)
+    slowest = sorted(names, key=lambda n: median(n, 0), reverse=True)[:TOP_MODULES]
+    htcp_modules = len([n for n in samples[0] if n.startswith("src.htcp")])
+
+    rows = [
+        (module, f"{median(module, 1) / 1000:.1f} ms cumulative"),
+        ("src.htcp (self)", f"{statistics.median(htcp) / 1000:.1f} ms in {htcp_modules} modules"),
+    ]
+    rows += [(name, f"{median(name, 0) / 1000:.1f} ms self") for name in slowest]
+    report(f"Import time ({runs} runs, median)", rows)
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "src.app",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
@@ -0,0 +1,124 @@
+"""
+Model memory: memory and decode time for a large batch of loaded messages.
+
+Decodes message dicts shaped like get_messages results, with a handful of
+senders repeating across the batch, into the current slotted models and
+into a copy of the previous dict-backed models that built a fresh Account
+per message. Memory is what the decoded objects keep alive, measured with
+tracemalloc; the input dicts are not counted. Decode time is taken from a
+separate untraced run, since tracing slows allocation-heavy code unevenly.
+
+Usage:
+    python benchmarks/model_memory.py [messages] [senders]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from _support import Timer, report
+
+from src.common.models import AccountMap, Message
+
+
+@dataclass
+class LegacyAccount:
+    account_id: int
+    username: str
+    display_name: str
+    last_online_at: Optional[str] = None
+    in_online: bool = False
+    created_at: Optional[str] = None
+
+
+@dataclass
+class LegacyMessage:
+    message_id: int
+    chat_id: int
+    sender_user: Optional[LegacyAccount] = None
+    is_read: bool = False
+    tags: list = field(default_factory=list)
+    contents: list = field(default_factory=list)
+    created_at: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "LegacyMessage":
+        s = d.get("sender_user")
+        sender = LegacyAccount(
+            account_id=s.get("account_id", 0),
+            username=s.get("username", ""),
+            display_name=s.get("display_name", ""),
+            last_online_at=s.get("last_online_at"),
+            in_online=s.get("in_online", False),
+            created_at=s.get("created_at"),
+        ) if s else None
+        return cls(
+            message_id=d.get("message_id", 0),
+            chat_id=d.get("chat_id", 0),
+            sender_user=sender,
+            is_read=d.get("is_read", False),
+            tags=[],
+            contents=d.get("contents", []),
+            created_at=d.get("created_at"),
+        )
+
+
+def make_dicts(count: int, senders: int) -> list[dict]:
+    # Decoded JSON/wire data: every message carries its own copy of the sender
+    return [
+        {
+            "message_id": i,
+            "chat_id": i % 50,
+            "sender_user": {
+                "account_id": i % senders,
+                "username": f"user{i % senders}",
+                "display_name": f"User {i % senders}",
+                "last_online_at": "2026-01-01T00:00:00",
+                "in_online": False,
+                "created_at": "2025-01-01T00:00:00",
+            },
+            "is_read": True,
+            "tags": [],
+            "contents": [{"type": "text", "resource_name": "db", "content": f"message {i}"}],
+            "created_at": "2026-01-01T00:00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(decode, dicts: list[dict]) -> tuple[int, float]:
+    gc.collect()
+    with Timer() as timer:
+        decoded = decode(dicts)
+    del decoded
+
+    gc.collect()
+    tracemalloc.start()
+    decoded = decode(dicts)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del decoded
+    return size, timer.elapsed
+
+
+def main(count: int, senders: int) -> None:
+    dicts = make_dicts(count, senders)
+
+    legacy_size, legacy_time = measure(lambda items: [LegacyMessage.from_dict(d) for d in items], dicts)
+    slotted_size, slotted_time = measure(lambda items: Message.from_dicts(items, AccountMap()), dicts)
+
+    report(f"Model memory ({count:,} messages, {senders} senders)", [
+        ("dict models", f"{legacy_size / 2**20:.1f} MiB, {legacy_time * 1000:.0f} ms"),
+        ("slotted models", f"{slotted_size / 2**20:.1f} MiB, {slotted_time * 1000:.0f} ms"),
+        ("saved", f"{(1 - slotted_size / legacy_size) * 100:.0f}%"),
+    ])
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
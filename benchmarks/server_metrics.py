@@ -0,0 +1,67 @@
+"""
+Server metrics: what recording a transaction costs next to serving it.
+
+Times ServerMetrics.record_transaction on its own, then a client calling a
+trivial transaction on an AsyncServer back to back, and reports the
+recording cost as a share of a round trip.
+
+Usage:
+    python benchmarks/server_metrics.py [calls] [records]
+"""
+
+import asyncio
+import sys
+import time
+
+from _support import Timer, free_port, report, running_server
+
+from src.htcp import AsyncClient, AsyncServer
+from src.htcp.server import ServerMetrics
+
+
+def record_cost(records: int) -> float:
+    metrics = ServerMetrics()
+    start = time.perf_counter()
+    marks = [start, start + 2e-6, start + 5e-6, start + 40e-6, start + 44e-6, start + 60e-6]
+    with Timer() as timer:
+        for _ in range(records):
+            metrics.record_transaction("ping", marks, 120, 80)
+    return timer.elapsed / records
+
+
+async def round_trip(calls: int) -> tuple[float, dict]:
+    port = free_port()
+    server = AsyncServer(name="bench", host="127.0.0.1", port=port)
+
+    @server.transaction(code="ping")
+    async def ping() -> str:
+        return "pong"
+
+    async with running_server(server):
+        async with AsyncClient(server_port=port) as client:
+            with Timer() as timer:
+                for _ in range(calls):
+                    await client.call(transaction="ping")
+        stats = server.stats()["transactions"]["ping"]
+
+    return timer.elapsed / calls, stats
+
+
+def main(calls: int, records: int) -> None:
+    record = record_cost(records)
+    rtt, stats = asyncio.run(round_trip(calls))
+
+    phases = stats["phases"]
+    report(f"Server metrics ({calls:,} calls, {records:,} records)", [
+        ("record_transaction", f"{record * 1e6:.2f} us"),
+        ("round trip", f"{rtt * 1e6:.1f} us"),
+        ("overhead", f"{record / rtt:.2%} of a call"),
+        *((f"  {name} mean", f"{phases[name]['mean'] * 1e6:.1f} us") for name in phases),
+    ])
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100000,
+    )
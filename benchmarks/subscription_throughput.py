@@ -0,0 +1,52 @@
+"""
+Subscription throughput: sync generators vs async generators on AsyncServer.
+
+Usage:
+    python benchmarks/subscription_throughput.py [events]
+"""
+
+import asyncio
+import sys
+
+from _support import Timer, free_port, report, running_server
+
+from src.htcp import AsyncClient, AsyncServer
+
+
+async def consume(port: int, event_type: str, count: int) -> float:
+    async with AsyncClient(server_port=port) as client:
+        with Timer() as timer:
+            received = 0
+            async with client.subscribe(event_type=event_type, count=count) as sub:
+                async for _ in sub:
+                    received += 1
+        assert received == count, f"{event_type}: got {received}/{count}"
+    return count / timer.elapsed
+
+
+async def main(count: int) -> None:
+    port = free_port()
+    server = AsyncServer(name="bench", host="127.0.0.1", port=port)
+
+    @server.subscription(event_type="sync_events")
+    def sync_events(count: int):
+        for i in range(count):
+            yield {"seq": i, "payload": "x" * 32}
+
+    @server.subscription(event_type="async_events")
+    async def async_events(count: int):
+        for i in range(count):
+            yield {"seq": i, "payload": "x" * 32}
+
+    async with running_server(server):
+        sync_rate = await consume(port, "sync_events", count)
+        async_rate = await consume(port, "async_events", count)
+
+    report(f"Subscription throughput ({count} events)", [
+        ("sync generator", f"{sync_rate:,.0f} events/s"),
+        ("async generator", f"{async_rate:,.0f} events/s"),
+    ])
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
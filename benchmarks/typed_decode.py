@@ -0,0 +1,59 @@
+"""
+Typed decode: time to turn a get_messages result packet into Messages.
+
+Builds the TRANSACTION_RESULT packet a server sends for a history page and
+decodes it the generic way (deserialize to dicts, then Result.from_raw and
+Message.from_dicts) and through ApiService's compiled MESSAGE_PAGE decoder,
+which builds the Messages while reading the packet.
+
+Usage:
+    python benchmarks/typed_decode.py [page_size] [rounds]
+"""
+
+import sys
+
+from _support import Timer, report
+
+from src.htcp.common import TransactionResult
+from src.common.models import Message, Result
+from src.services.api import MESSAGE_PAGE
+
+from model_memory import make_dicts
+
+
+def make_packet(page_size: int):
+    page = {"success": True, "errors": [], "data": make_dicts(page_size, 20)}
+    return TransactionResult(success=True, result=page).to_packet()
+
+
+def decode_generic(packet) -> list[Message]:
+    raw = TransactionResult.from_packet(packet).result
+    return Message.from_dicts(Result.from_raw(raw).data)
+
+
+def decode_typed(packet) -> list[Message]:
+    return TransactionResult.from_packet(packet, MESSAGE_PAGE).result.data
+
+
+def main(page_size: int, rounds: int) -> None:
+    packet = make_packet(page_size)
+    assert decode_generic(packet) == decode_typed(packet)
+
+    rows = []
+    for name, decode in (("dicts + from_dicts", decode_generic), ("typed decoder", decode_typed)):
+        with Timer() as timer:
+            for _ in range(rounds):
+                decode(packet)
+        rows.append((name, timer.elapsed / rounds * 1000))
+
+    report(f"Typed decode ({page_size} messages per page, {len(packet.payload):,} bytes)", [
+        *((name, f"{ms:.3f} ms per page") for name, ms in rows),
+        ("speedup", f"{rows[0][1] / rows[1][1]:.2f}x"),
+    ])
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
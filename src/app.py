@@ -1,12 +1,25 @@
 import asyncio
+import dataclasses
 import logging
+import sqlite3
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
 from typing import Optional
 
 import flet as ft
 
-from src.services.api import ApiService, detect_agent
+from src.services.api import QUEUED, ApiService, detect_agent, text_contents
 from src.services.storage import StorageService
+from src.services.message_store import (
+    HISTORY_PAGE_SIZE, MessageStore, default_store_path, refresh_message, sync_messages,
+)
+from src.services.outbox import OP_DELETE, OP_EDIT, OP_SEND
+from src.services.search import UserSearch
+from src.common.entities import EntityStore
 from src.common.models import Account, Chat, Message, Result
+from src.common.updates import UpdateScheduler
 from src.auth.view import AuthView
 from src.chats.chat_list_view import ChatListView
 from src.chats.chat_view import ChatView
@@ -16,14 +29,25 @@ logger = logging.getLogger("ghosty.app")
 
 BREAKPOINT_WIDTH = 768
 RECONNECT_INTERVAL = 5
+# verify_token keepalive for servers without protocol PING support
 KEEPALIVE_INTERVAL = 45
+EVENT_BATCH_LIMIT = 500
+MAX_USER_SUGGESTIONS = 5
 
 
 class Application:
     def __init__(self, page: ft.Page):
         self.page = page
+        self._ui = UpdateScheduler(page)
         self.api = ApiService()
         self.storage = StorageService()
+        self.store: Optional[MessageStore] = None
+        # Writes of the last closed store still going to disk, awaited before it is reopened
+        self._store_closing: Optional[Future] = None
+        self.entities = EntityStore()
+        self.entities.on_account_changed(self._on_account_changed)
+        self.entities.on_chat_changed(self._on_chat_changed)
+        self.user_search = UserSearch(self.api, self.entities.accounts)
 
         self._current_user_id: int = 0
         self._current_username: str = ""
@@ -32,6 +56,11 @@ class Application:
         self._is_wide: bool = True
         self._screen: str = "auth"
         self._connection_task: Optional[asyncio.Task] = None
+        # A token restored while the server was unreachable, checked once it is back
+        self._session_unverified = False
+        # Messages sent but not yet confirmed by the server, by nonce
+        self._outgoing: dict[str, Message] = {}
+        self._startup_phases: list[tuple[str, float]] = []
 
         self._auth_view: Optional[AuthView] = None
         self._chat_list_view: Optional[ChatListView] = None
@@ -39,12 +68,15 @@ class Application:
         self._settings_view: Optional[SettingsView] = None
 
     async def start(self):
+        self._mark_phase("start")
         self.page.title = "GHosty"
         self.page.theme = ft.Theme(color_scheme_seed=ft.Colors.BLUE)
         self.page.dark_theme = ft.Theme(color_scheme_seed=ft.Colors.BLUE)
         self.page.padding = 0
         self.page.spacing = 0
 
+        await self.storage.load()
+        self._mark_phase("prefs")
         theme_mode = await self.storage.get_theme_mode()
         self.page.theme_mode = ft.ThemeMode.DARK if theme_mode == "dark" else ft.ThemeMode.LIGHT
 
@@ -60,25 +92,69 @@ class Application:
         self._is_wide = (self.page.width or 900) >= BREAKPOINT_WIDTH
 
         token = await self.storage.get_token()
-        if token:
-            host, port = await self.storage.get_server_address()
-            try:
-                await self.api.connect(host, port)
-                self.api.set_token(token)
-                verify = await self.api.verify_token()
-                if verify.success and verify.data:
-                    user_info = await self.storage.get_user_info()
-                    self._current_user_id = int(user_info.get("user_id") or 0)
-                    self._current_username = user_info.get("username") or ""
-                    self._current_display_name = user_info.get("display_name") or ""
-                    await self._show_main_screen()
-                    return
-            except Exception as e:
-                logger.warning(f"Session restore failed: {e}")
+        if token and await self._restore_session(token):
+            return
+
+        await self._show_auth_screen()
+        self._mark_phase("first_frame")
+        self._log_startup()
+
+    async def _restore_session(self, token: str) -> bool:
+        host, port = await self.storage.get_server_address()
+        # Handshake while the cached main screen is being built
+        connect_task = asyncio.create_task(self.api.connect(host, port))
+        self.api.set_token(token)
+
+        user_info = await self.storage.get_user_info()
+        self._current_user_id = int(user_info.get("user_id") or 0)
+        self._current_username = user_info.get("username") or ""
+        self._current_display_name = user_info.get("display_name") or ""
+        await self._show_main_screen(host, port, load_chats=False)
+        self._mark_phase("first_frame")
+
+        verify = chats = None
+        try:
+            await connect_task
+            self._mark_phase("connect")
+            verify, chats = await asyncio.gather(self.api.verify_token(), self.api.get_my_chats())
+            self._mark_phase("verify")
+        except Exception as e:
+            logger.warning(f"Server unreachable at startup, staying on the cached session: {e}")
+
+        if verify is not None and self.api.token_rejected(verify):
+            self._close_store()
             await self.storage.clear_token()
             self.api.clear_token()
+            return False
 
-        await self._show_auth_screen()
+        if verify is not None and verify.success:
+            self._apply_chats(chats)
+            self._ui.update()
+        else:
+            # Offline start: keep the cache on screen, the connection loop verifies later
+            self._session_unverified = True
+        self._start_connection()
+        self._log_startup()
+        return True
+
+    def _mark_phase(self, name: str):
+        self._startup_phases.append((name, time.perf_counter()))
+
+    def _log_startup(self):
+        if len(self._startup_phases) < 2:
+            return
+        started = self._startup_phases[0][1]
+        previous = started
+        parts = []
+        for name, at in self._startup_phases[1:]:
+            parts.append(f"{name}={(at - previous) * 1000:.1f}ms")
+            previous = at
+        total = (previous - started) * 1000
+        first_frame = next(at for name, at in self._startup_phases if name == "first_frame")
+        logger.info(
+            f"Startup: {', '.join(parts)} (first frame {(first_frame - started) * 1000:.1f}ms, total {total:.1f}ms)"
+        )
+        self._startup_phases.clear()
 
     # --- Screen transitions ---
 
@@ -90,9 +166,10 @@ class Application:
         self._auth_view.set_server_address(host, port)
         self._render()
 
-    async def _show_main_screen(self):
+    async def _show_main_screen(self, host: str = None, port: int = None, load_chats: bool = True):
         self._screen = "main"
         self._current_chat = None
+        await self._open_store(host, port)
         self._chat_list_view = ChatListView(
             page=self.page,
             on_chat_selected=self._on_chat_selected,
@@ -108,6 +185,10 @@ class Application:
             current_user_id=self._current_user_id,
         )
         self._render()
+        if not load_chats:
+            await self._show_cached_chats()
+            self._ui.flush()
+            return
         await self._load_chats()
         self._start_connection()
 
@@ -129,7 +210,7 @@ class Application:
         if result.success and result.data:
             if isinstance(result.data, list):
                 self._settings_view.set_sessions(result.data)
-                self.page.update()
+                self._ui.update()
 
     async def _back_from_settings(self):
         await self._show_main_screen()
@@ -148,6 +229,83 @@ class Application:
     async def _settings_back_click(self, e):
         await self._back_from_settings()
 
+    # --- Local store ---
+
+    async def _open_store(self, host: str = None, port: int = None):
+        if self.store is not None:
+            return
+        if host is None:
+            client = self.api.get_client()
+            if client is None:
+                return
+            host, port = client.server_host, client.server_port
+        if not self._current_user_id:
+            return
+        if self._store_closing is not None:
+            await asyncio.wrap_future(self._store_closing)
+            self._store_closing = None
+        try:
+            path = default_store_path(host, port, self._current_user_id)
+            self.store = MessageStore(path)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Local message store unavailable: {e}")
+            return
+        await self.api.outbox.attach(self.store)
+        self._restore_outgoing()
+
+    def _close_store(self, clear: bool = False):
+        if clear:
+            self.api.outbox.clear()
+        self.api.outbox.detach()
+        if self.store is None:
+            return
+        if clear:
+            self.store.clear()
+        # Closes on the store's thread once the writes queued before it are done
+        self._store_closing = self.store.close()
+        self.store = None
+
+    async def _stored_messages(self, chat_id: int) -> list[Message]:
+        if not self.store:
+            return []
+        return self._with_queued_changes(chat_id, Message.from_dicts(await self.store.get_messages(chat_id)))
+
+    async def _fetch_messages(self, chat_id: int) -> Optional[list[Message]]:
+        if self.store:
+            if not await sync_messages(self.api, self.store, chat_id):
+                return None
+            return await self._stored_messages(chat_id)
+        result = await self.api.get_messages(chat_id, limit=50)
+        if not result.success:
+            return None
+        msgs = list(result.data or [])
+        msgs.sort(key=lambda m: m.message_id)
+        return self._with_queued_changes(chat_id, msgs)
+
+    def _with_queued_changes(self, chat_id: int, messages: list[Message]) -> list[Message]:
+        """Show edits and deletes still waiting in the outbox, as the server will apply them."""
+        edits: dict[int, list] = {}
+        deleted: set[int] = set()
+        for op in self.api.outbox.ops():
+            if op.chat_id != chat_id:
+                continue
+            if op.op == OP_EDIT:
+                edits[op.args["message_id"]] = op.args["new_contents"]
+            elif op.op == OP_DELETE:
+                deleted.add(op.args["message_id"])
+        if not edits and not deleted:
+            return messages
+        return [
+            dataclasses.replace(m, contents=edits[m.message_id]) if m.message_id in edits else m
+            for m in messages
+            if m.message_id not in deleted
+        ]
+
+    async def _show_queued_change(self, chat_id: int):
+        """Redraw the open chat from the store after an edit or delete was queued offline."""
+        if self.store and self._is_current(chat_id):
+            self._chat_view.set_messages(await self._stored_messages(chat_id))
+
     # --- Connection loop + Subscription ---
 
     def _start_connection(self):
@@ -169,24 +327,68 @@ class Application:
                         await asyncio.sleep(RECONNECT_INTERVAL)
                         continue
                     logger.info("Reconnected successfully")
+                    if not await self._check_session():
+                        return
+                    await self._flush_outbox()
                     await self._on_reconnected()
-
-                keepalive = asyncio.create_task(self._keepalive_loop())
+                elif self._session_unverified:
+                    # Connected at startup, but the token could not be checked then
+                    if not await self._check_session():
+                        return
+                    if not self._session_unverified:
+                        await self._flush_outbox()
+                        await self._on_reconnected()
+                elif len(self.api.outbox):
+                    await self._flush_outbox()
+
+                keepalive = None if self.api.has_heartbeat else asyncio.create_task(self._keepalive_loop())
                 try:
                     await self._run_subscription()
                 except Exception as e:
                     logger.warning(f"Subscription ended: {e}")
                     await asyncio.sleep(RECONNECT_INTERVAL)
                 finally:
-                    keepalive.cancel()
-                    try:
-                        await keepalive
-                    except asyncio.CancelledError:
-                        pass
+                    if keepalive is not None:
+                        keepalive.cancel()
+                        try:
+                            await keepalive
+                        except asyncio.CancelledError:
+                            pass
 
         except asyncio.CancelledError:
             pass
 
+    async def _check_session(self) -> bool:
+        """
+        Verify a token restored while offline. Returns False if the server
+        rejected it and the user was sent back to the login screen.
+        """
+        if not self._session_unverified:
+            return True
+        result = await self.api.verify_token()
+        if self.api.token_rejected(result):
+            logger.info("Saved session rejected by the server")
+            await self._expire_session()
+            return False
+        if result.success:
+            self._session_unverified = False
+        return True
+
+    async def _expire_session(self):
+        """Back to the login screen; unlike logout, the local store stays on disk."""
+        # Called from the connection loop, which returns right after
+        self._connection_task = None
+        self._session_unverified = False
+        self._close_store()
+        self.entities.clear()
+        self.user_search.clear()
+        self._outgoing.clear()
+        await self.storage.clear_token()
+        self.api.clear_token()
+        await self.api.disconnect()
+        self._current_chat = None
+        await self._show_auth_screen()
+
     async def _keepalive_loop(self):
         try:
             while True:
@@ -205,81 +407,157 @@ class Application:
             await asyncio.sleep(RECONNECT_INTERVAL)
             return
 
-        sub_client = await self.api.create_subscription_client()
-        if not sub_client:
+        client = self.api.get_client()
+        if not client or not client.connected:
             await asyncio.sleep(RECONNECT_INTERVAL)
             return
 
-        try:
-            async with sub_client.subscribe(event_type="subscribe", token=token) as sub:
-                async for event in sub:
-                    try:
-                        await self._handle_event(event)
-                    except Exception as e:
-                        logger.error(f"Event handler error: {e}", exc_info=True)
-        finally:
-            try:
-                await sub_client.disconnect()
-            except Exception:
-                pass
-
-    async def _handle_event(self, event):
-        if not isinstance(event, dict):
+        async with client.subscribe(event_type="subscribe", token=token) as sub:
+            async for event in sub:
+                # Whatever piled up while the last batch was applied is handled together
+                events = [event, *sub.drain(EVENT_BATCH_LIMIT)]
+                try:
+                    with self._ui.batch():
+                        await self._handle_events(events)
+                except Exception as e:
+                    logger.error(f"Event handler error: {e}", exc_info=True)
+
+    async def _handle_events(self, events: list):
+        new_messages: dict[int, int] = {}
+        changed_chats: set[int] = set()
+        presence: dict[int, bool] = {}
+        membership: dict[int, tuple[str, dict]] = {}
+        echoed: dict[int, int] = {}
+        # Edited stored messages whose event does not carry the new contents
+        stale: set[tuple[int, int]] = set()
+
+        # Collapse: per chat and per type, only what the last event implies
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            event_type = event.get("type", "")
+            data = event.get("data", {})
+            if not isinstance(data, dict):
+                data = {}
+            chat_id = data.get("chat_id")
+
+            if event_type == "new_message" and chat_id is not None:
+                # Re-inserted so the most recently active chat ends up last
+                new_messages[chat_id] = new_messages.pop(chat_id, 0) + 1
+                sent = data.get("message") if isinstance(data.get("message"), dict) else data
+                echo = self._match_outgoing(chat_id, sent) if "message_id" in sent else None
+                if echo is not None:
+                    self._confirm_outgoing(echo, sent)
+                    echoed[chat_id] = echoed.get(chat_id, 0) + 1
+            elif event_type == "message_deleted":
+                if self.store and data.get("message_id") is not None:
+                    self.store.delete_message(chat_id, data["message_id"])
+                changed_chats.add(chat_id)
+            elif event_type == "message_edited":
+                if self.store and data.get("message_id") is not None and not self._store_edit(chat_id, data):
+                    stale.add((chat_id, data["message_id"]))
+                changed_chats.add(chat_id)
+            elif event_type == "user_online" or event_type == "user_offline":
+                presence[data.get("user_id")] = event_type == "user_online"
+            elif event_type in ("chat_created", "member_added", "member_removed") and chat_id is not None:
+                membership[chat_id] = (event_type, data)
+
+        for user_id, is_online in presence.items():
+            self.entities.set_online(user_id, is_online)
+
+        # Before the reload below reads them back from the store
+        for result in await asyncio.gather(
+            *(refresh_message(self.api, self.store, c, m) for c, m in stale), return_exceptions=True
+        ):
+            if isinstance(result, Exception):
+                logger.error(f"Message refresh failed: {result}", exc_info=result)
+
+        in_list = self._screen == "main" and self._chat_list_view is not None
+        refresh: set[int] = set()
+        if in_list:
+            for chat_id, (event_type, data) in membership.items():
+                if not self._apply_membership_event(event_type, data):
+                    refresh.add(chat_id)
+            # First message in a chat we have not seen yet
+            refresh.update(c for c in new_messages if not self._chat_list_view.has_chat(c))
+
+        # One refresh per affected resource, independent ones concurrently
+        jobs = [self._refresh_chat(chat_id) for chat_id in refresh]
+        current_id = self._current_chat.chat_id if self._current_chat else None
+        unseen = new_messages.get(current_id, 0) - echoed.get(current_id, 0)
+        if current_id is not None and (unseen > 0 or current_id in changed_chats):
+            jobs.append(self._reload_current_messages())
+        for result in await asyncio.gather(*jobs, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Event refresh failed: {result}", exc_info=result)
+
+        if in_list:
+            for chat_id, count in new_messages.items():
+                self._chat_list_view.move_to_top(chat_id)
+                if chat_id != current_id and count > echoed.get(chat_id, 0):
+                    self._chat_list_view.add_unread(chat_id, count - echoed.get(chat_id, 0))
+        self._ui.update()
+
+    def _store_edit(self, chat_id: int, data: dict) -> bool:
+        """Write an edit event into the store; False if it carries neither the message nor its contents."""
+        message = data.get("message")
+        if isinstance(message, dict) and "message_id" in message:
+            self.store.put_messages(chat_id, [message])
+            return True
+        contents = data.get("new_contents", data.get("contents"))
+        if isinstance(contents, list):
+            self.store.edit_message(chat_id, data["message_id"], contents)
+            return True
+        return False
+
+    def _store_change(self, op: str, chat_id: Optional[int], args: dict):
+        """
+        Write a confirmed edit or delete into the store. A sync only re-reads
+        the newest page, so older messages would otherwise keep their old text
+        or come back after being deleted.
+        """
+        if not self.store or chat_id is None:
             return
-        event_type = event.get("type", "")
-        data = event.get("data", {})
-        if not isinstance(data, dict):
-            data = {}
-
-        if event_type == "new_message":
-            await self._on_new_message_event(data)
-        elif event_type == "message_edited" or event_type == "message_deleted":
-            await self._on_message_changed_event(data)
-        elif event_type == "user_online":
-            await self._on_user_status_event(data, True)
-        elif event_type == "user_offline":
-            await self._on_user_status_event(data, False)
-        elif event_type in ("chat_created", "member_added", "member_removed"):
-            await self._on_chat_list_changed()
-
-    async def _on_new_message_event(self, data: dict):
-        chat_id = data.get("chat_id")
-
-        if self._current_chat and self._current_chat.chat_id == chat_id:
-            await self._reload_current_messages()
+        if op == OP_EDIT:
+            self.store.edit_message(chat_id, args["message_id"], args["new_contents"])
+        elif op == OP_DELETE:
+            self.store.delete_message(chat_id, args["message_id"])
 
-        if self._screen == "main":
-            await self._load_chats()
-
-    async def _on_message_changed_event(self, data: dict):
+    def _apply_membership_event(self, event_type: str, data: dict) -> bool:
+        """Apply a membership event from its payload; False if the chat must be fetched."""
         chat_id = data.get("chat_id")
+        removed_id = data.get("user_id", data.get("target_user_id"))
+        if event_type == "member_removed" and removed_id == self._current_user_id:
+            self._remove_chat(chat_id)
+        elif isinstance(data.get("chat"), dict):
+            self._chat_list_view.upsert_chat(self.entities.put_chat(data["chat"]))
+        elif "chat_name" in data and "members" in data:
+            self._chat_list_view.upsert_chat(self.entities.put_chat(data))
+        else:
+            return False
+        return True
+
+    async def _refresh_chat(self, chat_id: int):
+        result = await self.api.get_chat_info(chat_id)
+        if result.success and isinstance(result.data, dict):
+            self._chat_list_view.upsert_chat(self.entities.put_chat(result.data))
+        elif result.errors and result.errors[0][0] not in ("connection", "exception", "auth"):
+            # The server refused it: we are no longer a member
+            self._remove_chat(chat_id)
+
+    def _remove_chat(self, chat_id: int):
+        self.entities.remove_chat(chat_id)
+        self._chat_list_view.remove_chat(chat_id)
         if self._current_chat and self._current_chat.chat_id == chat_id:
-            await self._reload_current_messages()
-
-    async def _on_user_status_event(self, data: dict, is_online: bool):
-        user_id = data.get("user_id")
-        if self._current_chat:
-            for member in self._current_chat.members:
-                if member.account_id == user_id:
-                    member.in_online = is_online
-                    self._update_peer_status()
-                    self.page.update()
-                    break
-
-    async def _on_chat_list_changed(self):
-        if self._screen == "main":
-            await self._load_chats()
+            self._on_chat_back()
 
     async def _reload_current_messages(self):
         if not self._current_chat or not self._chat_view:
             return
-        result = await self.api.get_messages(self._current_chat.chat_id, limit=50)
-        if result.success:
-            raw = result.data or []
-            msgs = [Message.from_dict(m) if isinstance(m, dict) else m for m in raw]
-            msgs.sort(key=lambda m: m.message_id)
+        msgs = await self._fetch_messages(self._current_chat.chat_id)
+        if msgs is not None:
             self._chat_view.set_messages(msgs)
-            self.page.update()
+            self._ui.update()
 
     async def _on_reconnected(self):
         if self._screen == "main":
@@ -287,10 +565,27 @@ class Application:
             if self._current_chat:
                 result = await self.api.get_chat_info(self._current_chat.chat_id)
                 if result.success and result.data:
-                    self._current_chat = Chat.from_dict(result.data) if isinstance(result.data, dict) else result.data
+                    self._current_chat = self._put_chat(result.data)
                 self._update_peer_status()
                 await self._reload_current_messages()
-            self.page.update()
+            self._ui.update()
+
+    # --- Entity changes ---
+
+    def _put_chat(self, data) -> Chat:
+        return self.entities.put_chat(data) if isinstance(data, dict) else data
+
+    def _on_account_changed(self, account: Account):
+        if self._current_chat and any(m is account for m in self._current_chat.members):
+            self._update_peer_status()
+            self._ui.update()
+
+    def _on_chat_changed(self, chat: Chat):
+        if self._chat_list_view:
+            self._chat_list_view.refresh_chat(chat)
+        if self._chat_view and self._current_chat is chat:
+            self._chat_view._header_title.value = chat.chat_name
+        self._ui.update()
 
     # --- Peer status ---
 
@@ -348,7 +643,7 @@ class Application:
                 self._settings_view.build(is_narrow=not self._is_wide)
             )
 
-        self.page.update()
+        self._ui.flush()
 
     def _update_chat_selection(self):
         is_narrow = not self._is_wide
@@ -357,7 +652,7 @@ class Application:
             has_chat = self._current_chat is not None
             self._chat_list_view.build().visible = not has_chat
             self._chat_view._root.visible = has_chat
-        self.page.update()
+        self._ui.update()
 
     def _on_resize(self, e):
         was_wide = self._is_wide
@@ -401,9 +696,10 @@ class Application:
         self._current_username = account_username
         self._current_display_name = account_display_name
 
-        await self.storage.set_token(token_str)
+        # Queued first so the token's awaited flush writes them in the same batch
         await self.storage.set_server_address(host, port)
         await self.storage.save_user_info(account_username, account_display_name, account_id)
+        await self.storage.set_token(token_str)
 
         await self._show_main_screen()
 
@@ -412,34 +708,52 @@ class Application:
     async def _load_chats(self):
         if not self._chat_list_view:
             return
-        self._chat_list_view.set_loading(True)
-        self.page.update()
+        await self._show_cached_chats()
+        self._ui.update()
 
         result = await self.api.get_my_chats()
+        self._apply_chats(result)
+        self._ui.update()
+
+    async def _show_cached_chats(self):
+        cached = await self.store.get_chats() if self.store and not self._chat_list_view.chats else []
+        if cached:
+            # Render from disk right away, then refresh from the server
+            self._chat_list_view.update_chats(self.entities.put_chats(cached, presence=False))
+        else:
+            self._chat_list_view.set_loading(True)
 
+    def _apply_chats(self, result: Result):
+        if not self._chat_list_view:
+            return
         self._chat_list_view.set_loading(False)
         if result.success and result.data:
-            chats = [Chat.from_dict(c) if isinstance(c, dict) else c for c in result.data]
+            if self.store:
+                self.store.put_chats([c for c in result.data if isinstance(c, dict)])
+            chats = self.entities.put_chats(result.data)
             self._chat_list_view.update_chats(chats)
-        self.page.update()
 
     async def _on_chat_selected(self, chat: Chat):
         try:
             self._current_chat = chat
             self._chat_view.set_chat(chat)
+            for message in self._outgoing.values():
+                if message.chat_id == chat.chat_id:
+                    self._chat_view.show_pending(message)
+            stored = await self._stored_messages(chat.chat_id)
+            if stored:
+                self._chat_view.set_messages(stored)
             self._update_chat_selection()
 
-            result = await self.api.get_messages(chat.chat_id, limit=50)
-            if result.success and result.data:
-                msgs = [Message.from_dict(m) if isinstance(m, dict) else m for m in result.data]
-                msgs.sort(key=lambda m: m.message_id)
+            msgs = await self._fetch_messages(chat.chat_id)
+            if msgs:
                 self._chat_view.set_messages(msgs)
 
             result = await self.api.get_chat_info(chat.chat_id)
             if result.success and result.data:
-                self._current_chat = Chat.from_dict(result.data) if isinstance(result.data, dict) else result.data
+                self._current_chat = self._put_chat(result.data)
             self._update_peer_status()
-            self.page.update()
+            self._ui.update()
         except Exception as e:
             logger.error(f"Chat selection failed: {e}", exc_info=True)
             self._show_error(f"Failed to open chat: {e}")
@@ -447,14 +761,16 @@ class Application:
     async def _on_new_chat(self):
         name_field = ft.TextField(label="Chat name", autofocus=True)
         members_field = ft.TextField(label="Members (usernames, comma-separated)")
+        suggestions = self._user_suggestions(members_field, multiple=True)
         error_text = ft.Text("", color=ft.Colors.RED, visible=False, size=13)
 
         async def create(e):
+            self.user_search.cancel()
             chat_name = name_field.value.strip()
             if not chat_name:
                 error_text.value = "Chat name is required"
                 error_text.visible = True
-                self.page.update()
+                self._ui.update()
                 return
 
             members_text = members_field.value.strip()
@@ -468,21 +784,58 @@ class Application:
                 await self._load_chats()
             else:
                 self._show_error(result.error_message or "Failed to create chat")
-            self.page.update()
+            self._ui.update()
 
         dialog = ft.AlertDialog(
             title=ft.Text("New Chat"),
             content=ft.Column(
-                [name_field, members_field, error_text],
+                [name_field, members_field, suggestions, error_text],
                 tight=True, spacing=12,
             ),
             actions=[
                 ft.TextButton("Cancel", on_click=lambda e: self.page.pop_dialog()),
                 ft.ElevatedButton("Create", on_click=create),
             ],
+            on_dismiss=lambda e: self.user_search.cancel(),
         )
         self.page.show_dialog(dialog)
 
+    def _user_suggestions(self, field: ft.TextField, multiple: bool = False) -> ft.Column:
+        """Suggest accounts under a username field as it is typed; picking one fills it in."""
+        suggestions = ft.Column(spacing=0, tight=True)
+
+        def split() -> tuple[str, str]:
+            # With multiple usernames only the one being typed, after the last comma, is searched
+            value = field.value or ""
+            if multiple and "," in value:
+                head, term = value.rsplit(",", 1)
+                return head + ", ", term
+            return "", value
+
+        def pick(account: Account):
+            head, _ = split()
+            field.value = f"{head}{account.username}, " if multiple else account.username
+            suggestions.controls.clear()
+            self._ui.update()
+
+        def show(query: str, accounts: list[Account]):
+            if query != split()[1].strip().lower():
+                return
+            suggestions.controls = [
+                ft.ListTile(
+                    title=ft.Text(account.display_name or account.username),
+                    subtitle=ft.Text(f"@{account.username}"),
+                    dense=True,
+                    on_click=lambda e, account=account: pick(account),
+                )
+                for account in accounts
+                if account.account_id != self._current_user_id
+            ][:MAX_USER_SUGGESTIONS]
+            self._ui.update()
+
+        field.on_change = lambda e: self.user_search.query(split()[1], show)
+        return suggestions
+
     def _on_chat_back(self):
         self._current_chat = None
         if self._chat_view:
@@ -491,17 +844,184 @@ class Application:
 
     # --- Messages ---
 
+    def _outgoing_message(self, chat_id: int, contents: list, nonce: str, created_at: str) -> Message:
+        sender = self.entities.account(self._current_user_id) or Account(
+            account_id=self._current_user_id,
+            username=self._current_username,
+            display_name=self._current_display_name,
+        )
+        message = Message(
+            message_id=0,
+            chat_id=chat_id,
+            sender_user=sender,
+            contents=contents,
+            created_at=created_at,
+            nonce=nonce,
+            pending=True,
+        )
+        self._outgoing[nonce] = message
+        return message
+
+    def _restore_outgoing(self):
+        """Show sends still queued from an earlier session as pending again."""
+        for op in self.api.outbox.ops():
+            if op.op == OP_SEND and op.key not in self._outgoing:
+                created_at = datetime.fromtimestamp(op.queued_at).isoformat()
+                self._outgoing_message(op.chat_id, op.args.get("contents") or [], op.key, created_at)
+
     async def _on_send_message(self, chat_id: int, text: str):
-        result = await self.api.send_message(chat_id, text)
-        if result.success:
+        message = self._outgoing_message(
+            chat_id,
+            text_contents(text),
+            uuid.uuid4().hex,
+            datetime.now().isoformat(),
+        )
+        self._chat_view.show_pending(message)
+        self._ui.update()
+        await self._deliver(message)
+
+    async def _deliver(self, message: Message):
+        after_id = await self.store.newest_message_id(message.chat_id) if self.store else None
+        result = await self.api.send_message(message.chat_id, message.text, key=message.nonce, after_id=after_id)
+        self._apply_send_result(message, result)
+        if result.success and self._sent_copy(result) is None and self._is_current(message.chat_id):
+            # Nothing to reconcile with: fetch the server copy instead
             await self._reload_current_messages()
-        else:
-            self._show_error(result.error_message or "Failed to send message")
-            self.page.update()
+        self._ui.update()
+
+    async def _flush_outbox(self):
+        """Send what was queued while offline and reconcile the local echoes."""
+        settled = await self._settle_in_doubt()
+        queued = {op.key: op for op in self.api.outbox.ops()}
+        results = await self.api.flush_outbox()
+        if not results:
+            if settled:
+                self._ui.update()
+            return
+        reload = False
+        for key, result in results.items():
+            message = self._outgoing.get(key)
+            if message is not None:
+                self._apply_send_result(message, result)
+                reload = reload or (
+                    result.success and self._sent_copy(result) is None and self._is_current(message.chat_id)
+                )
+            else:
+                op = queued.get(key)
+                if result.success and op is not None:
+                    self._store_change(op.op, op.chat_id, op.args)
+                elif not result.success:
+                    logger.warning(f"Queued message operation failed: {result.error_message}")
+                # Edits and deletes only show up in a fresh copy
+                reload = True
+        if reload:
+            await self._reload_current_messages()
+        self._ui.update()
+
+    async def _settle_in_doubt(self) -> bool:
+        """
+        Look for sends lost with the connection among the chat's newest
+        messages before they are repeated; the server cannot deduplicate, so
+        a blind retry could post them twice. Returns True if any was found.
+        """
+        found_any = False
+        claimed: set[int] = set()
+        for op in self.api.outbox.ops():
+            if not (op.in_doubt and op.op == OP_SEND):
+                continue
+            result = await self.api.get_messages(op.chat_id, limit=HISTORY_PAGE_SIZE)
+            if not result.success:
+                # Still in doubt; tried again on the next flush
+                continue
+            text = Message(0, op.chat_id, contents=op.args.get("contents") or []).text
+            sent = next((
+                m for m in result.data or []
+                if m.message_id not in claimed
+                and (op.after_id is None or m.message_id > op.after_id)
+                and m.sender_user is not None and m.sender_user.account_id == self._current_user_id
+                and m.text == text
+            ), None)
+            if sent is None:
+                self.api.outbox.settle(op.key)
+                continue
+            claimed.add(sent.message_id)
+            self.api.outbox.remove(op.key)
+            message = self._outgoing.get(op.key)
+            if message is not None:
+                self._confirm_outgoing(message, sent.to_dict())
+            found_any = True
+        return found_any
+
+    def _is_current(self, chat_id: int) -> bool:
+        return self._current_chat is not None and self._current_chat.chat_id == chat_id
+
+    def _apply_send_result(self, message: Message, result: Result):
+        if message.nonce not in self._outgoing:
+            # Discarded meanwhile, or the new_message event already confirmed it
+            return
+        if result.errors and result.errors[0][0] == QUEUED:
+            # Stays pending until the outbox is flushed
+            return
+        if not result.success:
+            logger.warning(f"Sending message failed: {result.error_message}")
+            message.pending = False
+            message.failed = True
+            if self._is_current(message.chat_id):
+                self._chat_view.show_pending(message)
+            return
+
+        self._confirm_outgoing(message, self._sent_copy(result))
+        if self._chat_list_view:
+            self._chat_list_view.move_to_top(message.chat_id)
+
+    @staticmethod
+    def _sent_copy(result: Result) -> Optional[dict]:
+        return result.data if isinstance(result.data, dict) and "message_id" in result.data else None
+
+    def _confirm_outgoing(self, message: Message, sent: Optional[dict]):
+        del self._outgoing[message.nonce]
+        if sent is not None and self.store:
+            self.store.put_messages(message.chat_id, [sent])
+        if self._current_chat and self._current_chat.chat_id == message.chat_id:
+            self._chat_view.confirm_pending(message.nonce, Message.from_dict(sent) if sent else None)
+
+    def _match_outgoing(self, chat_id: int, sent: dict) -> Optional[Message]:
+        """Find the local echo a server message stands for: by nonce if echoed back, else own text."""
+        nonce = sent.get("nonce")
+        if nonce in self._outgoing:
+            return self._outgoing[nonce]
+        sender = sent.get("sender_user")
+        if not isinstance(sender, dict) or sender.get("account_id") != self._current_user_id:
+            return None
+        text = Message.from_dict(sent).text
+        for message in self._outgoing.values():
+            if message.chat_id == chat_id and message.pending and message.text == text:
+                return message
+        return None
+
+    async def _retry_message(self, message: Message):
+        if message.nonce not in self._outgoing:
+            return
+        message.failed = False
+        message.pending = True
+        self._chat_view.show_pending(message)
+        self._ui.update()
+        await self._deliver(message)
+
+    def _discard_message(self, message: Message):
+        self.api.outbox.remove(message.nonce)
+        if self._outgoing.pop(message.nonce, None) is not None:
+            self._chat_view.confirm_pending(message.nonce)
+            self._ui.update()
 
     # --- Message context menu ---
 
     async def _on_message_action(self, message: Message):
+        if message.nonce is not None:
+            if message.failed:
+                self._show_failed_message_menu(message)
+            return
+
         is_mine = message.sender_user and message.sender_user.account_id == self._current_user_id
 
         buttons = []
@@ -540,6 +1060,35 @@ class Application:
         )
         self.page.show_dialog(dialog)
 
+    def _show_failed_message_menu(self, message: Message):
+        async def retry_click(e):
+            self.page.pop_dialog()
+            await self._retry_message(message)
+
+        def discard_click(e):
+            self.page.pop_dialog()
+            self._discard_message(message)
+
+        dialog = ft.AlertDialog(
+            content=ft.Column(
+                [
+                    ft.TextButton(
+                        content=ft.Row([ft.Icon(ft.Icons.REFRESH, size=20), ft.Text("Retry")], spacing=12),
+                        on_click=retry_click,
+                    ),
+                    ft.TextButton(
+                        content=ft.Row(
+                            [ft.Icon(ft.Icons.DELETE, size=20, color=ft.Colors.ERROR), ft.Text("Discard", color=ft.Colors.ERROR)],
+                            spacing=12,
+                        ),
+                        on_click=discard_click,
+                    ),
+                ],
+                tight=True, spacing=0,
+            ),
+        )
+        self.page.show_dialog(dialog)
+
     async def _show_edit_message_dialog(self, message: Message):
         text_field = ft.TextField(
             label="Edit message",
@@ -553,16 +1102,21 @@ class Application:
         async def do_edit(e):
             new_text = text_field.value.strip()
             if new_text and new_text != (message.text or ""):
-                result = await self.api.edit_message(message.message_id, new_text)
+                result = await self.api.edit_message(message.message_id, new_text, chat_id=message.chat_id)
                 self.page.pop_dialog()
                 if result.success:
+                    self._store_change(OP_EDIT, message.chat_id, {
+                        "message_id": message.message_id, "new_contents": text_contents(new_text),
+                    })
                     await self._reload_current_messages()
+                elif result.errors and result.errors[0][0] == QUEUED:
+                    await self._show_queued_change(message.chat_id)
                 else:
                     self._show_error(result.error_message or "Failed to edit message")
-                self.page.update()
+                self._ui.update()
             else:
                 self.page.pop_dialog()
-                self.page.update()
+                self._ui.update()
 
         dialog = ft.AlertDialog(
             title=ft.Text("Edit Message"),
@@ -580,13 +1134,16 @@ class Application:
             preview += "..."
 
         async def do_delete(e):
-            result = await self.api.delete_message(message.message_id)
+            result = await self.api.delete_message(message.message_id, chat_id=message.chat_id)
             self.page.pop_dialog()
             if result.success:
+                self._store_change(OP_DELETE, message.chat_id, {"message_id": message.message_id})
                 await self._reload_current_messages()
+            elif result.errors and result.errors[0][0] == QUEUED:
+                await self._show_queued_change(message.chat_id)
             else:
                 self._show_error(result.error_message or "Failed to delete message")
-            self.page.update()
+            self._ui.update()
 
         dialog = ft.AlertDialog(
             title=ft.Text("Delete Message"),
@@ -610,12 +1167,10 @@ class Application:
                     result = await self.api.rename_chat(chat.chat_id, new_name)
                     self.page.pop_dialog()
                     if result.success:
-                        await self._load_chats()
-                        chat.chat_name = new_name
-                        self._chat_view._header_title.value = new_name
+                        self.entities.rename_chat(chat.chat_id, new_name)
                     else:
                         self._show_error(result.error_message or "Failed to rename chat")
-                    self.page.update()
+                    self._ui.update()
 
             dialog = ft.AlertDialog(
                 title=ft.Text("Rename Chat"),
@@ -629,8 +1184,10 @@ class Application:
 
         elif action == "add_member":
             user_field = ft.TextField(label="Username", autofocus=True)
+            suggestions = self._user_suggestions(user_field)
 
             async def do_add(e):
+                self.user_search.cancel()
                 username = user_field.value.strip()
                 if username:
                     result = await self.api.add_member(chat.chat_id, username)
@@ -639,15 +1196,16 @@ class Application:
                         await self._load_chats()
                     else:
                         self._show_error(result.error_message or "Failed to add member")
-                    self.page.update()
+                    self._ui.update()
 
             dialog = ft.AlertDialog(
                 title=ft.Text("Add Member"),
-                content=user_field,
+                content=ft.Column([user_field, suggestions], tight=True, spacing=12),
                 actions=[
                     ft.TextButton("Cancel", on_click=lambda e: self.page.pop_dialog()),
                     ft.ElevatedButton("Add", on_click=do_add),
                 ],
+                on_dismiss=lambda e: self.user_search.cancel(),
             )
             self.page.show_dialog(dialog)
 
@@ -701,7 +1259,7 @@ class Application:
 
     async def _on_theme_toggle(self, is_dark: bool):
         self.page.theme_mode = ft.ThemeMode.DARK if is_dark else ft.ThemeMode.LIGHT
-        self.page.update()
+        self._ui.update()
         await self.storage.set_theme_mode("dark" if is_dark else "light")
 
     async def _on_display_name_save(self, name: str):
@@ -718,14 +1276,19 @@ class Application:
             tokens_result = await self.api.get_my_tokens()
             if tokens_result.success and isinstance(tokens_result.data, list):
                 self._settings_view.set_sessions(tokens_result.data)
-                self.page.update()
+                self._ui.update()
         elif not result.success:
             self._show_error(result.error_message or "Failed to revoke session")
 
     async def _on_logout(self):
         self._stop_connection()
+        self._session_unverified = False
         await self.api.logout_token()
         await self.storage.clear_all()
+        self._close_store(clear=True)
+        self.entities.clear()
+        self.user_search.clear()
+        self._outgoing.clear()
         self.api.clear_token()
         await self.api.disconnect()
         self._current_chat = None
@@ -19,6 +19,10 @@ class ChatListView:
 
         self.chats: list[Chat] = []
         self.selected_chat_id: Optional[int] = None
+        self._tiles: dict[int, ft.Control] = {}
+        # What each tile was drawn from, to reuse tiles whose chat did not change
+        self._tile_state: dict[int, tuple] = {}
+        self._unread: dict[int, int] = {}
 
         self._list_view = ft.ListView(expand=True, spacing=0, padding=ft.padding.symmetric(vertical=4))
         self._loading = ft.ProgressRing(width=30, height=30)
@@ -95,20 +99,96 @@ class ChatListView:
             self._empty_container.visible = False
 
     def update_chats(self, chats: list[Chat]):
-        self.chats = chats
-        self._list_view.controls.clear()
-        if not chats:
-            if self._empty_container:
-                self._empty_container.visible = True
-        else:
-            if self._empty_container:
-                self._empty_container.visible = False
-            for chat in chats:
-                self._list_view.controls.append(self._build_chat_tile(chat))
+        self.chats = list(chats)
+        ids = {chat.chat_id for chat in self.chats}
+        for chat_id in [k for k in self._tiles if k not in ids]:
+            del self._tiles[chat_id]
+            del self._tile_state[chat_id]
+        self._unread = {k: v for k, v in self._unread.items() if k in ids}
+        self._list_view.controls = [self._tile(chat) for chat in self.chats]
+        self._update_empty()
+
+    def has_chat(self, chat_id: int) -> bool:
+        return chat_id in self._tiles
+
+    def upsert_chat(self, chat: Chat):
+        """Redraw a known chat's tile in place, or add a new chat at the top."""
+        if chat.chat_id in self._tiles:
+            self.refresh_chat(chat)
+            return
+        tile = self._tile(chat)
+        self.chats.insert(0, chat)
+        self._list_view.controls.insert(0, tile)
+        self._update_empty()
+
+    def refresh_chat(self, chat: Chat):
+        if chat.chat_id not in self._tiles:
+            return
+        index = self._index(chat.chat_id)
+        self.chats[index] = chat
+        self._list_view.controls[index] = self._tile(chat)
+
+    def move_to_top(self, chat_id: int):
+        if chat_id not in self._tiles:
+            return
+        index = self._index(chat_id)
+        if index == 0:
+            return
+        self.chats.insert(0, self.chats.pop(index))
+        self._list_view.controls.insert(0, self._list_view.controls.pop(index))
+
+    def remove_chat(self, chat_id: int):
+        if self._tiles.pop(chat_id, None) is None:
+            return
+        del self._tile_state[chat_id]
+        index = self._index(chat_id)
+        del self.chats[index]
+        del self._list_view.controls[index]
+        self._unread.pop(chat_id, None)
+        if self.selected_chat_id == chat_id:
+            self.selected_chat_id = None
+        self._update_empty()
+
+    def select_chat(self, chat_id: Optional[int]):
+        """Move the highlight; only the previous and the new tile change."""
+        previous = self._tiles.get(self.selected_chat_id)
+        self.selected_chat_id = chat_id
+        if previous is not None:
+            previous.bgcolor = None
+        tile = self._tiles.get(chat_id)
+        if tile is not None:
+            tile.bgcolor = ft.Colors.SECONDARY_CONTAINER
+
+    def add_unread(self, chat_id: int, count: int = 1):
+        if chat_id not in self._tiles or chat_id == self.selected_chat_id:
+            return
+        self._unread[chat_id] = self._unread.get(chat_id, 0) + count
+        self.refresh_chat(self.chats[self._index(chat_id)])
+
+    def _index(self, chat_id: int) -> int:
+        # By id: controls compare by value, so list.index could match another tile
+        return next(i for i, chat in enumerate(self.chats) if chat.chat_id == chat_id)
+
+    def _update_empty(self):
+        if self._empty_container:
+            self._empty_container.visible = not self.chats
+
+    def _tile(self, chat: Chat) -> ft.Control:
+        """Get the tile for a chat, building it only if what it shows changed."""
+        state = (chat, chat.chat_name, len(chat.members), self._unread.get(chat.chat_id, 0))
+        tile = self._tiles.get(chat.chat_id)
+        old = self._tile_state.get(chat.chat_id)
+        if tile is not None and old[0] is chat and old[1:] == state[1:]:
+            return tile
+        tile = self._build_chat_tile(chat)
+        self._tiles[chat.chat_id] = tile
+        self._tile_state[chat.chat_id] = state
+        return tile
 
     def _build_chat_tile(self, chat: Chat) -> ft.Control:
         is_selected = chat.chat_id == self.selected_chat_id
         member_count = len(chat.members)
+        unread = self._unread.get(chat.chat_id, 0)
         initial = chat.chat_name[0].upper() if chat.chat_name else "?"
 
         async def on_click(e):
@@ -133,6 +213,16 @@ class ChatListView:
                         spacing=2,
                         expand=True,
                     ),
+                    ft.Container(
+                        content=ft.Text(
+                            str(unread) if unread < 100 else "99+",
+                            size=11, weight=ft.FontWeight.BOLD, color=ft.Colors.ON_PRIMARY,
+                        ),
+                        bgcolor=ft.Colors.PRIMARY,
+                        border_radius=ft.border_radius.all(10),
+                        padding=ft.padding.symmetric(horizontal=7, vertical=2),
+                        visible=unread > 0,
+                    ),
                 ],
                 spacing=12,
                 vertical_alignment=ft.CrossAxisAlignment.CENTER,
@@ -146,7 +236,8 @@ class ChatListView:
         )
 
     async def _chat_clicked(self, chat: Chat):
-        self.selected_chat_id = chat.chat_id
-        self.update_chats(self.chats)
+        if self._unread.pop(chat.chat_id, None):
+            self.refresh_chat(chat)
+        self.select_chat(chat.chat_id)
         self.page.update()
         await self.on_chat_selected(chat)
@@ -24,6 +24,8 @@ class ChatView:
 
         self._current_chat: Optional[Chat] = None
         self._messages: list[Message] = []
+        # Local echoes by nonce, shown after the confirmed messages
+        self._pending: dict[str, MessageBubble] = {}
 
         self._message_list = ft.ListView(
             expand=True, spacing=4, auto_scroll=True,
@@ -133,6 +135,7 @@ class ChatView:
             self._header_title.value = chat.chat_name
         self._header_subtitle.visible = False
         self._messages.clear()
+        self._pending.clear()
         self._message_list.controls.clear()
 
     def set_messages(self, messages: list[Message]):
@@ -140,19 +143,39 @@ class ChatView:
         self._rebuild_message_list()
 
     def append_message(self, message: Message):
+        self._message_list.controls.insert(len(self._messages), self._bubble(message))
         self._messages.append(message)
+
+    def show_pending(self, message: Message):
+        """Show a local echo, or redraw it after its state changed."""
+        bubble = self._bubble(message)
+        old = self._pending.get(message.nonce)
+        self._pending[message.nonce] = bubble
+        if old is None:
+            self._message_list.controls.append(bubble)
+        else:
+            self._message_list.controls[self._control_index(old)] = bubble
+
+    def confirm_pending(self, nonce: str, message: Optional[Message] = None):
+        """Replace a local echo with the server's copy, or just drop it if there is none."""
+        bubble = self._pending.pop(nonce, None)
+        if bubble is not None:
+            del self._message_list.controls[self._control_index(bubble)]
+        if message is not None and all(m.message_id != message.message_id for m in self._messages):
+            self.append_message(message)
+
+    def _control_index(self, bubble: MessageBubble) -> int:
+        # Pending bubbles sit at the end; controls compare by value, so match by identity
+        controls = self._message_list.controls
+        return next(i for i in range(len(controls) - 1, -1, -1) if controls[i] is bubble)
+
+    def _bubble(self, message: Message) -> MessageBubble:
         is_mine = message.sender_user and message.sender_user.account_id == self.current_user_id
-        self._message_list.controls.append(
-            MessageBubble(message, is_mine, on_context_menu=self._on_message_context)
-        )
+        return MessageBubble(message, is_mine, on_context_menu=self._on_message_context)
 
     def _rebuild_message_list(self):
-        self._message_list.controls.clear()
-        for msg in self._messages:
-            is_mine = msg.sender_user and msg.sender_user.account_id == self.current_user_id
-            self._message_list.controls.append(
-                MessageBubble(msg, is_mine, on_context_menu=self._on_message_context)
-            )
+        self._message_list.controls = [self._bubble(msg) for msg in self._messages]
+        self._message_list.controls.extend(self._pending.values())
 
     async def _handle_send(self, text: str):
         if self._current_chat:
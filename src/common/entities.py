@@ -0,0 +1,118 @@
+import logging
+from typing import Callable, Optional
+
+from src.common.models import ACCOUNTS, Account, AccountMap, Chat
+
+logger = logging.getLogger("ghosty.entities")
+
+
+class EntityStore:
+    """
+    One live object per account_id and per chat_id, shared by every view.
+
+    Changes made through the store mutate the shared object in place and
+    notify listeners, so an update reaches everything holding the entity
+    without searching for copies of it.
+    """
+
+    def __init__(self, accounts: AccountMap = ACCOUNTS):
+        self.accounts = accounts
+        self._chats: dict[int, Chat] = {}
+        self._account_listeners: list[Callable[[Account], None]] = []
+        self._chat_listeners: list[Callable[[Chat], None]] = []
+
+    # --- Lookup ---
+
+    def account(self, account_id: int) -> Optional[Account]:
+        return self.accounts.get(account_id)
+
+    def chat(self, chat_id: int) -> Optional[Chat]:
+        return self._chats.get(chat_id)
+
+    # --- Updates ---
+
+    def put_chat(self, d: dict) -> Chat:
+        chat = self._chats.get(d.get("chat_id", 0))
+        if chat is None:
+            chat = self._merge_chat(d)
+        else:
+            chat.update_from_dict(d, self.accounts)
+            self._notify(self._chat_listeners, chat)
+        self._merge_presence(d)
+        return chat
+
+    def put_chats(self, items: list, presence: bool = True) -> list[Chat]:
+        """
+        Replace the known chats with a full chat list; the caller renders it, so
+        the chats are not notified. Member presence is merged, notifying the
+        accounts that changed, unless presence is False (a cached snapshot).
+        """
+        chats = [self._merge_chat(c) if isinstance(c, dict) else c for c in items]
+        self._chats = {chat.chat_id: chat for chat in chats}
+        if presence:
+            for c in items:
+                if isinstance(c, dict):
+                    self._merge_presence(c)
+        return chats
+
+    def remove_chat(self, chat_id: int) -> Optional[Chat]:
+        return self._chats.pop(chat_id, None)
+
+    def rename_chat(self, chat_id: int, chat_name: str) -> Optional[Chat]:
+        chat = self._chats.get(chat_id)
+        if chat is not None and chat.chat_name != chat_name:
+            chat.chat_name = chat_name
+            self._notify(self._chat_listeners, chat)
+        return chat
+
+    def set_online(self, account_id: int, online: bool) -> Optional[Account]:
+        account = self.accounts.get(account_id)
+        if account is not None and account.in_online != online:
+            account.in_online = online
+            self._notify(self._account_listeners, account)
+        return account
+
+    def clear(self):
+        self.accounts.clear()
+        self._chats.clear()
+
+    # --- Notification ---
+
+    def on_account_changed(self, listener: Callable[[Account], None]) -> Callable[[], None]:
+        self._account_listeners.append(listener)
+        return lambda: self._account_listeners.remove(listener)
+
+    def on_chat_changed(self, listener: Callable[[Chat], None]) -> Callable[[], None]:
+        self._chat_listeners.append(listener)
+        return lambda: self._chat_listeners.remove(listener)
+
+    def _merge_chat(self, d: dict) -> Chat:
+        chat = self._chats.get(d.get("chat_id", 0))
+        if chat is None:
+            chat = Chat.from_dict(d, self.accounts)
+            self._chats[chat.chat_id] = chat
+        else:
+            chat.update_from_dict(d, self.accounts)
+        return chat
+
+    def _merge_presence(self, d: dict):
+        """Apply the presence of a chat's owner and members, as the server just sent them."""
+        people = [d["owner"]] if isinstance(d.get("owner"), dict) else []
+        people.extend(m for m in d.get("members") or [] if isinstance(m, dict))
+        for p in people:
+            account = self.accounts.get(p.get("account_id", 0))
+            if account is None:
+                continue
+            online = p.get("in_online", account.in_online)
+            last_online_at = p.get("last_online_at", account.last_online_at)
+            if account.in_online != online or account.last_online_at != last_online_at:
+                account.in_online = online
+                account.last_online_at = last_online_at
+                self._notify(self._account_listeners, account)
+
+    def _notify(self, listeners: list, entity):
+        for listener in list(listeners):
+            try:
+                listener(entity)
+            except Exception as e:
+                logger.error(f"Entity listener failed: {e}", exc_info=True)
@@ -1,8 +1,12 @@
+import sys
 from dataclasses import dataclass, field
-from typing import Optional
+from datetime import datetime
+from typing import Generic, Optional, TypeVar
 
+T = TypeVar("T")
 
-@dataclass
+
+@dataclass(slots=True)
 class Account:
     account_id: int
     username: str
@@ -22,8 +26,64 @@ class Account:
             created_at=d.get("created_at"),
         )
 
+    def to_dict(self) -> dict:
+        return {
+            "account_id": self.account_id,
+            "username": self.username,
+            "display_name": self.display_name,
+            "last_online_at": self.last_online_at,
+            "in_online": self.in_online,
+            "created_at": self.created_at,
+        }
+
+    def update_from_dict(self, d: dict):
+        # Presence is left alone: snapshots (history pages, cached chats, search
+        # results) carry it stale, and live changes go through EntityStore
+        self.username = d.get("username", self.username)
+        self.display_name = d.get("display_name", self.display_name)
+        self.created_at = d.get("created_at", self.created_at)
+
+
+class AccountMap:
+    """
+    Identity map of accounts: one shared Account per account_id, refreshed
+    with the latest names seen. The same few senders repeat across thousands
+    of messages, so they are built once. Presence is only taken from the
+    first sighting; after that EntityStore updates it and notifies.
+    """
+
+    __slots__ = ("_accounts",)
+
+    def __init__(self):
+        self._accounts: dict[int, Account] = {}
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def get(self, account_id: int) -> Optional[Account]:
+        return self._accounts.get(account_id)
+
+    def values(self) -> list[Account]:
+        return list(self._accounts.values())
+
+    def from_dict(self, d: dict) -> Account:
+        account = self._accounts.get(d.get("account_id", 0))
+        if account is None:
+            account = Account.from_dict(d)
+            self._accounts[account.account_id] = account
+        else:
+            account.update_from_dict(d)
+        return account
 
-@dataclass
+    def clear(self):
+        self._accounts.clear()
+
+
+# Shared by default so every loaded chat and message points at the same accounts
+ACCOUNTS = AccountMap()
+
+
+@dataclass(slots=True)
 class AuthToken:
     token_id: int
     user_id: int
@@ -46,18 +106,18 @@ class AuthToken:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Chat:
     chat_id: int
     chat_name: str
     owner: Optional[Account] = None
-    members: list = field(default_factory=list)
+    members: list[Account] = field(default_factory=list)
     created_at: Optional[str] = None
 
     @classmethod
-    def from_dict(cls, d: dict) -> "Chat":
-        owner = Account.from_dict(d["owner"]) if d.get("owner") else None
-        members = [Account.from_dict(m) for m in d.get("members", [])]
+    def from_dict(cls, d: dict, accounts: AccountMap = ACCOUNTS) -> "Chat":
+        owner = accounts.from_dict(d["owner"]) if d.get("owner") else None
+        members = [accounts.from_dict(m) for m in d.get("members", [])]
         return cls(
             chat_id=d.get("chat_id", 0),
             chat_name=d.get("chat_name", ""),
@@ -66,8 +126,21 @@ class Chat:
             created_at=d.get("created_at"),
         )
 
+    def update_from_dict(self, d: dict, accounts: AccountMap = ACCOUNTS):
+        self.chat_name = d.get("chat_name", self.chat_name)
+        if "owner" in d:
+            self.owner = accounts.from_dict(d["owner"]) if d["owner"] else None
+        if "members" in d:
+            self.members = [accounts.from_dict(m) for m in d["members"] or []]
+        self.created_at = d.get("created_at", self.created_at)
 
-@dataclass
+    @classmethod
+    def from_dicts(cls, items: list, accounts: AccountMap = ACCOUNTS) -> list["Chat"]:
+        from_dict = cls.from_dict
+        return [from_dict(c, accounts) if isinstance(c, dict) else c for c in items]
+
+
+@dataclass(slots=True)
 class MessageTag:
     tag_id: int
     message_id: int
@@ -76,8 +149,8 @@ class MessageTag:
     tag: str = ""
 
     @classmethod
-    def from_dict(cls, d: dict) -> "MessageTag":
-        for_user = Account.from_dict(d["for_user"]) if d.get("for_user") else None
+    def from_dict(cls, d: dict, accounts: AccountMap = ACCOUNTS) -> "MessageTag":
+        for_user = accounts.from_dict(d["for_user"]) if d.get("for_user") else None
         return cls(
             tag_id=d.get("tag_id", 0),
             message_id=d.get("message_id", 0),
@@ -86,50 +159,124 @@ class MessageTag:
             tag=d.get("tag", ""),
         )
 
+    @classmethod
+    def from_fields(cls, f: dict) -> "MessageTag":
+        """Like from_dict, for fields the decoder has already typed."""
+        get = f.get
+        return cls(get("tag_id", 0), get("message_id", 0), get("for_user"), get("type", ""), get("tag", ""))
+
+    def to_dict(self) -> dict:
+        return {
+            "tag_id": self.tag_id,
+            "message_id": self.message_id,
+            "for_user": self.for_user.to_dict() if self.for_user else None,
+            "type": self.type,
+            "tag": self.tag,
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class Message:
     message_id: int
     chat_id: int
     sender_user: Optional[Account] = None
     is_read: bool = False
-    tags: list = field(default_factory=list)
+    tags: list[MessageTag] = field(default_factory=list)
     contents: list = field(default_factory=list)
     created_at: Optional[str] = None
+    # Local echo of a message being sent: nonce identifies it until the server copy replaces it
+    nonce: Optional[str] = None
+    pending: bool = False
+    failed: bool = False
+    # Display fields, derived once from contents and created_at
+    text: str = field(init=False, default="", repr=False, compare=False)
+    time_label: str = field(init=False, default="", repr=False, compare=False)
+
+    def __post_init__(self):
+        self.text = _join_text(self.contents)
+        self.time_label = _format_time(self.created_at)
 
     @classmethod
-    def from_dict(cls, d: dict) -> "Message":
-        sender = Account.from_dict(d["sender_user"]) if d.get("sender_user") else None
-        tags = [MessageTag.from_dict(t) for t in d.get("tags", []) if isinstance(t, dict)]
+    def from_dict(cls, d: dict, accounts: AccountMap = ACCOUNTS) -> "Message":
+        get = d.get
+        sender = get("sender_user")
+        tags = get("tags")
+        # Positional to skip keyword matching; order follows the fields above
         return cls(
-            message_id=d.get("message_id", 0),
-            chat_id=d.get("chat_id", 0),
-            sender_user=sender,
-            is_read=d.get("is_read", False),
-            tags=tags,
-            contents=d.get("contents", []),
-            created_at=d.get("created_at"),
+            get("message_id", 0),
+            get("chat_id", 0),
+            accounts.from_dict(sender) if sender else None,
+            get("is_read", False),
+            [MessageTag.from_dict(t, accounts) for t in tags if isinstance(t, dict)] if tags else [],
+            get("contents", []),
+            get("created_at"),
         )
 
-    @property
-    def text(self) -> str:
-        parts = []
-        for chunk in self.contents:
-            if isinstance(chunk, dict):
-                if "text" in chunk:
-                    parts.append(chunk["text"])
-                elif chunk.get("type") == "text":
-                    parts.append(chunk.get("content", ""))
-            elif isinstance(chunk, str):
-                parts.append(chunk)
-        return "".join(parts)
-
-
-@dataclass
-class Result:
+    @classmethod
+    def from_fields(cls, f: dict) -> "Message":
+        """Build from fields already decoded to their types, defaulting absent ones as from_dict does."""
+        get = f.get
+        return cls(
+            get("message_id", 0),
+            get("chat_id", 0),
+            get("sender_user"),
+            get("is_read", False),
+            get("tags") or [],
+            get("contents", []),
+            get("created_at"),
+        )
+
+    @classmethod
+    def from_dicts(cls, items: list, accounts: AccountMap = ACCOUNTS) -> list["Message"]:
+        from_dict = cls.from_dict
+        return [from_dict(m, accounts) if isinstance(m, dict) else m for m in items]
+
+    def to_dict(self) -> dict:
+        """The server's shape of the message, as from_dict reads it."""
+        return {
+            "message_id": self.message_id,
+            "chat_id": self.chat_id,
+            "sender_user": self.sender_user.to_dict() if self.sender_user else None,
+            "is_read": self.is_read,
+            "tags": [t.to_dict() for t in self.tags],
+            "contents": self.contents,
+            "created_at": self.created_at,
+        }
+
+
+def _join_text(contents: list) -> str:
+    parts = []
+    for chunk in contents:
+        if isinstance(chunk, dict):
+            if "text" in chunk:
+                parts.append(chunk["text"])
+            elif chunk.get("type") == "text":
+                parts.append(chunk.get("content", ""))
+        elif isinstance(chunk, str):
+            parts.append(chunk)
+    return "".join(parts)
+
+
+def _format_time(created_at) -> str:
+    if not created_at:
+        return ""
+    # Server timestamps are ISO strings, so the label can be sliced out without parsing
+    if isinstance(created_at, str) and len(created_at) >= 16 and created_at[10] in "T " and created_at[13] == ":":
+        hour, minute = created_at[11:13], created_at[14:16]
+        if hour.isdigit() and minute.isdigit() and hour < "24" and minute < "60":
+            return sys.intern(created_at[11:16])
+    try:
+        # At most 1440 distinct labels, so share them
+        return sys.intern(datetime.fromisoformat(str(created_at)).strftime("%H:%M"))
+    except (ValueError, TypeError):
+        return ""
+
+
+@dataclass(slots=True)
+class Result(Generic[T]):
     success: bool
     errors: list
-    data: object = None
+    data: Optional[T] = None
 
     @classmethod
     def from_raw(cls, raw) -> "Result":
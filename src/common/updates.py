@@ -0,0 +1,74 @@
+import asyncio
+import contextlib
+import contextvars
+import logging
+import time
+from typing import Optional
+
+import flet as ft
+
+logger = logging.getLogger("ghosty.updates")
+
+FRAME_INTERVAL = 1 / 60
+
+# Batches are per task, so a handler awaiting the network does not hold back
+# updates made by other tasks meanwhile
+_batch_depth: contextvars.ContextVar[int] = contextvars.ContextVar("ghosty_update_batch", default=0)
+
+
+class UpdateScheduler:
+    """
+    Coalesces page.update() calls into at most one sync per frame.
+
+    update() marks the page dirty and schedules a flush at the next frame
+    boundary; every update() before then rides along with it. Inside
+    batch(), the current task's updates are held back until its outermost
+    batch exits, so a handler that touches several views renders once.
+    """
+
+    def __init__(self, page: ft.Page, interval: float = FRAME_INTERVAL):
+        self.page = page
+        self.interval = interval
+        self._dirty = False
+        self._last_flush = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def update(self):
+        self._dirty = True
+        if self._handle is not None or _batch_depth.get():
+            return
+        delay = max(0.0, self._last_flush + self.interval - time.monotonic())
+        self._handle = asyncio.get_running_loop().call_later(delay, self._flush_scheduled)
+
+    def flush(self):
+        """Sync the page now, e.g. when a screen changes and must not wait a frame."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        try:
+            self.page.update()
+        except Exception as e:
+            logger.error(f"Page update failed: {e}", exc_info=True)
+
+    @contextlib.contextmanager
+    def batch(self):
+        token = _batch_depth.set(_batch_depth.get() + 1)
+        try:
+            yield
+        finally:
+            _batch_depth.reset(token)
+            if not _batch_depth.get() and self._dirty:
+                self.update()
+
+    def cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._dirty = False
+
+    def _flush_scheduled(self):
+        self._handle = None
+        if self._dirty:
+            self.flush()
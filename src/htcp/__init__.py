@@ -3,12 +3,14 @@ HTCP - Binary TCP Protocol for Python
 
 A library for building TCP-based client-server applications
 with automatic type serialization and RPC support.
+
+Servers and clients are imported on first access, so an application that
+only uses AsyncClient does not load the servers or the sync client.
 """
 
-from .server import Server
-from .client import Client
-from .aio_server import AsyncServer
-from .aio_client import AsyncClient
+import importlib
+from typing import TYPE_CHECKING
+
 from .exceptions import (
     HTCPError,
     ConnectionError,
@@ -19,16 +21,58 @@ from .exceptions import (
     MaxPayloadExceededError,
     UnknownPacketTypeError,
     HandshakeError,
+    ServerBusyError,
 )
 
+if TYPE_CHECKING:
+    from .server import Server, SessionContext
+    from .client import Client, ClientPool, ReconnectPolicy
+    from .aio_server import AsyncServer
+    from .aio_client import AsyncClient, AsyncClientPool
+    from .common.decoding import TypedDecoder
+
+# Public name -> module that defines it
+_LAZY_IMPORTS = {
+    'Server': '.server.server',
+    'SessionContext': '.server.session',
+    'Client': '.client.client',
+    'ClientPool': '.client.pool',
+    'ReconnectPolicy': '.client.reconnect',
+    'AsyncServer': '.aio_server.server',
+    'AsyncClient': '.aio_client.client',
+    'AsyncClientPool': '.aio_client.pool',
+    'TypedDecoder': '.common.decoding',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
 __version__ = "0.2.0"
 __all__ = [
     # Sync
     'Server',
     'Client',
+    'ClientPool',
+    'ReconnectPolicy',
     # Async
     'AsyncServer',
     'AsyncClient',
+    'AsyncClientPool',
+    # Sessions
+    'SessionContext',
+    # Decoding
+    'TypedDecoder',
     # Exceptions
     'HTCPError',
     'ConnectionError',
@@ -39,4 +83,5 @@ __all__ = [
     'MaxPayloadExceededError',
     'UnknownPacketTypeError',
     'HandshakeError',
+    'ServerBusyError',
 ]
@@ -2,5 +2,6 @@
 
 from .client import AsyncClient
 from .connection import AsyncClientConnection
+from .pool import AsyncClientPool
 
-__all__ = ['AsyncClient', 'AsyncClientConnection']
+__all__ = ['AsyncClient', 'AsyncClientConnection', 'AsyncClientPool']
@@ -3,12 +3,21 @@ HTCP Async Client Module
 Async TCP client for connecting to HTCP servers.
 """
 
+import asyncio
 import logging
 import uuid
+from collections import deque
 from typing import Any, AsyncIterator, Dict, Optional, Type
 
-from ..common.constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_WRITE_TIMEOUT
-from ..common.proto import PacketType
+from ..common.constants import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WRITE_TIMEOUT,
+    DEFAULT_PING_TIMEOUT,
+    CLIENT_FEATURES,
+    FEATURE_PING,
+)
+from ..common.proto import Packet, PacketType, ErrorCode
 from ..common.messages import (
     HandshakeRequest,
     HandshakeResponse,
@@ -23,11 +32,28 @@ from ..common.messages import (
     SubscribeError,
 )
 from ..common.utils import convert_to_type
-from ..exceptions import ConnectionError as HTCPConnectionError
+from ..exceptions import ConnectionError as HTCPConnectionError, ServerBusyError
 
+from ..client.reconnect import ReconnectPolicy
 from .connection import AsyncClientConnection
 
 
+_STREAM_MESSAGES = {
+    PacketType.SUBSCRIBE_DATA: SubscribeData,
+    PacketType.SUBSCRIBE_END: SubscribeEnd,
+    PacketType.SUBSCRIBE_ERROR: SubscribeError,
+    PacketType.ERROR: ErrorPacket,
+}
+
+
+def _parse_stream_packet(packet: Packet) -> Any:
+    """Parse a packet a subscription may receive into its message object."""
+    message_class = _STREAM_MESSAGES.get(packet.packet_type)
+    if message_class is None:
+        raise RuntimeError(f"Unexpected packet type: {packet.packet_type}")
+    return message_class.from_packet(packet)
+
+
 class AsyncSubscriptionIterator:
     """
     Async iterator for receiving subscription data.
@@ -52,6 +78,11 @@ class AsyncSubscriptionIterator:
         self._active = True
         self._ended = False
 
+        # Set by the client in multiplex mode; None terminates the stream
+        self._queue: Optional[asyncio.Queue] = None
+        # A non-data message taken off the queue by drain(), seen next by __anext__
+        self._stashed: list = []
+
     @property
     def subscription_id(self) -> str:
         return self._subscription_id
@@ -71,50 +102,95 @@ class AsyncSubscriptionIterator:
         if not self._active or self._ended:
             raise StopAsyncIteration
 
-        if not self._client._connection.connected:
+        if self._queue is None and not self._client._connection.connected:
             self._active = False
             raise StopAsyncIteration
 
         try:
-            packet = await self._client._connection.receive()
-
-            if packet.packet_type == PacketType.SUBSCRIBE_DATA:
-                data_msg = SubscribeData.from_packet(packet)
-                if data_msg.subscription_id == self._subscription_id:
-                    if self._data_type is not None and data_msg.data is not None:
-                        return convert_to_type(data_msg.data, self._data_type)
-                    return data_msg.data
-
-            elif packet.packet_type == PacketType.SUBSCRIBE_END:
-                end_msg = SubscribeEnd.from_packet(packet)
-                if end_msg.subscription_id == self._subscription_id:
+            message = await self._next_message()
+
+            if isinstance(message, SubscribeData):
+                if message.subscription_id == self._subscription_id:
+                    return self._convert(message.data)
+
+            elif isinstance(message, SubscribeEnd):
+                if message.subscription_id == self._subscription_id:
                     self._ended = True
                     raise StopAsyncIteration
 
-            elif packet.packet_type == PacketType.SUBSCRIBE_ERROR:
-                error_msg = SubscribeError.from_packet(packet)
-                if error_msg.subscription_id == self._subscription_id:
+            elif isinstance(message, SubscribeError):
+                if message.subscription_id == self._subscription_id:
                     self._ended = True
-                    raise RuntimeError(f"Subscription error: {error_msg.message}")
+                    raise RuntimeError(f"Subscription error: {message.message}")
 
-            elif packet.packet_type == PacketType.ERROR:
-                error = ErrorPacket.from_packet(packet)
+            elif isinstance(message, ErrorPacket):
                 self._ended = True
-                raise RuntimeError(f"Server error: {error.message}")
+                raise RuntimeError(f"Server error: {message.message}")
 
-            # Unexpected packet type
-            raise RuntimeError(f"Unexpected packet type: {packet.packet_type}")
+            # Message for another subscription
+            raise RuntimeError(
+                f"Unexpected {type(message).__name__} for subscription {self._subscription_id}"
+            )
 
         except HTCPConnectionError:
             self._active = False
             raise StopAsyncIteration
 
+    def drain(self, limit: Optional[int] = None) -> list:
+        """
+        Take the data items that have already arrived, without waiting.
+
+        Lets a consumer that fell behind handle a backlog in one batch. Only
+        multiplex mode buffers data; otherwise nothing is buffered and this
+        returns an empty list. Stops at the end of the stream, which the next
+        ``__anext__`` then reports.
+
+        Args:
+            limit: Maximum number of items to take (None for all)
+
+        Returns:
+            Data items in arrival order
+        """
+        items = []
+        if self._queue is None or not self.active:
+            return items
+        while not self._stashed and (limit is None or len(items) < limit):
+            try:
+                message = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if isinstance(message, SubscribeData) and message.subscription_id == self._subscription_id:
+                items.append(self._convert(message.data))
+            else:
+                self._stashed.append(message)
+        return items
+
+    def _convert(self, data: Any) -> Any:
+        if self._data_type is not None and data is not None:
+            return convert_to_type(data, self._data_type)
+        return data
+
+    async def _next_message(self) -> Any:
+        """
+        Get the next message for this subscription.
+
+        In multiplex mode the client's reader task routes messages into this
+        iterator's queue; otherwise the next packet is read off the socket.
+        """
+        if self._queue is not None:
+            message = self._stashed.pop() if self._stashed else await self._queue.get()
+            if message is None:
+                raise HTCPConnectionError("Connection closed")
+            return message
+        return _parse_stream_packet(await self._client._connection.receive())
+
     async def cancel(self) -> None:
         """Cancel the subscription."""
         if not self._active or self._ended:
             return
 
         self._active = False
+        self._client._unroute_subscription(self)
         try:
             request = UnsubscribeRequest(subscription_id=self._subscription_id)
             await self._client._connection.send(request.to_packet())
@@ -152,6 +228,22 @@ class AsyncClient:
     Or with async context manager:
         async with AsyncClient(server_host="127.0.0.1", server_port=2353) as client:
             result = await client.call(transaction="greet", name="World")
+
+    With ``heartbeat_interval`` set, the client sends a protocol PING every
+    interval while connected. This keeps the connection from being reaped as
+    idle by the server, and a server that does not answer within
+    ``heartbeat_timeout`` gets the connection closed, so ``connected`` turns
+    False and pending reads fail. Servers that do not advertise PING support in
+    their handshake (see supports_ping) are not sent heartbeats.
+
+    With ``multiplex=True`` transactions and any number of subscriptions share
+    the one connection: a reader task routes subscription packets to their
+    iterator by subscription_id and transaction results to their callers, so
+    calls may be made while a subscription is being consumed. The server
+    answers a connection's calls in order, so results are matched to callers
+    first-in, first-out. ``read_timeout`` then bounds each call's wait for its
+    result instead of every socket read, and subscriptions may stay quiet
+    indefinitely.
     """
 
     def __init__(
@@ -162,20 +254,39 @@ class AsyncClient:
         connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
         read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
         write_timeout: Optional[float] = DEFAULT_WRITE_TIMEOUT,
+        heartbeat_interval: Optional[float] = None,
+        heartbeat_timeout: float = DEFAULT_PING_TIMEOUT,
+        multiplex: bool = False,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
     ):
         self.server_host = server_host
         self.server_port = server_port
         self.logger = logger or logging.getLogger(__name__)
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.multiplex = multiplex
+        self.reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self._call_timeout = read_timeout if multiplex else None
 
         self._connection = AsyncClientConnection(
             server_host,
             server_port,
             connect_timeout,
-            read_timeout,
+            None if multiplex else read_timeout,
             write_timeout,
         )
         self._server_name = "unknown"
         self._available_transactions: list[str] = []
+        self._server_features: list[str] = []
+        # Last full handshake, kept across reconnects for session resume
+        self._capabilities: Optional[HandshakeResponse] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+        # Multiplex mode state
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._pending_calls: deque[asyncio.Future] = deque()
+        self._call_lock = asyncio.Lock()
+        self._subscriptions: Dict[str, AsyncSubscriptionIterator] = {}
 
     @property
     def connected(self) -> bool:
@@ -192,14 +303,60 @@ class AsyncClient:
             await self._connection.connect()
 
             # Perform handshake
-            await self._handshake()
+            if self._call_timeout is not None:
+                await asyncio.wait_for(self._handshake(), timeout=self._call_timeout)
+            else:
+                await self._handshake()
+
+            if self.multiplex:
+                self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+
+            if self.heartbeat_interval and self.supports_ping:
+                self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+            elif self.heartbeat_interval:
+                self.logger.debug("Server does not support PING, heartbeat disabled")
 
             self.logger.info(f"Connected to {self.server_host}:{self.server_port}")
 
+        except ServerBusyError:
+            await self._cleanup()
+            raise
         except Exception as e:
             await self._cleanup()
             raise HTCPConnectionError(f"Failed to connect: {e}") from e
 
+    async def reconnect(self, policy: Optional[ReconnectPolicy] = None) -> None:
+        """
+        Drop the connection, if any, and connect again with backoff.
+
+        Every attempt, the first included, waits a jittered delay from the
+        reconnect policy, so clients dropped together do not return together.
+        A retry-after hint from a server that shed the connection is added on.
+
+        Args:
+            policy: Policy to use instead of the client's reconnect_policy
+
+        Raises:
+            HTCPConnectionError: If the policy's attempts run out
+        """
+        policy = policy or self.reconnect_policy
+        await self.disconnect()
+
+        attempts = 0
+        retry_after = None
+        while True:
+            delay = policy.delay(attempts, retry_after)
+            await asyncio.sleep(delay)
+            try:
+                await self.connect()
+                return
+            except HTCPConnectionError as e:
+                attempts += 1
+                if not policy.should_retry(attempts):
+                    raise
+                retry_after = e.retry_after if isinstance(e, ServerBusyError) else None
+                self.logger.info(f"Reconnect attempt {attempts} failed: {e}")
+
     async def disconnect(self) -> None:
         """Disconnect from the server."""
         if not self._connection.connected:
@@ -217,34 +374,167 @@ class AsyncClient:
 
     async def _cleanup(self) -> None:
         """Clean up connection resources."""
+        tasks = (self._heartbeat_task, self._dispatch_task)
+        self._heartbeat_task = None
+        self._dispatch_task = None
+        for task in tasks:
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
         self._server_name = "unknown"
         self._available_transactions = []
+        self._server_features = []
         await self._connection.disconnect()
 
+    async def _heartbeat_loop(self) -> None:
+        """Ping the server every heartbeat_interval; drop the connection if it stops answering."""
+        try:
+            while self._connection.connected:
+                await asyncio.sleep(self.heartbeat_interval)
+                if not await self._connection.ping(self.heartbeat_timeout):
+                    self.logger.warning(
+                        f"Server {self.server_host}:{self.server_port} did not answer heartbeat"
+                    )
+                    await self._cleanup()
+                    return
+        except HTCPConnectionError as e:
+            self.logger.warning(f"Heartbeat failed: {e}")
+            await self._cleanup()
+        except asyncio.CancelledError:
+            pass
+
+    async def _dispatch_loop(self) -> None:
+        """Route inbound packets to pending calls and subscriptions (multiplex mode)."""
+        try:
+            while True:
+                packet = await self._connection.receive()
+                packet_type = packet.packet_type
+
+                if packet_type == PacketType.TRANSACTION_RESULT or (
+                    packet_type == PacketType.ERROR and self._pending_calls
+                ):
+                    if not self._pending_calls:
+                        self.logger.warning("Dropping transaction result with no pending call")
+                        continue
+                    future = self._pending_calls.popleft()
+                    # A caller that timed out leaves a cancelled future behind
+                    # to keep the remaining results lined up
+                    if not future.done():
+                        future.set_result(packet)
+
+                elif packet_type == PacketType.ERROR:
+                    error = ErrorPacket.from_packet(packet)
+                    for subscription in list(self._subscriptions.values()):
+                        subscription._queue.put_nowait(error)
+
+                elif packet_type in _STREAM_MESSAGES:
+                    message = _parse_stream_packet(packet)
+                    subscription = self._subscriptions.get(message.subscription_id)
+                    if subscription is not None:
+                        subscription._queue.put_nowait(message)
+
+                else:
+                    self.logger.warning(f"Dropping unexpected packet type: {packet_type}")
+
+        except asyncio.CancelledError:
+            pass
+        except HTCPConnectionError as e:
+            self.logger.warning(f"Connection lost: {e}")
+            await self._cleanup()
+        except Exception as e:
+            self.logger.error(f"Dispatch error: {e}")
+            await self._cleanup()
+        finally:
+            while self._pending_calls:
+                future = self._pending_calls.popleft()
+                if not future.done():
+                    future.set_exception(HTCPConnectionError("Connection closed"))
+            for subscription in self._subscriptions.values():
+                subscription._queue.put_nowait(None)
+            self._subscriptions.clear()
+
+    def _route_subscription(self, subscription: AsyncSubscriptionIterator) -> None:
+        """Start routing packets for a subscription to its queue (multiplex mode)."""
+        subscription._queue = asyncio.Queue()
+        self._subscriptions[subscription.subscription_id] = subscription
+
+    def _unroute_subscription(self, subscription: AsyncSubscriptionIterator) -> None:
+        """Stop routing packets for a subscription; later ones are dropped."""
+        self._subscriptions.pop(subscription.subscription_id, None)
+
+    async def _exchange(self, packet: Packet) -> Packet:
+        """
+        Send a transaction call and wait for its result (multiplex mode).
+
+        Raises:
+            HTCPConnectionError: If the connection fails or the result times out
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Queue order must match wire order for results to line up
+        async with self._call_lock:
+            self._pending_calls.append(future)
+            try:
+                await self._connection.send(packet)
+            except Exception:
+                self._pending_calls.remove(future)
+                raise
+
+        if self._call_timeout is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, timeout=self._call_timeout)
+        except asyncio.TimeoutError:
+            raise HTCPConnectionError("Timed out waiting for transaction result") from None
+
     async def _handshake(self) -> None:
-        """Perform handshake with server."""
-        request = HandshakeRequest()
+        """
+        Perform handshake with server.
+
+        After the first connect the cached capabilities hash is sent along;
+        if the server's capabilities are unchanged it only acknowledges the
+        hash and the cached server name and transaction list are reused.
+        """
+        cached = self._capabilities
+        request = HandshakeRequest(
+            capabilities_hash=cached.capabilities_hash if cached else None,
+            features=list(CLIENT_FEATURES)
+        )
         await self._connection.send(request.to_packet())
 
         response_packet = await self._connection.receive()
 
         if response_packet.packet_type == PacketType.ERROR:
             error = ErrorPacket.from_packet(response_packet)
+            if error.error_code == ErrorCode.SERVER_BUSY:
+                raise ServerBusyError(f"Server busy: {error.message}", error.retry_after)
             raise HTCPConnectionError(f"Handshake error: {error.message}")
 
         if response_packet.packet_type != PacketType.HANDSHAKE_RESPONSE:
             raise HTCPConnectionError(f"Unexpected response type: {response_packet.packet_type}")
 
         response = HandshakeResponse.from_packet(response_packet)
+        if response.unchanged:
+            if cached is None or response.capabilities_hash != cached.capabilities_hash:
+                raise HTCPConnectionError("Server acknowledged unknown capabilities")
+            response = cached
+        elif response.capabilities_hash is not None:
+            self._capabilities = response
+
         self._server_name = response.server_name
         self._available_transactions = response.transactions
+        self._server_features = response.features
 
     def server_info(self) -> Dict[str, Any]:
         """
         Get server information.
 
         Returns:
-            Dict with server_name, server_addr (host, port), and connected status
+            Dict with server_name, server_addr (host, port), connected status,
+            available_transactions and the protocol features the server supports
         """
         return {
             "server_name": self._server_name,
@@ -253,16 +543,45 @@ class AsyncClient:
                 "port": self.server_port if self._connection.connected else 0
             },
             "connected": self._connection.connected,
-            "available_transactions": self._available_transactions
+            "available_transactions": self._available_transactions,
+            "features": self._server_features
         }
 
+    @property
+    def supports_ping(self) -> bool:
+        """Check if the server answers protocol PINGs (servers that predate them drop the connection)."""
+        return FEATURE_PING in self._server_features
+
+    async def ping(self, timeout: float = DEFAULT_PING_TIMEOUT) -> bool:
+        """
+        Check that the server answers.
+
+        Against a server that does not support PING nothing is sent and the
+        result is the connection state.
+
+        Args:
+            timeout: Seconds to wait for the server to answer
+
+        Returns:
+            True if the server answered in time, False otherwise
+        """
+        if not self._connection.connected:
+            return False
+        if not self.supports_ping:
+            return True
+        try:
+            return await self._connection.ping(timeout)
+        except HTCPConnectionError:
+            return False
+
     async def call(self, transaction: str, result_type: Type = None, **kwargs) -> Any:
         """
         Call a transaction on the server.
 
         Args:
             transaction: Transaction code to call
-            result_type: Optional expected return type for proper deserialization
+            result_type: Optional expected return type, or a TypedDecoder; the
+                result is decoded straight into it
             **kwargs: Arguments to pass to the transaction
 
         Returns:
@@ -282,17 +601,19 @@ class AsyncClient:
         if not self._connection.connected:
             raise HTCPConnectionError("Not connected to server")
 
-        # Send transaction call
         call = TransactionCall(transaction_code=transaction, arguments=kwargs)
-        await self._connection.send(call.to_packet())
 
         if self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug(f"Called transaction '{transaction}' with args: {kwargs}")
         else:
             self.logger.info(f"Called transaction '{transaction}'")
 
-        # Receive response
-        response_packet = await self._connection.receive()
+        if self.multiplex:
+            response_packet = await self._exchange(call.to_packet())
+        else:
+            # Send transaction call and receive response
+            await self._connection.send(call.to_packet())
+            response_packet = await self._connection.receive()
 
         if response_packet.packet_type == PacketType.ERROR:
             error = ErrorPacket.from_packet(response_packet)
@@ -301,15 +622,11 @@ class AsyncClient:
         if response_packet.packet_type != PacketType.TRANSACTION_RESULT:
             raise RuntimeError(f"Unexpected response type: {response_packet.packet_type}")
 
-        result = TransactionResult.from_packet(response_packet)
+        result = TransactionResult.from_packet(response_packet, result_type)
 
         if not result.success:
             raise RuntimeError(f"Transaction failed: {result.error_message}")
 
-        # Convert result to expected type if specified
-        if result_type is not None and result.result is not None:
-            return convert_to_type(result.result, result_type)
-
         return result.result
 
     def subscribe(
@@ -344,11 +661,6 @@ class AsyncClient:
 
         subscription_id = str(uuid.uuid4())
 
-        # Send subscribe request synchronously (will be awaited by iterator)
-        # Actually we need to send it now
-        import asyncio
-        loop = asyncio.get_event_loop()
-
         # Create and return the iterator - it will send the request
         return _AsyncSubscriptionIteratorWithInit(
             client=self,
@@ -384,13 +696,20 @@ class _AsyncSubscriptionIteratorWithInit(AsyncSubscriptionIterator):
         self._initialized = False
 
     async def __aenter__(self) -> 'AsyncSubscriptionIterator':
+        if self._client.multiplex:
+            self._client._route_subscription(self)
+
         # Send subscribe request
         request = SubscribeRequest(
             subscription_id=self._subscription_id,
             event_type=self._event_type,
             arguments=self._kwargs
         )
-        await self._client._connection.send(request.to_packet())
+        try:
+            await self._client._connection.send(request.to_packet())
+        except Exception:
+            self._client._unroute_subscription(self)
+            raise
 
         if self._client.logger.isEnabledFor(logging.DEBUG):
             self._client.logger.debug(f"Subscribed to '{self._event_type}' with args: {self._kwargs}")
@@ -4,19 +4,24 @@ Async connection management for client.
 """
 
 import asyncio
+import time
+from collections import deque
 from typing import Optional
 
 from ..common.constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_WRITE_TIMEOUT
-from ..common.proto import Packet
+from ..common.proto import Packet, PacketType
+from ..common.messages import PingPacket, PongPacket
 from ..common.aio_transport import recv_packet, send_packet
-from ..exceptions import ConnectionError as HTCPConnectionError
+from ..exceptions import ConnectionError as HTCPConnectionError, TimeoutError as HTCPTimeoutError
 
 
 class AsyncClientConnection:
     """
     Async client connection wrapper.
 
-    Provides async access to socket operations.
+    Provides async access to socket operations. Reads and writes are
+    serialized independently, so a long-running receive (e.g. a
+    subscription) never blocks sends.
     """
 
     def __init__(
@@ -37,6 +42,13 @@ class AsyncClientConnection:
         self._writer: Optional[asyncio.StreamWriter] = None
         self._connected = False
         self._lock = asyncio.Lock()
+        self._read_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+        # Packets read by ping() on behalf of the next receive()
+        self._stash: deque[Packet] = deque()
+        self._activity = asyncio.Event()
+        self.last_activity = 0.0
 
     @property
     def host(self) -> str:
@@ -72,6 +84,8 @@ class AsyncClientConnection:
                     self._reader, self._writer = await coro
 
                 self._connected = True
+                self._stash.clear()
+                self.last_activity = time.monotonic()
 
             except asyncio.TimeoutError:
                 await self._cleanup()
@@ -100,7 +114,7 @@ class AsyncClientConnection:
         Raises:
             HTCPConnectionError: If not connected or send fails
         """
-        async with self._lock:
+        async with self._write_lock:
             if not self._connected or self._writer is None:
                 raise HTCPConnectionError("Not connected")
             try:
@@ -113,20 +127,85 @@ class AsyncClientConnection:
         """
         Receive a packet from server.
 
+        PING packets are answered and PONG packets are consumed here, so
+        callers only ever see application packets.
+
         Returns:
             Received Packet
 
         Raises:
             HTCPConnectionError: If not connected or receive fails
         """
-        async with self._lock:
+        async with self._read_lock:
+            if self._stash:
+                return self._stash.popleft()
+            if not self._connected or self._reader is None:
+                raise HTCPConnectionError("Not connected")
+            try:
+                while True:
+                    packet = await self._read_packet(self._read_timeout)
+                    if packet.packet_type != PacketType.PONG:
+                        return packet
+            except Exception as e:
+                self._connected = False
+                raise HTCPConnectionError(f"Receive failed: {e}") from e
+
+    async def ping(self, timeout: float) -> bool:
+        """
+        Check that the server is alive.
+
+        Sends a PING and waits up to ``timeout`` seconds for any inbound
+        traffic. If another task is reading, its receive() observes the reply;
+        otherwise the reply is read here and any application packet that
+        arrives first is kept for the next receive().
+
+        Args:
+            timeout: Seconds to wait for the server to answer
+
+        Returns:
+            True if the server answered in time, False otherwise
+
+        Raises:
+            HTCPConnectionError: If not connected or the connection fails
+        """
+        sent_at = time.monotonic()
+        self._activity.clear()
+        await self.send(PingPacket().to_packet())
+
+        if self._read_lock.locked():
+            try:
+                await asyncio.wait_for(self._activity.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            return self.last_activity >= sent_at
+
+        async with self._read_lock:
+            if self._stash or self.last_activity >= sent_at:
+                return True
             if not self._connected or self._reader is None:
                 raise HTCPConnectionError("Not connected")
             try:
-                return await recv_packet(self._reader, timeout=self._read_timeout)
+                # Not wait_for(): cancelling between header and payload would desync the stream
+                packet = await self._read_packet(timeout)
+            except HTCPTimeoutError:
+                return False
             except Exception as e:
                 self._connected = False
                 raise HTCPConnectionError(f"Receive failed: {e}") from e
+            if packet.packet_type != PacketType.PONG:
+                self._stash.append(packet)
+            return True
+
+    async def _read_packet(self, timeout: Optional[float]) -> Packet:
+        """Read one packet, answering PINGs. Caller holds the read lock."""
+        while True:
+            packet = await recv_packet(self._reader, timeout=timeout)
+            self.last_activity = time.monotonic()
+            self._activity.set()
+            if packet.packet_type != PacketType.PING:
+                return packet
+            async with self._write_lock:
+                await send_packet(self._writer, PongPacket().to_packet(), self._write_timeout)
 
     async def _cleanup(self) -> None:
         """Clean up connection resources."""
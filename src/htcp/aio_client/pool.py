@@ -0,0 +1,309 @@
+"""
+HTCP Async Client Pool Module
+Pool of async client connections to one server.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from ..common.constants import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WRITE_TIMEOUT,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_POOL_MIN_SIZE,
+    DEFAULT_POOL_MAX_SIZE,
+    DEFAULT_POOL_HEALTH_CHECK_INTERVAL,
+)
+from ..exceptions import ConnectionError as HTCPConnectionError
+
+from .client import AsyncClient
+
+
+class AsyncClientPool:
+    """
+    Pool of AsyncClient connections to one HTCP server.
+
+    Connections are opened lazily: the first call opens one, and another is
+    opened whenever every pooled connection is busy, up to ``max_size``. Each
+    call goes to the connection with the fewest calls in flight. Pooled
+    clients run in multiplex mode, so once the pool is full calls share
+    connections instead of waiting for one to free up.
+
+    Every connection handshakes once when it is opened and keeps the result;
+    the pool caches the server info from the first handshake.
+
+    A maintenance task tops the pool up to ``min_size``. With
+    ``health_check_interval`` set it then wakes every interval to ping idle
+    connections, dropping those that do not answer and closing idle ones
+    above ``min_size`` that were unused for a whole interval.
+
+    Example usage:
+        async with AsyncClientPool(server_host="127.0.0.1", server_port=2353, max_size=4) as pool:
+            results = await asyncio.gather(
+                *(pool.call(transaction="greet", name=name) for name in names)
+            )
+    """
+
+    def __init__(
+        self,
+        server_host: str = "127.0.0.1",
+        server_port: int = 2353,
+        min_size: int = DEFAULT_POOL_MIN_SIZE,
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        logger: Optional[logging.Logger] = None,
+        connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+        write_timeout: Optional[float] = DEFAULT_WRITE_TIMEOUT,
+        health_check_interval: Optional[float] = DEFAULT_POOL_HEALTH_CHECK_INTERVAL,
+        health_check_timeout: float = DEFAULT_PING_TIMEOUT,
+    ):
+        """
+        Initialize client pool.
+
+        Args:
+            server_host: Server host
+            server_port: Server port
+            min_size: Connections kept open once the pool is in use
+            max_size: Maximum number of connections
+            logger: Optional logger
+            connect_timeout: Connect timeout for each connection
+            read_timeout: Per-call result timeout
+            write_timeout: Write timeout for each connection
+            health_check_interval: Seconds between health checks (None to disable)
+            health_check_timeout: Seconds to wait for a health check PONG
+
+        Raises:
+            ValueError: If the sizes are out of range
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.server_host = server_host
+        self.server_port = server_port
+        self.logger = logger or logging.getLogger(__name__)
+        self._min_size = min_size
+        self._max_size = max_size
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._write_timeout = write_timeout
+        self._health_check_interval = health_check_interval
+        self._health_check_timeout = health_check_timeout
+
+        self._clients: List[AsyncClient] = []
+        self._in_flight: Dict[AsyncClient, int] = {}
+        self._last_used: Dict[AsyncClient, float] = {}
+        self._grow_lock = asyncio.Lock()
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._server_name = "unknown"
+        self._available_transactions: list[str] = []
+
+    @property
+    def size(self) -> int:
+        """Number of open connections."""
+        return len(self._clients)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently in flight across the pool."""
+        return sum(self._in_flight.values())
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def server_info(self) -> Dict[str, Any]:
+        """
+        Get cached server information.
+
+        Returns:
+            Dict with server_name, server_addr (host, port), pool size and
+            available transactions from the first handshake
+        """
+        return {
+            "server_name": self._server_name,
+            "server_addr": {"host": self.server_host, "port": self.server_port},
+            "size": len(self._clients),
+            "available_transactions": self._available_transactions,
+        }
+
+    async def call(self, transaction: str, result_type: Type = None, **kwargs) -> Any:
+        """
+        Call a transaction on the least busy pooled connection.
+
+        Args:
+            transaction: Transaction code to call
+            result_type: Optional expected return type for proper deserialization
+            **kwargs: Arguments to pass to the transaction
+
+        Returns:
+            The result of the transaction
+
+        Raises:
+            HTCPConnectionError: If the pool is closed or no connection can be opened
+        """
+        client = await self._acquire()
+        self._in_flight[client] += 1
+        try:
+            return await client.call(transaction, result_type=result_type, **kwargs)
+        finally:
+            if client in self._in_flight:
+                self._in_flight[client] -= 1
+                self._last_used[client] = time.monotonic()
+
+    async def close(self) -> None:
+        """Stop maintenance and disconnect every pooled connection."""
+        self._closed = True
+
+        task = self._maintenance_task
+        self._maintenance_task = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        clients = self._clients
+        self._clients = []
+        self._in_flight.clear()
+        self._last_used.clear()
+        await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+
+    def _least_busy(self) -> Optional[AsyncClient]:
+        """Drop dead connections and return the one with the fewest calls in flight."""
+        for client in [c for c in self._clients if not c.connected]:
+            self._forget(client)
+        if not self._clients:
+            return None
+        return min(self._clients, key=self._in_flight.__getitem__)
+
+    def _can_route(self, client: Optional[AsyncClient]) -> bool:
+        return client is not None and (
+            self._in_flight[client] == 0 or len(self._clients) >= self._max_size
+        )
+
+    async def _acquire(self) -> AsyncClient:
+        """Pick a connection for a call, opening one if all are busy and there is room."""
+        if self._closed:
+            raise HTCPConnectionError("Pool is closed")
+
+        client = self._least_busy()
+        if self._can_route(client):
+            return client
+
+        async with self._grow_lock:
+            client = self._least_busy()
+            if self._can_route(client):
+                return client
+            try:
+                client = await self._open()
+            except HTCPConnectionError:
+                # Fall back to sharing a busy connection
+                client = self._least_busy()
+                if client is None:
+                    raise
+            return client
+
+    async def _open(self) -> AsyncClient:
+        """Open, handshake and register a new pooled connection."""
+        if self._closed:
+            raise HTCPConnectionError("Pool is closed")
+
+        client = AsyncClient(
+            server_host=self.server_host,
+            server_port=self.server_port,
+            logger=self.logger,
+            connect_timeout=self._connect_timeout,
+            read_timeout=self._read_timeout,
+            write_timeout=self._write_timeout,
+            multiplex=True,
+        )
+        await client.connect()
+
+        if self._closed:
+            await client.disconnect()
+            raise HTCPConnectionError("Pool is closed")
+
+        if not self._clients:
+            info = client.server_info()
+            self._server_name = info["server_name"]
+            self._available_transactions = info["available_transactions"]
+
+        self._clients.append(client)
+        self._in_flight[client] = 0
+        self._last_used[client] = time.monotonic()
+
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+        return client
+
+    def _forget(self, client: AsyncClient) -> None:
+        if client in self._in_flight:
+            self._clients.remove(client)
+            del self._in_flight[client]
+            del self._last_used[client]
+
+    async def _fill(self) -> None:
+        """Open connections until the pool holds min_size."""
+        async with self._grow_lock:
+            self._least_busy()
+            missing = self._min_size - len(self._clients)
+            if missing <= 0:
+                return
+            results = await asyncio.gather(
+                *(self._open() for _ in range(missing)), return_exceptions=True
+            )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.warning(f"Pool connection failed: {result}")
+
+    async def _check(self) -> None:
+        """Ping idle connections and shrink back towards min_size."""
+        now = time.monotonic()
+        idle = [c for c in self._clients if self._in_flight[c] == 0]
+        results = await asyncio.gather(
+            *(client.ping(self._health_check_timeout) for client in idle)
+        )
+        for client, alive in zip(idle, results):
+            if not alive:
+                self.logger.warning("Dropping pooled connection that failed health check")
+                self._forget(client)
+                await client.disconnect()
+
+        for client in idle:
+            if len(self._clients) <= self._min_size:
+                break
+            if (
+                client in self._in_flight
+                and self._in_flight[client] == 0
+                and now - self._last_used[client] >= self._health_check_interval
+            ):
+                self._forget(client)
+                await client.disconnect()
+
+    async def _maintenance_loop(self) -> None:
+        try:
+            await self._fill()
+            while self._health_check_interval and not self._closed:
+                await asyncio.sleep(self._health_check_interval)
+                await self._check()
+                await self._fill()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Pool maintenance error: {e}")
+            self._maintenance_task = None
+
+    async def __aenter__(self) -> 'AsyncClientPool':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
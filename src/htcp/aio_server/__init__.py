@@ -2,9 +2,11 @@
 
 from .server import AsyncServer
 from .connection import AsyncServerClientConnection, AsyncConnectionRegistry
+from .timers import IdleTimerWheel
 
 __all__ = [
     'AsyncServer',
     'AsyncServerClientConnection',
     'AsyncConnectionRegistry',
+    'IdleTimerWheel',
 ]
@@ -4,8 +4,11 @@ Async client connection management for server.
 """
 
 import asyncio
+import time
 from typing import Optional, Tuple
 
+from ..server.session import SessionContext
+
 
 class AsyncServerClientConnection:
     """
@@ -29,6 +32,19 @@ class AsyncServerClientConnection:
         self._write_timeout = write_timeout
         self._connected = True
         self._lock = asyncio.Lock()
+        self.session = SessionContext(address)
+
+        # Idle tracking, read by the server's timer wheel
+        self.last_activity = time.monotonic()
+        self.ping_pending = False
+        self.processing = False
+        # Set by the handshake; clients that predate PING are dropped when idle instead
+        self.accepts_ping = False
+
+    def touch(self) -> None:
+        """Record inbound traffic from the client."""
+        self.last_activity = time.monotonic()
+        self.ping_pending = False
 
     @property
     def reader(self) -> asyncio.StreamReader:
@@ -47,7 +63,7 @@ class AsyncServerClientConnection:
 
     @property
     def read_timeout(self) -> Optional[float]:
-        """Get read timeout."""
+        """Get read (idle) timeout."""
         return self._read_timeout
 
     @read_timeout.setter
@@ -87,7 +103,8 @@ class AsyncConnectionRegistry:
     """
     Async registry for active client connections.
 
-    Provides atomic operations for connection management.
+    All operations run on the event loop thread and never await while
+    mutating the registry, so they are atomic without a lock.
     """
 
     def __init__(self, max_connections: int = 0):
@@ -98,10 +115,9 @@ class AsyncConnectionRegistry:
             max_connections: Maximum allowed connections (0 = unlimited)
         """
         self._connections: dict[Tuple[str, int], AsyncServerClientConnection] = {}
-        self._lock = asyncio.Lock()
         self._max_connections = max_connections
 
-    async def try_add(
+    def try_add(
         self,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
@@ -122,18 +138,16 @@ class AsyncConnectionRegistry:
         Returns:
             AsyncServerClientConnection if added successfully, None if limit reached
         """
-        async with self._lock:
-            # Atomic check and add
-            if self._max_connections > 0 and len(self._connections) >= self._max_connections:
-                return None
+        if 0 < self._max_connections <= len(self._connections):
+            return None
 
-            conn = AsyncServerClientConnection(
-                reader, writer, address, read_timeout, write_timeout
-            )
-            self._connections[address] = conn
-            return conn
+        conn = AsyncServerClientConnection(
+            reader, writer, address, read_timeout, write_timeout
+        )
+        self._connections[address] = conn
+        return conn
 
-    async def remove(self, address: Tuple[str, int]) -> Optional[AsyncServerClientConnection]:
+    def remove(self, address: Tuple[str, int]) -> Optional[AsyncServerClientConnection]:
         """
         Remove a connection by address.
 
@@ -143,22 +157,21 @@ class AsyncConnectionRegistry:
         Returns:
             Removed connection or None if not found
         """
-        async with self._lock:
-            return self._connections.pop(address, None)
+        return self._connections.pop(address, None)
 
-    async def get(self, address: Tuple[str, int]) -> Optional[AsyncServerClientConnection]:
+    def get(self, address: Tuple[str, int]) -> Optional[AsyncServerClientConnection]:
         """Get a connection by address."""
-        async with self._lock:
-            return self._connections.get(address)
+        return self._connections.get(address)
 
     async def close_all(self) -> None:
         """Close all connections."""
-        async with self._lock:
-            for conn in self._connections.values():
-                await conn.close()
-            self._connections.clear()
+        closing = list(self._connections.values())
+        self._connections.clear()
+        await asyncio.gather(*(conn.close() for conn in closing), return_exceptions=True)
 
-    async def count(self) -> int:
+    def count(self) -> int:
         """Get current connection count."""
-        async with self._lock:
-            return len(self._connections)
+        return len(self._connections)
+
+    def __len__(self) -> int:
+        return self.count()
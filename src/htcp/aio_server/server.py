@@ -7,14 +7,25 @@ import asyncio
 import inspect
 import logging
 import signal
+import threading
+import time
 
-from typing import Callable, Optional, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Dict, Any, Iterator
 
 from ..common.constants import (
     DEFAULT_LISTEN_BACKLOG,
     DEFAULT_MAX_CONNECTIONS,
     DEFAULT_READ_TIMEOUT,
     DEFAULT_WRITE_TIMEOUT,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_TIMER_RESOLUTION,
+    DEFAULT_SUBSCRIPTION_WORKERS,
+    DEFAULT_SUBSCRIPTION_BATCH_SIZE,
+    REJECT_READ_TIMEOUT,
+    FEATURE_PING,
+    SERVER_FEATURES,
 )
 from ..common.proto import Packet, PacketType, ErrorCode
 from ..common.messages import (
@@ -23,19 +34,25 @@ from ..common.messages import (
     TransactionCall,
     TransactionResult,
     ErrorPacket,
+    PingPacket,
+    PongPacket,
     SubscribeRequest,
     UnsubscribeRequest,
     SubscribeData,
     SubscribeEnd,
     SubscribeError,
 )
-from ..common.aio_transport import recv_packet, send_packet
-from ..common.utils import prepare_arguments
+from ..common.aio_transport import recv_packet, send_packet, send_packets
+from ..common.utils import prepare_arguments, compute_capabilities_hash
 from ..exceptions import ConnectionError as HTCPConnectionError
 
 from ..server.transaction import Transaction, TransactionRegistry
 from ..server.subscription import Subscription, SubscriptionRegistry
+from ..server.session import session_arguments
+from ..server.admission import AdmissionController
+from ..server.metrics import ServerMetrics, STATS_TRANSACTION, UNKNOWN_TRANSACTION
 from .connection import AsyncServerClientConnection, AsyncConnectionRegistry
+from .timers import IdleTimerWheel
 
 
 class AsyncActiveSubscription:
@@ -65,15 +82,115 @@ class AsyncActiveSubscription:
         return self._cancelled
 
 
+class _SyncGeneratorPump:
+    """
+    Drives a sync generator on a worker thread in batches.
+
+    Each executor hop pulls up to ``batch_size`` items. Items are handed to the
+    event loop as soon as they are produced; the loop is woken at most once per
+    drain, so fast generators deliver many items per wakeup while slow ones
+    still deliver every item without delay.
+    """
+
+    def __init__(
+        self,
+        generator: Iterator[Any],
+        loop: asyncio.AbstractEventLoop,
+        batch_size: int
+    ):
+        self._generator = generator
+        self._loop = loop
+        self._batch_size = max(1, batch_size)
+        self._buffer: deque = deque()
+        self._ready = asyncio.Event()
+        self._wake_scheduled = False
+        self._stop = threading.Event()
+        # Makes the worker's "finished, stopped?" and stop()'s "stopped, running?"
+        # atomic, so exactly one of them closes the generator
+        self._lock = threading.Lock()
+
+        self.running = False
+        self.exhausted = False
+        self.error: Optional[BaseException] = None
+
+    def run_batch(self) -> None:
+        """Pull up to batch_size items. Runs on a worker thread."""
+        try:
+            for _ in range(self._batch_size):
+                if self._stop.is_set():
+                    self.exhausted = True
+                    break
+                try:
+                    item = next(self._generator)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+                self._buffer.append(item)
+                self._notify()
+        except BaseException as e:
+            self.error = e
+            self.exhausted = True
+        finally:
+            with self._lock:
+                self.running = False
+                close = self._stop.is_set()
+            if close:
+                self._close_generator()
+            self._notify()
+
+    def drain(self) -> list[Any]:
+        """Take all items produced so far."""
+        items = []
+        while self._buffer:
+            items.append(self._buffer.popleft())
+        return items
+
+    async def wait(self) -> None:
+        """Wait until new items are available or the current batch finished."""
+        await self._ready.wait()
+        self._ready.clear()
+
+    def stop(self) -> None:
+        """Stop pulling items and close the generator."""
+        with self._lock:
+            self._stop.set()
+            close = not self.running
+        if close:
+            self._close_generator()
+
+    def _notify(self) -> None:
+        if not self._wake_scheduled:
+            self._wake_scheduled = True
+            try:
+                self._loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+    def _wake(self) -> None:
+        self._wake_scheduled = False
+        self._ready.set()
+
+    def _close_generator(self) -> None:
+        try:
+            self._generator.close()
+        except Exception:
+            pass
+
+
 class AsyncActiveSubscriptionRegistry:
-    """Async registry for active client subscriptions."""
+    """
+    Async registry for active client subscriptions.
+
+    Operations run on the event loop thread without awaiting, so they are
+    atomic without a lock.
+    """
 
     def __init__(self):
         self._subscriptions: Dict[str, AsyncActiveSubscription] = {}
         self._by_client: Dict[tuple, set[str]] = {}
-        self._lock = asyncio.Lock()
 
-    async def add(
+    def add(
         self,
         subscription_id: str,
         event_type: str,
@@ -81,46 +198,41 @@ class AsyncActiveSubscriptionRegistry:
         task: asyncio.Task
     ) -> AsyncActiveSubscription:
         """Add an active subscription."""
-        async with self._lock:
-            sub = AsyncActiveSubscription(
-                subscription_id, event_type, client_address, task
-            )
-            self._subscriptions[subscription_id] = sub
-
-            if client_address not in self._by_client:
-                self._by_client[client_address] = set()
-            self._by_client[client_address].add(subscription_id)
-
-            return sub
+        sub = AsyncActiveSubscription(
+            subscription_id, event_type, client_address, task
+        )
+        self._subscriptions[subscription_id] = sub
+        self._by_client.setdefault(client_address, set()).add(subscription_id)
+        return sub
 
-    async def get(self, subscription_id: str) -> Optional[AsyncActiveSubscription]:
+    def get(self, subscription_id: str) -> Optional[AsyncActiveSubscription]:
         """Get an active subscription by ID."""
-        async with self._lock:
-            return self._subscriptions.get(subscription_id)
+        return self._subscriptions.get(subscription_id)
 
-    async def remove(self, subscription_id: str) -> Optional[AsyncActiveSubscription]:
+    def remove(self, subscription_id: str) -> Optional[AsyncActiveSubscription]:
         """Remove and return an active subscription."""
-        async with self._lock:
-            sub = self._subscriptions.pop(subscription_id, None)
-            if sub:
-                client_subs = self._by_client.get(sub.client_address)
-                if client_subs:
-                    client_subs.discard(subscription_id)
-                    if not client_subs:
-                        del self._by_client[sub.client_address]
-            return sub
-
-    async def cancel_for_client(self, client_address: tuple) -> list[AsyncActiveSubscription]:
+        sub = self._subscriptions.pop(subscription_id, None)
+        if sub:
+            client_subs = self._by_client.get(sub.client_address)
+            if client_subs:
+                client_subs.discard(subscription_id)
+                if not client_subs:
+                    del self._by_client[sub.client_address]
+        return sub
+
+    def cancel_for_client(self, client_address: tuple) -> list[AsyncActiveSubscription]:
         """Cancel and remove all subscriptions for a client."""
-        async with self._lock:
-            sub_ids = self._by_client.pop(client_address, set())
-            cancelled = []
-            for sub_id in sub_ids:
-                sub = self._subscriptions.pop(sub_id, None)
-                if sub:
-                    sub.cancel()
-                    cancelled.append(sub)
-            return cancelled
+        sub_ids = self._by_client.pop(client_address, set())
+        cancelled = []
+        for sub_id in sub_ids:
+            sub = self._subscriptions.pop(sub_id, None)
+            if sub:
+                sub.cancel()
+                cancelled.append(sub)
+        return cancelled
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
 
 
 class AsyncServer:
@@ -143,6 +255,22 @@ class AsyncServer:
                 await asyncio.sleep(1)
 
         await app.up()
+
+    Connections that stay silent for ``read_timeout`` seconds are sent a PING;
+    if nothing arrives within ``ping_timeout`` after that, the connection is
+    closed. Clients that do not announce PING in their handshake are closed
+    when they go silent instead. Idle tracking runs on a single timer wheel,
+    so reads carry no per-call timeout.
+
+    With ``max_connect_rate`` set, new connections above that rate (per
+    second, after a ``connect_burst``) are shed with a SERVER_BUSY error
+    carrying a retry-after hint, as are connections over ``max_connections``.
+
+    Every transaction is timed per phase (deserialize, prepare, execute,
+    serialize, send) and counted per code along with its payload sizes;
+    stats() returns these with the open connection and subscription counts.
+    With ``expose_stats`` the same data is served as the ``__stats__``
+    transaction.
     """
 
     def __init__(
@@ -156,6 +284,13 @@ class AsyncServer:
         read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
         write_timeout: Optional[float] = DEFAULT_WRITE_TIMEOUT,
         listen_backlog: int = DEFAULT_LISTEN_BACKLOG,
+        ping_timeout: float = DEFAULT_PING_TIMEOUT,
+        timer_resolution: float = DEFAULT_TIMER_RESOLUTION,
+        subscription_workers: int = DEFAULT_SUBSCRIPTION_WORKERS,
+        subscription_batch_size: int = DEFAULT_SUBSCRIPTION_BATCH_SIZE,
+        max_connect_rate: Optional[float] = None,
+        connect_burst: Optional[int] = None,
+        expose_stats: bool = False,
     ):
         self.name = name
         self.host = host
@@ -166,14 +301,30 @@ class AsyncServer:
         self.read_timeout = read_timeout
         self.write_timeout = write_timeout
         self.listen_backlog = listen_backlog
+        self.ping_timeout = ping_timeout
+        self.subscription_workers = subscription_workers
+        self.subscription_batch_size = subscription_batch_size
 
         self._transactions = TransactionRegistry()
         self._subscriptions = SubscriptionRegistry()
         self._active_subscriptions = AsyncActiveSubscriptionRegistry()
+        self._subscription_executor: Optional[ThreadPoolExecutor] = None
         self._server: Optional[asyncio.Server] = None
         self._running = False
         self._clients = AsyncConnectionRegistry(max_connections)
+        self._idle_timers = IdleTimerWheel(self._on_idle_timer, timer_resolution, self.logger)
         self._shutdown_event = asyncio.Event()
+        self._admission = (
+            AdmissionController(max_connect_rate, connect_burst) if max_connect_rate else None
+        )
+        self._metrics = ServerMetrics()
+        if expose_stats:
+            self._transactions.register(STATS_TRANSACTION, self._stats_transaction)
+
+        # Built in up() once the registries are frozen
+        self._capabilities_hash: Optional[str] = None
+        self._handshake_packet: Optional[Packet] = None
+        self._handshake_ack_packet: Optional[Packet] = None
 
     def transaction(self, code: str) -> Callable:
         """
@@ -196,6 +347,21 @@ class AsyncServer:
 
         return decorator
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get server metrics.
+
+        Returns:
+            Dict with uptime, open connections, active subscriptions,
+            connection and subscription counters, and under "transactions"
+            per code: calls, errors by error code, latency histograms (total
+            and per phase, in seconds) and request/response size histograms
+        """
+        return self._metrics.snapshot(len(self._clients), len(self._active_subscriptions))
+
+    async def _stats_transaction(self) -> Dict[str, Any]:
+        return self.stats()
+
     def subscription(self, event_type: str) -> Callable:
         """
         Decorator to register a subscription handler.
@@ -227,6 +393,11 @@ class AsyncServer:
             self.logger.warning("Server is already running")
             return
 
+        # Handlers are fixed from here on; lookups become lock-free reads
+        self._transactions.freeze()
+        self._subscriptions.freeze()
+        self._build_handshake()
+
         self._server = await asyncio.start_server(
             self._handle_client,
             self.host,
@@ -236,6 +407,8 @@ class AsyncServer:
 
         self._running = True
         self._shutdown_event.clear()
+        if self.read_timeout is not None:
+            self._idle_timers.start()
 
         if self.logger.isEnabledFor(logging.INFO):
             self.logger.info(
@@ -274,6 +447,8 @@ class AsyncServer:
         self._running = False
         self._shutdown_event.set()
 
+        await self._idle_timers.stop()
+
         # Close all client connections
         await self._clients.close_all()
 
@@ -283,6 +458,10 @@ class AsyncServer:
             await self._server.wait_closed()
             self._server = None
 
+        if self._subscription_executor:
+            self._subscription_executor.shutdown(wait=False, cancel_futures=True)
+            self._subscription_executor = None
+
         self.logger.info(f"Async server '{self.name}' stopped")
 
     async def _handle_client(
@@ -294,8 +473,17 @@ class AsyncServer:
         peername = writer.get_extra_info('peername')
         address = (peername[0], peername[1]) if peername else ('unknown', 0)
 
+        if self._admission is not None:
+            retry_after = self._admission.try_admit()
+            if retry_after is not None:
+                self._metrics.connection_shed()
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Connection from {address} shed, retry after {retry_after:.2f}s")
+                await self._shed(reader, writer, retry_after)
+                return
+
         # Atomic check-and-add to prevent race condition
-        client = await self._clients.try_add(
+        client = self._clients.try_add(
             reader,
             writer,
             address,
@@ -307,34 +495,44 @@ class AsyncServer:
             self.logger.warning(
                 f"Connection from {address} rejected: max connections ({self.max_connections}) reached"
             )
-            writer.close()
-            await writer.wait_closed()
+            self._metrics.connection_shed()
+            await self._shed(reader, writer, None)
             return
 
-        self.logger.info(f"New connection from {address[0]}:{address[1]}")
+        self._metrics.connection_accepted()
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"New connection from {address[0]}:{address[1]}")
+
+        if client.read_timeout is not None:
+            self._idle_timers.schedule(client, client.read_timeout)
 
         try:
             while self._running and client.connected:
                 try:
-                    packet = await recv_packet(reader, timeout=client.read_timeout)
-                    await self._process_packet(client, packet)
+                    packet = await recv_packet(reader)
+                    client.touch()
+                    client.processing = True
+                    try:
+                        await self._process_packet(client, packet)
+                    finally:
+                        client.processing = False
                 except HTCPConnectionError:
                     break
-                except asyncio.TimeoutError:
-                    self.logger.warning(f"Client {address} timed out")
-                    break
                 except Exception as e:
                     self.logger.error(f"Error processing packet from {address}: {e}")
                     await self._send_error(client, ErrorCode.PROTOCOL_ERROR, str(e))
                     break
 
         finally:
+            self._idle_timers.cancel(client)
+
             # Cancel all active subscriptions for this client
-            await self._active_subscriptions.cancel_for_client(address)
+            self._active_subscriptions.cancel_for_client(address)
 
-            await self._clients.remove(address)
+            self._clients.remove(address)
             await client.close()
-            self.logger.info(f"Client {address[0]}:{address[1]} disconnected")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Client {address[0]}:{address[1]} disconnected")
 
     async def _process_packet(
         self,
@@ -354,6 +552,12 @@ class AsyncServer:
         elif packet.packet_type == PacketType.UNSUBSCRIBE_REQUEST:
             await self._handle_unsubscribe(client, packet)
 
+        elif packet.packet_type == PacketType.PING:
+            await self._send_packet(client, PongPacket().to_packet())
+
+        elif packet.packet_type == PacketType.PONG:
+            pass
+
         elif packet.packet_type == PacketType.DISCONNECT:
             client.connected = False
 
@@ -364,6 +568,75 @@ class AsyncServer:
                 f"Unknown packet type: {packet.packet_type}"
             )
 
+    async def _shed(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        retry_after: Optional[float]
+    ) -> None:
+        """
+        Turn a connection away with a SERVER_BUSY error.
+
+        The client's handshake is read first, so closing does not reset the
+        connection before the client has read the error.
+        """
+        try:
+            await recv_packet(reader, timeout=REJECT_READ_TIMEOUT)
+            error = ErrorPacket(ErrorCode.SERVER_BUSY, "Server busy", retry_after)
+            await send_packet(writer, error.to_packet(), REJECT_READ_TIMEOUT)
+        except Exception:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def _on_idle_timer(self, client: AsyncServerClientConnection) -> None:
+        """Timer wheel callback: probe or reap a quiet connection."""
+        if not client.connected or client.read_timeout is None:
+            return
+
+        if client.processing:
+            # The server itself is busy with this client's request
+            self._idle_timers.schedule(client, client.read_timeout)
+            return
+
+        if not client.ping_pending:
+            idle = time.monotonic() - client.last_activity
+            if idle < client.read_timeout:
+                self._idle_timers.schedule(client, client.read_timeout - idle)
+                return
+
+        # An older client would fail on an unknown packet type, so it is not probed
+        if client.ping_pending or not client.accepts_ping:
+            self.logger.warning(f"Client {client.address} timed out")
+            client.connected = False
+            client.writer.close()
+            return
+
+        client.ping_pending = True
+        try:
+            # Header-only packet: buffered write, no need to wait for drain
+            client.writer.write(PingPacket().to_packet().to_bytes())
+        except Exception as e:
+            self.logger.error(f"Error sending ping: {e}")
+        self._idle_timers.schedule(client, self.ping_timeout)
+
+    def _build_handshake(self) -> None:
+        """Precompute the full and resume handshake responses."""
+        transactions = self._transactions.list_codes() if self.expose_transactions else []
+        features = list(SERVER_FEATURES)
+        self._capabilities_hash = compute_capabilities_hash(self.name, transactions, features)
+        self._handshake_packet = HandshakeResponse(
+            server_name=self.name,
+            transactions=transactions,
+            capabilities_hash=self._capabilities_hash,
+            features=features
+        ).to_packet()
+        self._handshake_ack_packet = HandshakeResponse.acknowledge(self._capabilities_hash).to_packet()
+
     async def _handle_handshake(
         self,
         client: AsyncServerClientConnection,
@@ -371,14 +644,14 @@ class AsyncServer:
     ) -> None:
         """Handle handshake request."""
         try:
-            HandshakeRequest.from_packet(packet)
+            request = HandshakeRequest.from_packet(packet)
+            client.accepts_ping = FEATURE_PING in request.features
 
-            transactions = self._transactions.list_codes() if self.expose_transactions else []
-            response = HandshakeResponse(
-                server_name=self.name,
-                transactions=transactions
-            )
-            await self._send_packet(client, response.to_packet())
+            if request.capabilities_hash is not None and request.capabilities_hash == self._capabilities_hash:
+                response_packet = self._handshake_ack_packet
+            else:
+                response_packet = self._handshake_packet
+            await self._send_packet(client, response_packet)
 
         except Exception as e:
             self.logger.error(f"Handshake error: {e}")
@@ -390,68 +663,100 @@ class AsyncServer:
         packet: Packet
     ) -> None:
         """Handle transaction call."""
+        # perf_counter() at the start and after each of PHASES; None if skipped
+        marks = [time.perf_counter(), None, None, None, None, None]
         try:
             call = TransactionCall.from_packet(packet)
             transaction_code = call.transaction_code
+            marks[1] = time.perf_counter()
 
-            self.logger.info(
-                f"Transaction call '{transaction_code}' from {client.address[0]}:{client.address[1]}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"Transaction call '{transaction_code}' from {client.address[0]}:{client.address[1]}"
+                )
 
             # Find transaction
             trans = self._transactions.get(transaction_code)
             if not trans:
-                self.logger.info(f"Unknown transaction: {transaction_code}")
-                await self._send_result(client, TransactionResult(
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Unknown transaction: {transaction_code}")
+                transaction_code = UNKNOWN_TRANSACTION
+                result = TransactionResult(
                     success=False,
                     error_code=ErrorCode.UNKNOWN_TRANSACTION,
-                    error_message=f"Unknown transaction: {transaction_code}"
-                ))
-                return
-
-            # Prepare arguments with type conversion
-            try:
-                prepared_args = prepare_arguments(trans.func, call.arguments)
-            except Exception as e:
-                self.logger.error(f"Argument preparation error: {e}")
-                await self._send_result(client, TransactionResult(
-                    success=False,
-                    error_code=ErrorCode.INVALID_ARGUMENTS,
-                    error_message=str(e)
-                ))
-                return
-
-            # Execute transaction
-            try:
-                # Support both sync and async handlers
-                if asyncio.iscoroutinefunction(trans.func):
-                    result = await trans.func(**prepared_args)
-                else:
-                    # Run sync function in executor to avoid blocking
-                    loop = asyncio.get_running_loop()
-                    result = await loop.run_in_executor(
-                        None, lambda: trans.func(**prepared_args)
-                    )
-
-                self.logger.debug(f"Transaction '{transaction_code}' completed successfully")
-                await self._send_result(client, TransactionResult(
-                    success=True,
-                    result=result,
-                    error_code=ErrorCode.SUCCESS
-                ))
-
-            except Exception as e:
-                self.logger.error(f"Transaction execution error: {e}")
-                await self._send_result(client, TransactionResult(
-                    success=False,
-                    error_code=ErrorCode.EXECUTION_ERROR,
-                    error_message=str(e)
-                ))
+                    error_message=f"Unknown transaction: {call.transaction_code}"
+                )
+            else:
+                result = await self._execute_transaction(client, trans, call, marks)
+
+            response = result.to_packet()
+            marks[4] = time.perf_counter()
+            await self._send_packet(client, response)
+            marks[5] = time.perf_counter()
+
+            self._metrics.record_transaction(
+                transaction_code,
+                marks,
+                len(packet.payload),
+                len(response.payload),
+                None if result.success else result.error_code.name,
+            )
 
         except Exception as e:
             self.logger.error(f"Transaction handling error: {e}")
             await self._send_error(client, ErrorCode.INTERNAL_ERROR, str(e))
 
+    async def _execute_transaction(
+        self,
+        client: AsyncServerClientConnection,
+        trans: Transaction,
+        call: TransactionCall,
+        marks: list
+    ) -> TransactionResult:
+        """Prepare arguments and run a transaction, marking the end of each phase."""
+        # Prepare arguments with type conversion
+        try:
+            prepared_args = prepare_arguments(
+                trans.func, call.arguments, session_arguments(trans, client.session)
+            )
+        except Exception as e:
+            self.logger.error(f"Argument preparation error: {e}")
+            return TransactionResult(
+                success=False,
+                error_code=ErrorCode.INVALID_ARGUMENTS,
+                error_message=str(e)
+            )
+        marks[2] = time.perf_counter()
+
+        # Execute transaction
+        try:
+            # Support both sync and async handlers
+            if asyncio.iscoroutinefunction(trans.func):
+                result = await trans.func(**prepared_args)
+            else:
+                # Run sync function in executor to avoid blocking
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    None, lambda: trans.func(**prepared_args)
+                )
+        except Exception as e:
+            self.logger.error(f"Transaction execution error: {e}")
+            return TransactionResult(
+                success=False,
+                error_code=ErrorCode.EXECUTION_ERROR,
+                error_message=str(e)
+            )
+        finally:
+            marks[3] = time.perf_counter()
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Transaction '{call.transaction_code}' completed successfully")
+        return TransactionResult(
+            success=True,
+            result=result,
+            error_code=ErrorCode.SUCCESS
+        )
+
     async def _handle_subscribe(
         self,
         client: AsyncServerClientConnection,
@@ -463,15 +768,17 @@ class AsyncServer:
             subscription_id = request.subscription_id
             event_type = request.event_type
 
-            self.logger.info(
-                f"Subscribe request '{event_type}' (id={subscription_id}) "
-                f"from {client.address[0]}:{client.address[1]}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"Subscribe request '{event_type}' (id={subscription_id}) "
+                    f"from {client.address[0]}:{client.address[1]}"
+                )
 
             # Find subscription handler
             sub = self._subscriptions.get(event_type)
             if not sub:
-                self.logger.info(f"Unknown subscription: {event_type}")
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Unknown subscription: {event_type}")
                 await self._send_subscribe_error(
                     client, subscription_id,
                     ErrorCode.UNKNOWN_TRANSACTION,
@@ -481,7 +788,9 @@ class AsyncServer:
 
             # Prepare arguments
             try:
-                prepared_args = prepare_arguments(sub.func, request.arguments)
+                prepared_args = prepare_arguments(
+                    sub.func, request.arguments, session_arguments(sub, client.session)
+                )
             except Exception as e:
                 self.logger.error(f"Subscription argument preparation error: {e}")
                 await self._send_subscribe_error(
@@ -498,15 +807,13 @@ class AsyncServer:
                 )
 
                 # Register active subscription
-                await self._active_subscriptions.add(
+                self._active_subscriptions.add(
                     subscription_id=subscription_id,
                     event_type=event_type,
                     client_address=client.address,
                     task=task
                 )
-
-                # Disable read timeout — subscribed clients don't send packets
-                client.read_timeout = None
+                self._metrics.subscription_started()
 
             except Exception as e:
                 self.logger.error(f"Subscription start error: {e}")
@@ -530,7 +837,7 @@ class AsyncServer:
         """Run subscription generator and send data to client."""
         try:
             # Get the active subscription to check cancellation
-            active_sub = await self._active_subscriptions.get(subscription_id)
+            active_sub = self._active_subscriptions.get(subscription_id)
 
             if sub.is_async:
                 # Async generator
@@ -541,20 +848,10 @@ class AsyncServer:
                     msg = SubscribeData(subscription_id=subscription_id, data=data)
                     await self._send_packet(client, msg.to_packet())
             else:
-                # Sync generator - run in executor
-                loop = asyncio.get_running_loop()
-                generator = sub.func(**prepared_args)
-
-                while True:
-                    if (active_sub and active_sub.is_cancelled) or not client.connected or not self._running:
-                        break
-
-                    try:
-                        data = await loop.run_in_executor(None, next, generator)
-                        msg = SubscribeData(subscription_id=subscription_id, data=data)
-                        await self._send_packet(client, msg.to_packet())
-                    except StopIteration:
-                        break
+                # Sync generator - pull batches on the subscription pool
+                await self._run_sync_generator(
+                    client, subscription_id, sub.func(**prepared_args), active_sub
+                )
 
             # Send end of subscription
             if client.connected and self._running:
@@ -573,9 +870,63 @@ class AsyncServer:
                     str(e)
                 )
         finally:
-            await self._active_subscriptions.remove(subscription_id)
+            self._active_subscriptions.remove(subscription_id)
             self.logger.debug(f"Subscription '{subscription_id}' ended")
 
+    async def _run_sync_generator(
+        self,
+        client: AsyncServerClientConnection,
+        subscription_id: str,
+        generator: Iterator[Any],
+        active_sub: Optional[AsyncActiveSubscription]
+    ) -> None:
+        """Drive a sync generator subscription in batches on the worker pool."""
+        loop = asyncio.get_running_loop()
+        pump = _SyncGeneratorPump(generator, loop, self.subscription_batch_size)
+
+        try:
+            while True:
+                if (active_sub and active_sub.is_cancelled) or not client.connected or not self._running:
+                    break
+
+                pump.running = True
+                try:
+                    loop.run_in_executor(self._get_subscription_executor(), pump.run_batch)
+                except RuntimeError:
+                    pump.running = False
+                    raise
+
+                while True:
+                    await pump.wait()
+                    # Read before draining: everything produced by a finished
+                    # batch is already in the buffer
+                    finished = not pump.running
+                    items = pump.drain()
+                    if items:
+                        packets = [
+                            SubscribeData(subscription_id=subscription_id, data=data).to_packet()
+                            for data in items
+                        ]
+                        await self._send_packets(client, packets)
+                    if finished:
+                        break
+
+                if pump.error is not None:
+                    raise pump.error
+                if pump.exhausted:
+                    break
+        finally:
+            pump.stop()
+
+    def _get_subscription_executor(self) -> ThreadPoolExecutor:
+        """Get the dedicated pool for sync generator subscriptions."""
+        if self._subscription_executor is None:
+            self._subscription_executor = ThreadPoolExecutor(
+                max_workers=self.subscription_workers,
+                thread_name_prefix=f"{self.name}-subscription",
+            )
+        return self._subscription_executor
+
     async def _handle_unsubscribe(
         self,
         client: AsyncServerClientConnection,
@@ -586,15 +937,17 @@ class AsyncServer:
             request = UnsubscribeRequest.from_packet(packet)
             subscription_id = request.subscription_id
 
-            self.logger.info(
-                f"Unsubscribe request (id={subscription_id}) "
-                f"from {client.address[0]}:{client.address[1]}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"Unsubscribe request (id={subscription_id}) "
+                    f"from {client.address[0]}:{client.address[1]}"
+                )
 
-            active_sub = await self._active_subscriptions.remove(subscription_id)
+            active_sub = self._active_subscriptions.remove(subscription_id)
             if active_sub:
                 active_sub.cancel()
-                self.logger.debug(f"Cancelled subscription '{subscription_id}'")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Cancelled subscription '{subscription_id}'")
 
         except Exception as e:
             self.logger.error(f"Unsubscribe handling error: {e}")
@@ -611,13 +964,17 @@ class AsyncServer:
             self.logger.error(f"Error sending packet: {e}")
             client.connected = False
 
-    async def _send_result(
+    async def _send_packets(
         self,
         client: AsyncServerClientConnection,
-        result: TransactionResult
+        packets: list[Packet]
     ) -> None:
-        """Send transaction result to client."""
-        await self._send_packet(client, result.to_packet())
+        """Send several packets to client with a single drain."""
+        try:
+            await send_packets(client.writer, packets, client.write_timeout)
+        except Exception as e:
+            self.logger.error(f"Error sending packets: {e}")
+            client.connected = False
 
     async def _send_error(
         self,
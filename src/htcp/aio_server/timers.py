@@ -0,0 +1,116 @@
+"""
+HTCP Async Server Timers Module
+Timer wheel for connection idle tracking.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from ..common.constants import DEFAULT_TIMER_RESOLUTION
+
+
+class IdleTimerWheel:
+    """
+    Hashed timer wheel driven by a single task.
+
+    Timers are bucketed by tick, so scheduling and cancelling are O(1) and one
+    task serves every connection. Callers are expected to re-arm lazily: record
+    activity on the item itself and, when its timer fires, check whether it is
+    really idle and reschedule for the remainder if not. That keeps the per
+    packet cost at a timestamp write, independent of packet rate.
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[Any], None],
+        resolution: float = DEFAULT_TIMER_RESOLUTION,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize timer wheel.
+
+        Args:
+            on_expire: Called on the event loop with each expired item
+            resolution: Tick length in seconds
+            logger: Optional logger for callback errors
+        """
+        self._on_expire = on_expire
+        self._resolution = resolution
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._buckets: Dict[int, set] = {}
+        self._scheduled: Dict[Hashable, int] = {}
+        self._origin = time.monotonic()
+        self._last_tick = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def resolution(self) -> float:
+        return self._resolution
+
+    def _tick_at(self, moment: float) -> int:
+        return int((moment - self._origin) / self._resolution)
+
+    def schedule(self, item: Hashable, delay: float) -> None:
+        """
+        Arm (or re-arm) the timer for an item.
+
+        The timer fires on the first tick at or after ``delay`` seconds.
+        """
+        self.cancel(item)
+        tick = max(self._tick_at(time.monotonic() + delay) + 1, self._last_tick + 1)
+        self._buckets.setdefault(tick, set()).add(item)
+        self._scheduled[item] = tick
+
+    def cancel(self, item: Hashable) -> None:
+        """Disarm the timer for an item, if any."""
+        tick = self._scheduled.pop(item, None)
+        if tick is not None:
+            bucket = self._buckets.get(tick)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self._buckets[tick]
+
+    def start(self) -> None:
+        """Start the ticking task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the ticking task and drop all timers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._buckets.clear()
+        self._scheduled.clear()
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._resolution)
+            self._advance(self._tick_at(time.monotonic()))
+
+    def _advance(self, now_tick: int) -> None:
+        """Fire every bucket up to and including now_tick."""
+        expired = []
+        for tick in range(self._last_tick + 1, now_tick + 1):
+            bucket = self._buckets.pop(tick, None)
+            if bucket:
+                expired.extend(bucket)
+        self._last_tick = max(self._last_tick, now_tick)
+
+        for item in expired:
+            self._scheduled.pop(item, None)
+            try:
+                self._on_expire(item)
+            except Exception as e:
+                self.logger.error(f"Idle timer callback error: {e}")
@@ -1,6 +1,34 @@
 """HTCP Client Package."""
 
-from .client import Client
-from .connection import ClientConnection
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ['Client', 'ClientConnection']
+from .reconnect import ReconnectPolicy
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .connection import ClientConnection
+    from .pool import ClientPool
+
+# Loaded on first access; the async client only needs ReconnectPolicy
+_LAZY_IMPORTS = {
+    'Client': '.client',
+    'ClientConnection': '.connection',
+    'ClientPool': '.pool',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+__all__ = ['Client', 'ClientConnection', 'ClientPool', 'ReconnectPolicy']
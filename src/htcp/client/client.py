@@ -4,11 +4,19 @@ TCP client for connecting to HTCP servers.
 """
 
 import logging
+import time
 import uuid
 from typing import Any, Dict, Iterator, Optional, Type
 
-from ..common.constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_WRITE_TIMEOUT
-from ..common.proto import Packet, PacketType
+from ..common.constants import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WRITE_TIMEOUT,
+    DEFAULT_PING_TIMEOUT,
+    CLIENT_FEATURES,
+    FEATURE_PING,
+)
+from ..common.proto import Packet, PacketType, ErrorCode
 from ..common.messages import (
     HandshakeRequest,
     HandshakeResponse,
@@ -23,9 +31,10 @@ from ..common.messages import (
     SubscribeError,
 )
 from ..common.utils import convert_to_type
-from ..exceptions import ConnectionError as HTCPConnectionError
+from ..exceptions import ConnectionError as HTCPConnectionError, ServerBusyError
 
 from .connection import ClientConnection
+from .reconnect import ReconnectPolicy
 
 
 class SubscriptionIterator:
@@ -158,10 +167,12 @@ class Client:
         connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
         read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
         write_timeout: Optional[float] = DEFAULT_WRITE_TIMEOUT,
+        reconnect_policy: Optional[ReconnectPolicy] = None,
     ):
         self.server_host = server_host
         self.server_port = server_port
         self.logger = logger or logging.getLogger(__name__)
+        self.reconnect_policy = reconnect_policy or ReconnectPolicy()
 
         self._connection = ClientConnection(
             server_host,
@@ -172,6 +183,9 @@ class Client:
         )
         self._server_name = "unknown"
         self._available_transactions: list[str] = []
+        self._server_features: list[str] = []
+        # Last full handshake, kept across reconnects for session resume
+        self._capabilities: Optional[HandshakeResponse] = None
 
     @property
     def connected(self) -> bool:
@@ -192,10 +206,45 @@ class Client:
 
             self.logger.info(f"Connected to {self.server_host}:{self.server_port}")
 
+        except ServerBusyError:
+            self._cleanup()
+            raise
         except Exception as e:
             self._cleanup()
             raise HTCPConnectionError(f"Failed to connect: {e}") from e
 
+    def reconnect(self, policy: Optional[ReconnectPolicy] = None) -> None:
+        """
+        Drop the connection, if any, and connect again with backoff.
+
+        Every attempt, the first included, waits a jittered delay from the
+        reconnect policy, so clients dropped together do not return together.
+        A retry-after hint from a server that shed the connection is added on.
+
+        Args:
+            policy: Policy to use instead of the client's reconnect_policy
+
+        Raises:
+            HTCPConnectionError: If the policy's attempts run out
+        """
+        policy = policy or self.reconnect_policy
+        self.disconnect()
+
+        attempts = 0
+        retry_after = None
+        while True:
+            delay = policy.delay(attempts, retry_after)
+            time.sleep(delay)
+            try:
+                self.connect()
+                return
+            except HTCPConnectionError as e:
+                attempts += 1
+                if not policy.should_retry(attempts):
+                    raise
+                retry_after = e.retry_after if isinstance(e, ServerBusyError) else None
+                self.logger.info(f"Reconnect attempt {attempts} failed: {e}")
+
     def disconnect(self) -> None:
         """Disconnect from the server."""
         if not self._connection.connected:
@@ -215,32 +264,54 @@ class Client:
         """Clean up connection resources."""
         self._server_name = "unknown"
         self._available_transactions = []
+        self._server_features = []
         self._connection.disconnect()
 
     def _handshake(self) -> None:
-        """Perform handshake with server."""
-        request = HandshakeRequest()
+        """
+        Perform handshake with server.
+
+        After the first connect the cached capabilities hash is sent along;
+        if the server's capabilities are unchanged it only acknowledges the
+        hash and the cached server name and transaction list are reused.
+        """
+        cached = self._capabilities
+        request = HandshakeRequest(
+            capabilities_hash=cached.capabilities_hash if cached else None,
+            features=list(CLIENT_FEATURES)
+        )
         self._connection.send(request.to_packet())
 
         response_packet = self._connection.receive()
 
         if response_packet.packet_type == PacketType.ERROR:
             error = ErrorPacket.from_packet(response_packet)
+            if error.error_code == ErrorCode.SERVER_BUSY:
+                raise ServerBusyError(f"Server busy: {error.message}", error.retry_after)
             raise HTCPConnectionError(f"Handshake error: {error.message}")
 
         if response_packet.packet_type != PacketType.HANDSHAKE_RESPONSE:
             raise HTCPConnectionError(f"Unexpected response type: {response_packet.packet_type}")
 
         response = HandshakeResponse.from_packet(response_packet)
+        if response.unchanged:
+            if cached is None or response.capabilities_hash != cached.capabilities_hash:
+                raise HTCPConnectionError("Server acknowledged unknown capabilities")
+            response = cached
+        elif response.capabilities_hash is not None:
+            self._capabilities = response
+
         self._server_name = response.server_name
         self._available_transactions = response.transactions
+        self._server_features = response.features
 
     def server_info(self) -> Dict[str, Any]:
         """
         Get server information.
 
         Returns:
-            Dict with server_name, server_addr (host, port), and connected status
+            Dict with server_name, server_addr (host, port), connected status,
+            available_transactions and the protocol features the server supports
         """
         return {
             "server_name": self._server_name,
@@ -249,9 +320,39 @@ class Client:
                 "port": self.server_port if self._connection.connected else 0
             },
             "connected": self._connection.connected,
-            "available_transactions": self._available_transactions
+            "available_transactions": self._available_transactions,
+            "features": self._server_features
         }
 
+    @property
+    def supports_ping(self) -> bool:
+        """Check if the server answers protocol PINGs (servers that predate them drop the connection)."""
+        return FEATURE_PING in self._server_features
+
+    def ping(self, timeout: float = DEFAULT_PING_TIMEOUT) -> bool:
+        """
+        Check that the server answers.
+
+        Must not be used while a subscription is being read on this client.
+
+        Against a server that does not support PING nothing is sent and the
+        result is the connection state.
+
+        Args:
+            timeout: Seconds to wait for the server to answer
+
+        Returns:
+            True if the server answered in time, False otherwise
+        """
+        if not self._connection.connected:
+            return False
+        if not self.supports_ping:
+            return True
+        try:
+            return self._connection.ping(timeout)
+        except HTCPConnectionError:
+            return False
+
     def call(self, transaction: str, result_type: Type = None, **kwargs) -> Any:
         """
         Call a transaction on the server.
@@ -260,7 +361,8 @@ class Client:
 
         Args:
             transaction: Transaction code to call
-            result_type: Optional expected return type for proper deserialization
+            result_type: Optional expected return type, or a TypedDecoder; the
+                result is decoded straight into it
             **kwargs: Arguments to pass to the transaction
 
         Returns:
@@ -299,15 +401,11 @@ class Client:
         if response_packet.packet_type != PacketType.TRANSACTION_RESULT:
             raise RuntimeError(f"Unexpected response type: {response_packet.packet_type}")
 
-        result = TransactionResult.from_packet(response_packet)
+        result = TransactionResult.from_packet(response_packet, result_type)
 
         if not result.success:
             raise RuntimeError(f"Transaction failed: {result.error_message}")
 
-        # Convert result to expected type if specified
-        if result_type is not None and result.result is not None:
-            return convert_to_type(result.result, result_type)
-
         return result.result
 
     def subscribe(
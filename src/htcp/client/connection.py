@@ -8,7 +8,8 @@ import threading
 from typing import Optional
 
 from ..common.constants import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_WRITE_TIMEOUT
-from ..common.proto import Packet
+from ..common.proto import Packet, PacketType
+from ..common.messages import PingPacket, PongPacket
 from ..common.transport import recv_packet, send_packet
 from ..exceptions import ConnectionError as HTCPConnectionError
 
@@ -118,6 +119,9 @@ class ClientConnection:
         """
         Receive a packet from server.
 
+        PING packets are answered and PONG packets are consumed here, so
+        callers only ever see application packets.
+
         Returns:
             Received Packet
 
@@ -128,11 +132,55 @@ class ClientConnection:
             if not self._connected or self._socket is None:
                 raise HTCPConnectionError("Not connected")
             try:
-                return recv_packet(self._socket)
+                while True:
+                    packet = recv_packet(self._socket)
+                    if packet.packet_type == PacketType.PING:
+                        send_packet(self._socket, PongPacket().to_packet())
+                    elif packet.packet_type != PacketType.PONG:
+                        return packet
             except Exception as e:
                 self._connected = False
                 raise HTCPConnectionError(f"Receive failed: {e}") from e
 
+    def ping(self, timeout: float) -> bool:
+        """
+        Check that the server is alive.
+
+        Meant for idle connections: sends a PING and reads until the PONG, so
+        nothing else may be in flight on this connection.
+
+        Args:
+            timeout: Seconds to wait for the server to answer
+
+        Returns:
+            True if the server answered in time, False otherwise
+
+        Raises:
+            HTCPConnectionError: If not connected or the connection fails
+        """
+        with self._lock:
+            if not self._connected or self._socket is None:
+                raise HTCPConnectionError("Not connected")
+            previous_timeout = self._socket.gettimeout()
+            try:
+                self._socket.settimeout(timeout)
+                send_packet(self._socket, PingPacket().to_packet())
+                while True:
+                    packet = recv_packet(self._socket)
+                    if packet.packet_type == PacketType.PONG:
+                        return True
+                    if packet.packet_type == PacketType.PING:
+                        send_packet(self._socket, PongPacket().to_packet())
+            except socket.timeout:
+                # Nothing of a packet was read; a later PONG is skipped by receive()
+                return False
+            except Exception as e:
+                self._connected = False
+                raise HTCPConnectionError(f"Ping failed: {e}") from e
+            finally:
+                if self._socket is not None:
+                    self._socket.settimeout(previous_timeout)
+
     def _cleanup_socket(self) -> None:
         """Clean up socket resources."""
         if self._socket is not None:
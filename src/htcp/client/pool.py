@@ -0,0 +1,330 @@
+"""
+HTCP Client Pool Module
+Thread-safe pool of client connections to one server.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from ..common.constants import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WRITE_TIMEOUT,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_POOL_MIN_SIZE,
+    DEFAULT_POOL_MAX_SIZE,
+    DEFAULT_POOL_HEALTH_CHECK_INTERVAL,
+)
+from ..exceptions import ConnectionError as HTCPConnectionError
+
+from .client import Client
+
+
+class ClientPool:
+    """
+    Thread-safe pool of Client connections to one HTCP server.
+
+    A call checks out a connection for its whole round trip, so calls from
+    different threads never wait on each other's socket. Idle connections are
+    reused most-recently-used first; when none is idle a new one is opened,
+    up to ``max_size``, after which callers wait for a connection to be
+    checked back in. Connections are opened lazily and each handshakes once
+    when opened; the pool caches the server info from the first handshake.
+
+    A daemon thread tops the pool up to ``min_size``. With
+    ``health_check_interval`` set it then wakes every interval to ping idle
+    connections, dropping those that do not answer and closing idle ones
+    above ``min_size`` that were unused for a whole interval.
+
+    Example usage:
+        with ClientPool(server_host="127.0.0.1", server_port=2353, max_size=4) as pool:
+            result = pool.call(transaction="greet", name="World")
+    """
+
+    def __init__(
+        self,
+        server_host: str = "127.0.0.1",
+        server_port: int = 2353,
+        min_size: int = DEFAULT_POOL_MIN_SIZE,
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        logger: Optional[logging.Logger] = None,
+        connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+        write_timeout: Optional[float] = DEFAULT_WRITE_TIMEOUT,
+        health_check_interval: Optional[float] = DEFAULT_POOL_HEALTH_CHECK_INTERVAL,
+        health_check_timeout: float = DEFAULT_PING_TIMEOUT,
+    ):
+        """
+        Initialize client pool.
+
+        Args:
+            server_host: Server host
+            server_port: Server port
+            min_size: Connections kept open once the pool is in use
+            max_size: Maximum number of connections
+            logger: Optional logger
+            connect_timeout: Connect timeout for each connection
+            read_timeout: Read timeout for each connection
+            write_timeout: Write timeout for each connection
+            health_check_interval: Seconds between health checks (None to disable)
+            health_check_timeout: Seconds to wait for a health check PONG
+
+        Raises:
+            ValueError: If the sizes are out of range
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.server_host = server_host
+        self.server_port = server_port
+        self.logger = logger or logging.getLogger(__name__)
+        self._min_size = min_size
+        self._max_size = max_size
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._write_timeout = write_timeout
+        self._health_check_interval = health_check_interval
+        self._health_check_timeout = health_check_timeout
+
+        self._condition = threading.Condition()
+        self._idle: List[Client] = []
+        self._last_used: Dict[Client, float] = {}
+        self._size = 0  # open connections plus ones being opened
+        self._closed = False
+        self._stop_event = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+
+        self._server_name = "unknown"
+        self._available_transactions: list[str] = []
+
+    @property
+    def size(self) -> int:
+        """Number of open connections."""
+        with self._condition:
+            return self._size
+
+    @property
+    def idle(self) -> int:
+        """Number of connections not checked out."""
+        with self._condition:
+            return len(self._idle)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def server_info(self) -> Dict[str, Any]:
+        """
+        Get cached server information.
+
+        Returns:
+            Dict with server_name, server_addr (host, port), pool size and
+            available transactions from the first handshake
+        """
+        return {
+            "server_name": self._server_name,
+            "server_addr": {"host": self.server_host, "port": self.server_port},
+            "size": self.size,
+            "available_transactions": self._available_transactions,
+        }
+
+    def call(
+        self,
+        transaction: str,
+        result_type: Type = None,
+        acquire_timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Call a transaction on an idle pooled connection.
+
+        This method is thread-safe.
+
+        Args:
+            transaction: Transaction code to call
+            result_type: Optional expected return type for proper deserialization
+            acquire_timeout: Seconds to wait for a connection when the pool is full (None waits forever)
+            **kwargs: Arguments to pass to the transaction
+
+        Returns:
+            The result of the transaction
+
+        Raises:
+            HTCPConnectionError: If the pool is closed, no connection frees up
+                in time, or no connection can be opened
+        """
+        client = self._checkout(acquire_timeout)
+        try:
+            return client.call(transaction, result_type=result_type, **kwargs)
+        finally:
+            self._checkin(client)
+
+    def close(self) -> None:
+        """
+        Stop maintenance and disconnect every idle connection.
+
+        Checked-out connections are disconnected when they are checked in.
+        """
+        with self._condition:
+            self._closed = True
+            clients = self._idle
+            self._idle = []
+            for client in clients:
+                self._forget(client)
+            self._condition.notify_all()
+
+        self._stop_event.set()
+        thread = self._maintenance_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+        for client in clients:
+            client.disconnect()
+
+    def _checkout(self, timeout: Optional[float]) -> Client:
+        """Take an idle connection, opening one if there is room."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise HTCPConnectionError("Pool is closed")
+                while self._idle:
+                    client = self._idle.pop()
+                    if client.connected:
+                        return client
+                    self._forget(client)
+                if self._size < self._max_size:
+                    self._size += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise HTCPConnectionError("Timed out waiting for a pooled connection")
+                self._condition.wait(remaining)
+
+        # Connect outside the lock; the slot is already reserved
+        return self._open()
+
+    def _checkin(self, client: Client) -> None:
+        """Return a connection to the pool, dropping it if it is dead or the pool is closed."""
+        with self._condition:
+            keep = client.connected and not self._closed
+            if keep:
+                self._idle.append(client)
+                self._last_used[client] = time.monotonic()
+            else:
+                self._forget(client)
+            self._condition.notify()
+        if not keep:
+            client.disconnect()
+
+    def _open(self) -> Client:
+        """Open and handshake a connection for a reserved slot."""
+        client = Client(
+            server_host=self.server_host,
+            server_port=self.server_port,
+            logger=self.logger,
+            connect_timeout=self._connect_timeout,
+            read_timeout=self._read_timeout,
+            write_timeout=self._write_timeout,
+        )
+        try:
+            client.connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            if self._server_name == "unknown":
+                info = client.server_info()
+                self._server_name = info["server_name"]
+                self._available_transactions = info["available_transactions"]
+            self._last_used[client] = time.monotonic()
+            if self._maintenance_thread is None and not self._closed:
+                self._maintenance_thread = threading.Thread(
+                    target=self._maintenance_loop,
+                    name=f"htcp-pool-{self.server_host}:{self.server_port}",
+                    daemon=True,
+                )
+                self._maintenance_thread.start()
+        return client
+
+    def _forget(self, client: Client) -> None:
+        """Release a connection's slot. Caller holds the condition."""
+        if self._last_used.pop(client, None) is not None:
+            self._size -= 1
+
+    def _fill(self) -> None:
+        """Open connections until the pool holds min_size."""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self._min_size:
+                    return
+                self._size += 1
+            try:
+                client = self._open()
+            except Exception as e:
+                self.logger.warning(f"Pool connection failed: {e}")
+                return
+            self._checkin(client)
+
+    def _check(self) -> None:
+        """Ping idle connections and shrink back towards min_size."""
+        with self._condition:
+            clients = self._idle
+            self._idle = []
+
+        now = time.monotonic()
+        for client in clients:
+            if not client.ping(self._health_check_timeout):
+                self.logger.warning("Dropping pooled connection that failed health check")
+                with self._condition:
+                    self._forget(client)
+                    self._condition.notify()
+                client.disconnect()
+                continue
+
+            with self._condition:
+                retire = (
+                    self._size > self._min_size
+                    and now - self._last_used[client] >= self._health_check_interval
+                )
+                if retire:
+                    self._forget(client)
+            if retire:
+                client.disconnect()
+
+        with self._condition:
+            kept = [c for c in clients if c in self._last_used]
+            if self._closed:
+                for client in kept:
+                    self._forget(client)
+            else:
+                # Pinging did not count as use
+                self._idle[:0] = kept
+                self._condition.notify_all()
+                kept = []
+        for client in kept:
+            client.disconnect()
+
+    def _maintenance_loop(self) -> None:
+        try:
+            self._fill()
+            while self._health_check_interval and not self._closed:
+                if self._stop_event.wait(self._health_check_interval):
+                    return
+                self._check()
+                self._fill()
+        except Exception as e:
+            self.logger.error(f"Pool maintenance error: {e}")
+
+    def __enter__(self) -> 'ClientPool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,76 @@
+"""
+HTCP Client Reconnect Module
+Backoff policy for reconnecting clients.
+"""
+
+import random
+from typing import Optional
+
+from ..common.constants import (
+    DEFAULT_RECONNECT_BASE_DELAY,
+    DEFAULT_RECONNECT_MAX_DELAY,
+    DEFAULT_RECONNECT_MULTIPLIER,
+)
+
+
+class ReconnectPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    The delay before retry ``attempt`` (counting from 0) is drawn uniformly
+    from ``[0, min(max_delay, base_delay * multiplier ** attempt)]``, so
+    clients that lost the same server at the same moment come back spread
+    out rather than in lockstep. A retry-after hint from the server is a
+    floor that the jittered delay is added to.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = DEFAULT_RECONNECT_BASE_DELAY,
+        max_delay: float = DEFAULT_RECONNECT_MAX_DELAY,
+        multiplier: float = DEFAULT_RECONNECT_MULTIPLIER,
+        max_attempts: Optional[int] = None,
+    ):
+        """
+        Initialize reconnect policy.
+
+        Args:
+            base_delay: Backoff ceiling for the first retry, in seconds
+            max_delay: Cap on the backoff ceiling, in seconds
+            multiplier: Growth factor of the ceiling per attempt
+            max_attempts: Connect attempts before giving up (None retries forever)
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_attempts = max_attempts
+
+    def backoff(self, attempt: int) -> float:
+        """Get the backoff ceiling for an attempt."""
+        # Stop growing once capped, so large attempt counts cannot overflow
+        ceiling = self.base_delay
+        for _ in range(attempt):
+            ceiling *= self.multiplier
+            if ceiling >= self.max_delay:
+                return self.max_delay
+        return min(ceiling, self.max_delay)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Get the delay before a retry.
+
+        Args:
+            attempt: Zero-based index of the attempt about to be made
+            retry_after: Optional server hint in seconds
+
+        Returns:
+            Seconds to wait
+        """
+        delay = random.uniform(0, self.backoff(attempt))
+        if retry_after is not None:
+            delay += retry_after
+        return delay
+
+    def should_retry(self, attempts: int) -> bool:
+        """Check if another attempt is allowed after ``attempts`` failures."""
+        return self.max_attempts is None or attempts < self.max_attempts
@@ -8,10 +8,23 @@ from .constants import (
     DEFAULT_CONNECT_TIMEOUT,
     DEFAULT_READ_TIMEOUT,
     DEFAULT_WRITE_TIMEOUT,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_TIMER_RESOLUTION,
     DEFAULT_LISTEN_BACKLOG,
     DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_CONNECTION_SHARDS,
+    REJECT_READ_TIMEOUT,
+    DEFAULT_RECONNECT_BASE_DELAY,
+    DEFAULT_RECONNECT_MAX_DELAY,
+    DEFAULT_RECONNECT_MULTIPLIER,
+    DEFAULT_POOL_MIN_SIZE,
+    DEFAULT_POOL_MAX_SIZE,
+    DEFAULT_POOL_HEALTH_CHECK_INTERVAL,
+    DEFAULT_SUBSCRIPTION_WORKERS,
+    DEFAULT_SUBSCRIPTION_BATCH_SIZE,
 )
 from .serialization import serialize, deserialize, TypeTag
+from .decoding import TypedDecoder, compile_decoder
 from .proto import Packet, PacketType, ErrorCode
 from .messages import (
     HandshakeRequest,
@@ -20,6 +33,8 @@ from .messages import (
     TransactionResult,
     ErrorPacket,
     DisconnectPacket,
+    PingPacket,
+    PongPacket,
     SubscribeRequest,
     UnsubscribeRequest,
     SubscribeData,
@@ -33,14 +48,19 @@ __all__ = [
     # Constants
     'MAGIC_BYTES', 'PROTOCOL_VERSION', 'HEADER_SIZE', 'MAX_PAYLOAD_SIZE',
     'DEFAULT_CONNECT_TIMEOUT', 'DEFAULT_READ_TIMEOUT', 'DEFAULT_WRITE_TIMEOUT',
-    'DEFAULT_LISTEN_BACKLOG', 'DEFAULT_MAX_CONNECTIONS',
+    'DEFAULT_PING_TIMEOUT', 'DEFAULT_TIMER_RESOLUTION',
+    'DEFAULT_LISTEN_BACKLOG', 'DEFAULT_MAX_CONNECTIONS', 'DEFAULT_CONNECTION_SHARDS',
+    'REJECT_READ_TIMEOUT', 'DEFAULT_RECONNECT_BASE_DELAY', 'DEFAULT_RECONNECT_MAX_DELAY',
+    'DEFAULT_RECONNECT_MULTIPLIER',
+    'DEFAULT_POOL_MIN_SIZE', 'DEFAULT_POOL_MAX_SIZE', 'DEFAULT_POOL_HEALTH_CHECK_INTERVAL',
+    'DEFAULT_SUBSCRIPTION_WORKERS', 'DEFAULT_SUBSCRIPTION_BATCH_SIZE',
     # Serialization
-    'serialize', 'deserialize', 'TypeTag',
+    'serialize', 'deserialize', 'TypeTag', 'TypedDecoder', 'compile_decoder',
     # Protocol
     'Packet', 'PacketType', 'ErrorCode',
     # Messages
     'HandshakeRequest', 'HandshakeResponse', 'TransactionCall',
-    'TransactionResult', 'ErrorPacket', 'DisconnectPacket',
+    'TransactionResult', 'ErrorPacket', 'DisconnectPacket', 'PingPacket', 'PongPacket',
     'SubscribeRequest', 'UnsubscribeRequest', 'SubscribeData',
     'SubscribeEnd', 'SubscribeError',
     # Transport
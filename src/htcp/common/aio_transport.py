@@ -11,6 +11,7 @@ from .constants import MAGIC_BYTES, PROTOCOL_VERSION, HEADER_SIZE, MAX_PAYLOAD_S
 from ..exceptions import (
     ConnectionError as HTCPConnectionError,
     ProtocolError,
+    TimeoutError as HTCPTimeoutError,
     MaxPayloadExceededError,
     UnknownPacketTypeError,
 )
@@ -34,7 +35,8 @@ async def recv_exact(
 
     Raises:
         HTCPConnectionError: If connection is closed before receiving all bytes
-        TimeoutError: If operation times out
+        TimeoutError: If operation times out; readexactly() only consumes
+            once all bytes are there, so nothing has been read
     """
     try:
         if timeout is not None:
@@ -47,7 +49,7 @@ async def recv_exact(
             f"Connection closed while reading (got {len(e.partial)}/{size} bytes)"
         ) from e
     except asyncio.TimeoutError:
-        raise HTCPConnectionError("Read timeout") from None
+        raise HTCPTimeoutError("Read timeout") from None
 
 
 async def recv_packet(
@@ -61,13 +63,16 @@ async def recv_packet(
     Args:
         reader: Async stream reader
         max_payload_size: Maximum allowed payload size
-        timeout: Optional timeout in seconds
+        timeout: Optional timeout in seconds, for the header and the payload each
 
     Returns:
         Received Packet object
 
     Raises:
-        HTCPConnectionError: If connection is closed
+        HTCPConnectionError: If connection is closed, or the payload times out
+            after the header was read
+        TimeoutError: If no header arrives in time; the stream is untouched
+            and reading may go on
         ProtocolError: If packet is malformed
         MaxPayloadExceededError: If payload exceeds max size
         UnknownPacketTypeError: If packet type is unknown
@@ -104,7 +109,10 @@ async def recv_packet(
     # Read payload
     payload = b''
     if payload_length > 0:
-        payload = await recv_exact(reader, payload_length, timeout)
+        try:
+            payload = await recv_exact(reader, payload_length, timeout)
+        except HTCPTimeoutError as e:
+            raise HTCPConnectionError("Timed out between packet header and payload") from e
 
     return Packet(packet_type, payload)
 
@@ -135,3 +143,31 @@ async def send_packet(
         raise HTCPConnectionError(f"Failed to send packet: {e}") from e
     except asyncio.TimeoutError:
         raise HTCPConnectionError("Write timeout") from None
+
+
+async def send_packets(
+    writer: asyncio.StreamWriter,
+    packets: list['Packet'],
+    timeout: Optional[float] = None
+) -> None:
+    """
+    Send several packets over async stream with a single drain.
+
+    Args:
+        writer: Async stream writer
+        packets: Packets to send, in order
+        timeout: Optional timeout in seconds
+
+    Raises:
+        HTCPConnectionError: If connection is closed
+    """
+    try:
+        writer.writelines([packet.to_bytes() for packet in packets])
+        if timeout is not None:
+            await asyncio.wait_for(writer.drain(), timeout=timeout)
+        else:
+            await writer.drain()
+    except (BrokenPipeError, ConnectionResetError, OSError) as e:
+        raise HTCPConnectionError(f"Failed to send packets: {e}") from e
+    except asyncio.TimeoutError:
+        raise HTCPConnectionError("Write timeout") from None
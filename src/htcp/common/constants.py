@@ -7,6 +7,14 @@ Protocol constants and configuration values.
 MAGIC_BYTES = b'HTCP'
 PROTOCOL_VERSION = 1
 
+# Optional protocol features a server advertises in its handshake; clients
+# only use them with servers that list them
+FEATURE_PING = "ping"
+SERVER_FEATURES = (FEATURE_PING,)
+# Features a client announces in its handshake request; a server only sends
+# PING to clients that list it, and drops other idle clients as before
+CLIENT_FEATURES = (FEATURE_PING,)
+
 # Packet structure sizes
 HEADER_SIZE = 12  # MAGIC(4) + VERSION(1) + TYPE(1) + LENGTH(4) + RESERVED(2)
 
@@ -17,7 +25,31 @@ MAX_PAYLOAD_SIZE = 16 * 1024 * 1024  # 16 MB default max payload
 DEFAULT_CONNECT_TIMEOUT = 30.0
 DEFAULT_READ_TIMEOUT = 60.0
 DEFAULT_WRITE_TIMEOUT = 60.0
+DEFAULT_PING_TIMEOUT = 10.0
+
+# Idle timer wheel tick (in seconds)
+DEFAULT_TIMER_RESOLUTION = 1.0
 
 # Server configuration
 DEFAULT_LISTEN_BACKLOG = 128
 DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_CONNECTION_SHARDS = 16
+
+# Connection shedding: how long to wait for a shed client's first packet
+REJECT_READ_TIMEOUT = 1.0
+# Threads turning shed connections away (sync server); beyond that they are just closed
+DEFAULT_SHED_WORKERS = 4
+
+# Client reconnect backoff (in seconds)
+DEFAULT_RECONNECT_BASE_DELAY = 0.5
+DEFAULT_RECONNECT_MAX_DELAY = 30.0
+DEFAULT_RECONNECT_MULTIPLIER = 2.0
+
+# Client pools
+DEFAULT_POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 8
+DEFAULT_POOL_HEALTH_CHECK_INTERVAL = 30.0
+
+# Sync generator subscriptions (async server)
+DEFAULT_SUBSCRIPTION_WORKERS = 32
+DEFAULT_SUBSCRIPTION_BATCH_SIZE = 64
@@ -0,0 +1,309 @@
+"""
+HTCP Decoding Module
+Typed decoders compiled once per expected type.
+"""
+
+import dataclasses
+import functools
+import struct
+
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+from .serialization import TypeTag, deserialize, _unpack_length
+from .utils import convert_to_type
+
+
+# Reads one value at an offset, returns (value, offset after it)
+DecodeFn = Callable[[bytes, int], Tuple[Any, int]]
+
+_SEQUENCE_TAGS = frozenset((TypeTag.LIST, TypeTag.TUPLE, TypeTag.SET, TypeTag.FROZENSET))
+# Decoded exactly as deserialize() returns them
+_PLAIN_TYPES = frozenset((str, int, float, bool, bytes, type(None), list, dict))
+
+
+_unpack_int = struct.Struct('>q').unpack_from
+_unpack_float = struct.Struct('>d').unpack_from
+_unpack_len = struct.Struct('>I').unpack_from
+
+
+def _read_str(data: bytes, offset: int) -> Tuple[str, int]:
+    end = offset + 4 + _unpack_len(data, offset)[0]
+    return data[offset + 4:end].decode('utf-8'), end
+
+
+def _read_list(data: bytes, offset: int) -> Tuple[list, int]:
+    items = []
+    append = items.append
+    offset += 4
+    for _ in range(_unpack_len(data, offset - 4)[0]):
+        item, offset = _decode_any(data, offset)
+        append(item)
+    return items, offset
+
+
+def _read_dict(data: bytes, offset: int) -> Tuple[dict, int]:
+    result = {}
+    offset += 4
+    for _ in range(_unpack_len(data, offset - 4)[0]):
+        key, offset = _decode_any(data, offset)
+        result[key], offset = _decode_any(data, offset)
+    return result, offset
+
+
+# Readers for the tags that make up most payloads; they get the offset after the tag
+_READERS = {
+    TypeTag.NONE: lambda data, offset: (None, offset),
+    TypeTag.BOOL_TRUE: lambda data, offset: (True, offset),
+    TypeTag.BOOL_FALSE: lambda data, offset: (False, offset),
+    TypeTag.INT: lambda data, offset: (_unpack_int(data, offset)[0], offset + 8),
+    TypeTag.INT_NEGATIVE: lambda data, offset: (_unpack_int(data, offset)[0], offset + 8),
+    TypeTag.FLOAT: lambda data, offset: (_unpack_float(data, offset)[0], offset + 8),
+    TypeTag.STR: _read_str,
+    TypeTag.LIST: _read_list,
+    TypeTag.DICT: _read_dict,
+}
+_reader_for = _READERS.get
+
+
+def _decode_any(data: bytes, offset: int) -> Tuple[Any, int]:
+    """Decode an untyped value, as deserialize() would."""
+    reader = _reader_for(data[offset])
+    if reader is not None:
+        return reader(data, offset + 1)
+    return deserialize(data, None, offset)
+
+
+class TypedDecoder:
+    """
+    Decoder for one expected type.
+
+    deserialize() works out the expected type again at every nested value
+    and returns dataclasses that were sent as dicts as plain dicts, which
+    convert_to_type then walks a second time. A TypedDecoder resolves the
+    whole type tree once, when it is built, and then reads values of that
+    type straight from the bytes: dataclasses (sent as dataclasses or as
+    dicts) are constructed as their fields are read, and lists and dicts are
+    filled with values of their element types.
+
+    ``factories`` maps a class to a callable that builds it from its decoded
+    fields, given as a dict, instead of calling the class with them; e.g. to
+    hand out shared instances from an identity map. Values that do not have
+    the expected shape are decoded generically and passed through
+    convert_to_type, as call() did before.
+
+    Example usage:
+        decode_users = TypedDecoder(list[User])
+        users = decode_users(payload)
+    """
+
+    def __init__(self, expected_type: Type, factories: Optional[Dict[type, Callable[[dict], Any]]] = None):
+        """
+        Initialize and compile a decoder.
+
+        Args:
+            expected_type: Type of the decoded value (dataclasses, generic
+                dataclasses, Optional, list/tuple/set/frozenset/dict of these)
+            factories: Optional builders per class, called with the decoded fields
+        """
+        self.expected_type = expected_type
+        self._factories = dict(factories or {})
+        self._compiled: Dict[Any, DecodeFn] = {}
+        self.decode: DecodeFn = self._compile(expected_type)
+
+    def __call__(self, data: bytes) -> Any:
+        """Decode a whole payload."""
+        return self.decode(data, 0)[0]
+
+    def _compile(self, tp: Any) -> DecodeFn:
+        try:
+            compiled = self._compiled.get(tp)
+        except TypeError:
+            return self._generic(tp)
+        if compiled is not None:
+            return compiled
+
+        # A recursive type reaches itself while it is being compiled
+        slot = []
+        self._compiled[tp] = lambda data, offset: slot[0](data, offset)
+        compiled = self._build(tp)
+        slot.append(compiled)
+        self._compiled[tp] = compiled
+        return compiled
+
+    def _build(self, tp: Any) -> DecodeFn:
+        if tp is Any or tp is None or isinstance(tp, TypeVar) or tp in _PLAIN_TYPES:
+            return _decode_any
+
+        origin = get_origin(tp)
+        args = get_args(tp)
+
+        if origin is Union:
+            non_none = [a for a in args if a is not type(None)]
+            if len(non_none) == 1:
+                return self._optional(self._compile(non_none[0]))
+            return self._generic(tp)
+
+        if origin in (list, set, frozenset) or (origin is tuple and len(args) == 2 and args[1] is ...):
+            return self._sequence(tp, origin, self._compile(args[0]) if args else _decode_any)
+
+        if origin is dict:
+            key = self._compile(args[0]) if args else _decode_any
+            value = self._compile(args[1]) if len(args) > 1 else _decode_any
+            return self._mapping(tp, key, value)
+
+        cls = origin or tp
+        if isinstance(cls, type) and (cls in self._factories or dataclasses.is_dataclass(cls)):
+            return self._object(tp, cls, args)
+
+        return self._generic(tp)
+
+    @staticmethod
+    def _generic(tp: Any) -> DecodeFn:
+        def decode(data, offset):
+            value, offset = deserialize(data, tp, offset)
+            return convert_to_type(value, tp), offset
+        return decode
+
+    @staticmethod
+    def _optional(inner: DecodeFn) -> DecodeFn:
+        def decode(data, offset):
+            if data[offset] == TypeTag.NONE:
+                return None, offset + 1
+            return inner(data, offset)
+        return decode
+
+    def _sequence(self, tp: Any, container: type, decode_item: DecodeFn) -> DecodeFn:
+        fallback = self._generic(tp)
+
+        def decode(data, offset):
+            if data[offset] not in _SEQUENCE_TAGS:
+                return fallback(data, offset)
+            length, len_size = _unpack_length(data, offset + 1)
+            offset += 1 + len_size
+            items = []
+            append = items.append
+            for _ in range(length):
+                item, offset = decode_item(data, offset)
+                append(item)
+            return (items if container is list else container(items)), offset
+        return decode
+
+    def _mapping(self, tp: Any, decode_key: DecodeFn, decode_value: DecodeFn) -> DecodeFn:
+        fallback = self._generic(tp)
+
+        def decode(data, offset):
+            if data[offset] != TypeTag.DICT:
+                return fallback(data, offset)
+            length, len_size = _unpack_length(data, offset + 1)
+            offset += 1 + len_size
+            result = {}
+            for _ in range(length):
+                key, offset = decode_key(data, offset)
+                result[key], offset = decode_value(data, offset)
+            return result, offset
+        return decode
+
+    def _object(self, tp: Any, cls: type, args: tuple) -> DecodeFn:
+        fallback = self._generic(tp)
+        field_decoders: Dict[str, DecodeFn] = {}
+        init_names = set()
+
+        if dataclasses.is_dataclass(cls):
+            try:
+                hints = get_type_hints(cls)
+            except Exception:
+                hints = {}
+            typevars = dict(zip(getattr(cls, '__parameters__', ()), args))
+            for field in dataclasses.fields(cls):
+                hint = _substitute(hints.get(field.name, Any), typevars)
+                field_decoders[field.name] = self._compile(hint)
+                if field.init:
+                    init_names.add(field.name)
+
+        factory = self._factories.get(cls)
+        # A custom factory sees every field sent; the class only its init fields
+        keep = None if factory is not None else init_names
+        if factory is None:
+            def factory(fields):
+                return cls(**fields)
+
+        decoder_for = field_decoders.get
+
+        def decode(data, offset):
+            tag = data[offset]
+            fields = {}
+            if tag == TypeTag.DICT:
+                count, len_size = _unpack_length(data, offset + 1)
+                offset += 1 + len_size
+                for _ in range(count):
+                    name, offset = _decode_any(data, offset)
+                    value, offset = decoder_for(name, _decode_any)(data, offset)
+                    if keep is None or name in keep:
+                        fields[name] = value
+            elif tag == TypeTag.DATACLASS:
+                name_len, len_size = _unpack_length(data, offset + 1)
+                offset += 1 + len_size + name_len
+                count, len_size = _unpack_length(data, offset)
+                offset += len_size
+                for _ in range(count):
+                    name_len, len_size = _unpack_length(data, offset)
+                    offset += len_size
+                    name = data[offset:offset + name_len].decode('utf-8')
+                    offset += name_len
+                    value, offset = decoder_for(name, _decode_any)(data, offset)
+                    if keep is None or name in keep:
+                        fields[name] = value
+            else:
+                return fallback(data, offset)
+            return factory(fields), offset
+        return decode
+
+
+def _substitute(hint: Any, typevars: Dict[Any, Any]) -> Any:
+    """Replace the type variables of a generic dataclass field with its arguments."""
+    if not typevars:
+        return hint
+    if isinstance(hint, TypeVar):
+        return typevars.get(hint, Any)
+    params = getattr(hint, '__parameters__', ())
+    if params:
+        return hint[tuple(typevars.get(p, Any) for p in params)]
+    return hint
+
+
+@functools.lru_cache(maxsize=256)
+def _shared_decoder(expected_type: Type) -> TypedDecoder:
+    return TypedDecoder(expected_type)
+
+
+def compile_decoder(result_type: Any) -> TypedDecoder:
+    """
+    Get the decoder for a result type, compiling it on first use.
+
+    Args:
+        result_type: A type, or a TypedDecoder which is returned as is
+
+    Returns:
+        TypedDecoder shared by every call with the same type
+    """
+    if isinstance(result_type, TypedDecoder):
+        return result_type
+    try:
+        return _shared_decoder(result_type)
+    except TypeError:
+        return TypedDecoder(result_type)
+
+
+def decode_fields(data: bytes, decoders: Dict[str, DecodeFn]) -> dict:
+    """
+    Decode a serialized dict, reading the values of the given keys with their
+    decoders and every other value generically.
+    """
+    if not data or data[0] != TypeTag.DICT:
+        return deserialize(data)[0]
+    count, len_size = _unpack_length(data, 1)
+    offset = 1 + len_size
+    result = {}
+    for _ in range(count):
+        key, offset = _decode_any(data, offset)
+        result[key], offset = decoders.get(key, _decode_any)(data, offset)
+    return result
@@ -3,35 +3,86 @@ HTCP Messages Module
 High-level message types for HTCP protocol.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from .proto import Packet, PacketType, ErrorCode
 from .serialization import serialize, deserialize
+from .decoding import compile_decoder, decode_fields
 
 
 class HandshakeRequest:
-    """Handshake request from client to server."""
+    """
+    Handshake request from client to server.
+
+    A client that has seen the server before sends the capabilities hash from
+    its last full handshake; if it still matches, the server answers with a
+    short acknowledgment instead of the full transaction list.
+    ``features`` lists the optional protocol features the client supports
+    (see CLIENT_FEATURES); clients that predate it send none.
+    """
+
+    def __init__(self, capabilities_hash: Optional[str] = None, features: Optional[list[str]] = None):
+        self.capabilities_hash = capabilities_hash
+        self.features = features or []
 
     def to_packet(self) -> Packet:
-        return Packet(PacketType.HANDSHAKE_REQUEST, b'')
+        if self.capabilities_hash is None and not self.features:
+            return Packet(PacketType.HANDSHAKE_REQUEST, b'')
+        data: dict = {"features": self.features}
+        if self.capabilities_hash is not None:
+            data["capabilities_hash"] = self.capabilities_hash
+        return Packet(PacketType.HANDSHAKE_REQUEST, serialize(data))
 
     @classmethod
     def from_packet(cls, packet: Packet) -> 'HandshakeRequest':
-        return cls()
+        if not packet.payload:
+            return cls()
+        data, _ = deserialize(packet.payload)
+        return cls(capabilities_hash=data.get("capabilities_hash"), features=data.get("features", []))
 
 
 class HandshakeResponse:
-    """Handshake response from server to client."""
+    """
+    Handshake response from server to client.
 
-    def __init__(self, server_name: str, transactions: list[str]):
+    With ``unchanged`` set the response only acknowledges the client's cached
+    capabilities hash; server_name, transactions and features are not sent.
+    ``features`` lists the optional protocol features the server supports
+    (see SERVER_FEATURES); servers that predate it send none.
+    """
+
+    def __init__(
+        self,
+        server_name: str,
+        transactions: list[str],
+        capabilities_hash: Optional[str] = None,
+        unchanged: bool = False,
+        features: Optional[list[str]] = None
+    ):
         self.server_name = server_name
         self.transactions = transactions
+        self.capabilities_hash = capabilities_hash
+        self.unchanged = unchanged
+        self.features = features or []
+
+    @classmethod
+    def acknowledge(cls, capabilities_hash: str) -> 'HandshakeResponse':
+        """Build the short response for a client whose cached capabilities are current."""
+        return cls(server_name="", transactions=[], capabilities_hash=capabilities_hash, unchanged=True)
 
     def to_packet(self) -> Packet:
-        payload = serialize({
-            "server_name": self.server_name,
-            "transactions": self.transactions
-        })
+        if self.unchanged:
+            payload = serialize({
+                "capabilities_hash": self.capabilities_hash,
+                "unchanged": True
+            })
+        else:
+            payload = serialize({
+                "server_name": self.server_name,
+                "transactions": self.transactions,
+                "capabilities_hash": self.capabilities_hash,
+                "features": self.features
+            })
         return Packet(PacketType.HANDSHAKE_RESPONSE, payload)
 
     @classmethod
@@ -39,7 +90,10 @@ class HandshakeResponse:
         data, _ = deserialize(packet.payload)
         return cls(
             server_name=data.get("server_name", "unknown"),
-            transactions=data.get("transactions", [])
+            transactions=data.get("transactions", []),
+            capabilities_hash=data.get("capabilities_hash"),
+            unchanged=data.get("unchanged", False),
+            features=data.get("features", [])
         )
 
 
@@ -92,7 +146,16 @@ class TransactionResult:
 
     @classmethod
     def from_packet(cls, packet: Packet, result_type=None) -> 'TransactionResult':
-        data, _ = deserialize(packet.payload)
+        """
+        Parse a result packet.
+
+        With a result_type (a type or a TypedDecoder) the result is decoded
+        straight into that type in the same pass that reads the packet.
+        """
+        if result_type is None:
+            data, _ = deserialize(packet.payload)
+        else:
+            data = decode_fields(packet.payload, {"result": compile_decoder(result_type).decode})
 
         result = data.get("result")
 
@@ -105,25 +168,34 @@ class TransactionResult:
 
 
 class ErrorPacket:
-    """Error packet from server to client."""
+    """
+    Error packet from server to client.
 
-    def __init__(self, error_code: ErrorCode, message: str):
+    ``retry_after`` is an optional hint, in seconds, for how long the client
+    should wait before trying again (sent with SERVER_BUSY).
+    """
+
+    def __init__(self, error_code: ErrorCode, message: str, retry_after: Optional[float] = None):
         self.error_code = error_code
         self.message = message
+        self.retry_after = retry_after
 
     def to_packet(self) -> Packet:
-        payload = serialize({
+        data = {
             "error_code": int(self.error_code),
             "message": self.message
-        })
-        return Packet(PacketType.ERROR, payload)
+        }
+        if self.retry_after is not None:
+            data["retry_after"] = float(self.retry_after)
+        return Packet(PacketType.ERROR, serialize(data))
 
     @classmethod
     def from_packet(cls, packet: Packet) -> 'ErrorPacket':
         data, _ = deserialize(packet.payload)
         return cls(
             error_code=ErrorCode(data.get("error_code", 0)),
-            message=data.get("message", "")
+            message=data.get("message", ""),
+            retry_after=data.get("retry_after")
         )
 
 
@@ -138,6 +210,28 @@ class DisconnectPacket:
         return cls()
 
 
+class PingPacket:
+    """Liveness probe, sent by either side. The peer answers with a PONG."""
+
+    def to_packet(self) -> Packet:
+        return Packet(PacketType.PING, b'')
+
+    @classmethod
+    def from_packet(cls, packet: Packet) -> 'PingPacket':
+        return cls()
+
+
+class PongPacket:
+    """Answer to a PING."""
+
+    def to_packet(self) -> Packet:
+        return Packet(PacketType.PONG, b'')
+
+    @classmethod
+    def from_packet(cls, packet: Packet) -> 'PongPacket':
+        return cls()
+
+
 class SubscribeRequest:
     """Subscribe request from client to server."""
 
@@ -30,6 +30,10 @@ class PacketType(IntEnum):
     SUBSCRIBE_END = 0x15
     SUBSCRIBE_ERROR = 0x16
 
+    # Both directions
+    PING = 0x21
+    PONG = 0x22
+
 
 class ErrorCode(IntEnum):
     """Error codes for protocol errors."""
@@ -39,6 +43,7 @@ class ErrorCode(IntEnum):
     EXECUTION_ERROR = 3
     PROTOCOL_ERROR = 4
     INTERNAL_ERROR = 5
+    SERVER_BUSY = 6
 
 
 class Packet:
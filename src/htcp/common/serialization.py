@@ -4,6 +4,7 @@ Supports automatic serialization/deserialization of all Python types.
 """
 
 import struct
+import sys
 import dataclasses
 
 from datetime import datetime, date, time, timedelta
@@ -12,29 +13,42 @@ from enum import Enum
 from uuid import UUID
 from typing import Any, Type, get_type_hints, get_origin, get_args, Union
 
-try:
-    from pydantic import BaseModel as PydanticBaseModel
-    PYDANTIC_AVAILABLE = True
-except ImportError:
-    PydanticBaseModel = None
-    PYDANTIC_AVAILABLE = False
+_pydantic_base_model = None
+
+
+def _get_pydantic_base_model():
+    """
+    Get pydantic's BaseModel, or None if pydantic has not been imported.
+
+    No object can be a pydantic model before pydantic is imported, so the
+    probe only looks in sys.modules and never triggers the import itself.
+    """
+
+    global _pydantic_base_model
+    if _pydantic_base_model is None:
+        pydantic = sys.modules.get("pydantic")
+        if pydantic is not None:
+            _pydantic_base_model = getattr(pydantic, "BaseModel", None)
+    return _pydantic_base_model
 
 
 def _is_pydantic_model(obj: Any) -> bool:
     """Check if object is a Pydantic model instance."""
 
-    if not PYDANTIC_AVAILABLE:
+    base_model = _get_pydantic_base_model()
+    if base_model is None:
         return False
-    return isinstance(obj, PydanticBaseModel)
+    return isinstance(obj, base_model)
 
 
 def _is_pydantic_model_class(cls: Type) -> bool:
     """Check if class is a Pydantic model class."""
 
-    if not PYDANTIC_AVAILABLE:
+    base_model = _get_pydantic_base_model()
+    if base_model is None:
         return False
     try:
-        return isinstance(cls, type) and issubclass(cls, PydanticBaseModel)
+        return isinstance(cls, type) and issubclass(cls, base_model)
     except TypeError:
         return False
 
@@ -138,16 +152,19 @@ def serialize(obj: Any) -> bytes:
     raise TypeError(f"Cannot serialize type: {type(obj)}")
 
 
-def deserialize(data: bytes, expected_type: Type = None) -> tuple[Any, int]:
+def deserialize(data: bytes, expected_type: Type = None, offset: int = 0) -> tuple[Any, int]:
     """
-    Deserialize bytes to Python object.
-    Returns (object, bytes_consumed).
+    Deserialize bytes to Python object, reading from offset.
+    Returns (object, offset after it), which from offset 0 is the bytes consumed.
+
+    Nested values are read in place rather than from slices of the buffer,
+    so decoding stays linear in the payload size.
     """
-    if not data:
+    if offset >= len(data):
         raise ValueError("Empty data")
 
-    tag = data[0]
-    offset = 1
+    tag = data[offset]
+    offset += 1
 
     if tag == TypeTag.NONE:
         return None, offset
@@ -159,37 +176,37 @@ def deserialize(data: bytes, expected_type: Type = None) -> tuple[Any, int]:
         return False, offset
 
     if tag == TypeTag.INT:
-        value = struct.unpack('>q', data[offset:offset + 8])[0]
+        value = struct.unpack_from('>q', data, offset)[0]
         return value, offset + 8
 
     if tag == TypeTag.INT_NEGATIVE:
-        value = struct.unpack('>q', data[offset:offset + 8])[0]
+        value = struct.unpack_from('>q', data, offset)[0]
         return value, offset + 8
 
     if tag == TypeTag.INT_BIG:
-        length, len_size = _unpack_length(data[offset:])
+        length, len_size = _unpack_length(data, offset)
         offset += len_size
         value = int.from_bytes(data[offset:offset + length], 'big', signed=False)
         return value, offset + length
 
     if tag == TypeTag.INT_BIG_NEGATIVE:
-        length, len_size = _unpack_length(data[offset:])
+        length, len_size = _unpack_length(data, offset)
         offset += len_size
         value = -int.from_bytes(data[offset:offset + length], 'big', signed=False)
         return value, offset + length
 
     if tag == TypeTag.FLOAT:
-        value = struct.unpack('>d', data[offset:offset + 8])[0]
+        value = struct.unpack_from('>d', data, offset)[0]
         return value, offset + 8
 
     if tag == TypeTag.STR:
-        length, len_size = _unpack_length(data[offset:])
+        length, len_size = _unpack_length(data, offset)
         offset += len_size
         value = data[offset:offset + length].decode('utf-8')
         return value, offset + length
 
     if tag == TypeTag.BYTES:
-        length, len_size = _unpack_length(data[offset:])
+        length, len_size = _unpack_length(data, offset)
         offset += len_size
         value = data[offset:offset + length]
         return value, offset + length
@@ -250,9 +267,9 @@ def _pack_length(length: int) -> bytes:
     return struct.pack('>I', length)
 
 
-def _unpack_length(data: bytes) -> tuple[int, int]:
-    """Unpack length, returns (length, bytes_consumed)."""
-    return struct.unpack('>I', data[:4])[0], 4
+def _unpack_length(data: bytes, offset: int = 0) -> tuple[int, int]:
+    """Unpack length at offset, returns (length, bytes_consumed)."""
+    return struct.unpack_from('>I', data, offset)[0], 4
 
 
 def _serialize_int(obj: int) -> bytes:
@@ -285,7 +302,7 @@ def _serialize_sequence(obj, tag: int) -> bytes:
 
 def _deserialize_sequence(data: bytes, offset: int, container_type: type, expected_type: Type = None) -> tuple[list, int]:
     """Deserialize a sequence."""
-    length, len_size = _unpack_length(data[offset:])
+    length, len_size = _unpack_length(data, offset)
     offset += len_size
 
     element_type = None
@@ -298,9 +315,8 @@ def _deserialize_sequence(data: bytes, offset: int, container_type: type, expect
 
     items = []
     for _ in range(length):
-        item, consumed = deserialize(data[offset:], element_type)
+        item, offset = deserialize(data, element_type, offset)
         items.append(item)
-        offset += consumed
 
     return items, offset
 
@@ -317,7 +333,7 @@ def _serialize_dict(obj: dict) -> bytes:
 
 def _deserialize_dict(data: bytes, offset: int, expected_type: Type = None) -> tuple[dict, int]:
     """Deserialize dictionary."""
-    length, len_size = _unpack_length(data[offset:])
+    length, len_size = _unpack_length(data, offset)
     offset += len_size
 
     key_type = None
@@ -332,10 +348,8 @@ def _deserialize_dict(data: bytes, offset: int, expected_type: Type = None) -> t
 
     result = {}
     for _ in range(length):
-        key, consumed = deserialize(data[offset:], key_type)
-        offset += consumed
-        value, consumed = deserialize(data[offset:], value_type)
-        offset += consumed
+        key, offset = deserialize(data, key_type, offset)
+        value, offset = deserialize(data, value_type, offset)
         result[key] = value
 
     return result, offset
@@ -364,12 +378,12 @@ def _serialize_dataclass(obj) -> bytes:
 
 def _deserialize_dataclass(data: bytes, offset: int, expected_type: Type = None) -> tuple[Any, int]:
     """Deserialize dataclass instance."""
-    name_len, len_size = _unpack_length(data[offset:])
+    name_len, len_size = _unpack_length(data, offset)
     offset += len_size
     class_name = data[offset:offset + name_len].decode('utf-8')
     offset += name_len
 
-    field_count, len_size = _unpack_length(data[offset:])
+    field_count, len_size = _unpack_length(data, offset)
     offset += len_size
 
     field_values = {}
@@ -382,14 +396,13 @@ def _deserialize_dataclass(data: bytes, offset: int, expected_type: Type = None)
             pass
 
     for _ in range(field_count):
-        fname_len, len_size = _unpack_length(data[offset:])
+        fname_len, len_size = _unpack_length(data, offset)
         offset += len_size
         field_name = data[offset:offset + fname_len].decode('utf-8')
         offset += fname_len
 
         field_type = field_types.get(field_name)
-        value, consumed = deserialize(data[offset:], field_type)
-        offset += consumed
+        value, offset = deserialize(data, field_type, offset)
         field_values[field_name] = value
 
     if expected_type and dataclasses.is_dataclass(expected_type):
@@ -426,12 +439,12 @@ def _serialize_pydantic(obj) -> bytes:
 def _deserialize_pydantic(data: bytes, offset: int, expected_type: Type = None) -> tuple[Any, int]:
     """Deserialize Pydantic model instance."""
 
-    name_len, len_size = _unpack_length(data[offset:])
+    name_len, len_size = _unpack_length(data, offset)
     offset += len_size
     class_name = data[offset:offset + name_len].decode('utf-8')
     offset += name_len
 
-    field_count, len_size = _unpack_length(data[offset:])
+    field_count, len_size = _unpack_length(data, offset)
     offset += len_size
 
     field_values = {}
@@ -444,14 +457,13 @@ def _deserialize_pydantic(data: bytes, offset: int, expected_type: Type = None)
             pass
 
     for _ in range(field_count):
-        fname_len, len_size = _unpack_length(data[offset:])
+        fname_len, len_size = _unpack_length(data, offset)
         offset += len_size
         field_name = data[offset:offset + fname_len].decode('utf-8')
         offset += fname_len
 
         field_type = field_types.get(field_name)
-        value, consumed = deserialize(data[offset:], field_type)
-        offset += consumed
+        value, offset = deserialize(data, field_type, offset)
         field_values[field_name] = value
 
     if expected_type and _is_pydantic_model_class(expected_type):
@@ -469,7 +481,7 @@ def _serialize_datetime(obj: datetime) -> bytes:
 
 def _deserialize_datetime(data: bytes, offset: int) -> tuple[datetime, int]:
     """Deserialize datetime from ISO format string."""
-    length, len_size = _unpack_length(data[offset:])
+    length, len_size = _unpack_length(data, offset)
     offset += len_size
     iso = data[offset:offset + length].decode('utf-8')
     return datetime.fromisoformat(iso), offset + length
@@ -483,7 +495,7 @@ def _serialize_date(obj: date) -> bytes:
 
 def _deserialize_date(data: bytes, offset: int) -> tuple[date, int]:
     """Deserialize date from ISO format string."""
-    length, len_size = _unpack_length(data[offset:])
+    length, len_size = _unpack_length(data, offset)
     offset += len_size
     iso = data[offset:offset + length].decode('utf-8')
     return date.fromisoformat(iso), offset + length
@@ -497,7 +509,7 @@ def _serialize_time(obj: time) -> bytes:
 
 def _deserialize_time(data: bytes, offset: int) -> tuple[time, int]:
     """Deserialize time from ISO format string."""
-    length, len_size = _unpack_length(data[offset:])
+    length, len_size = _unpack_length(data, offset)
     offset += len_size
     iso = data[offset:offset + length].decode('utf-8')
     return time.fromisoformat(iso), offset + length
@@ -511,7 +523,7 @@ def _serialize_timedelta(obj: timedelta) -> bytes:
 
 def _deserialize_timedelta(data: bytes, offset: int) -> tuple[timedelta, int]:
     """Deserialize timedelta from total seconds."""
-    seconds = struct.unpack('>d', data[offset:offset + 8])[0]
+    seconds = struct.unpack_from('>d', data, offset)[0]
     return timedelta(seconds=seconds), offset + 8
 
 
@@ -523,7 +535,7 @@ def _serialize_decimal(obj: Decimal) -> bytes:
 
 def _deserialize_decimal(data: bytes, offset: int) -> tuple[Decimal, int]:
     """Deserialize Decimal from string."""
-    length, len_size = _unpack_length(data[offset:])
+    length, len_size = _unpack_length(data, offset)
     offset += len_size
     s = data[offset:offset + length].decode('utf-8')
     return Decimal(s), offset + length
@@ -557,12 +569,12 @@ def _serialize_enum(obj: Enum) -> bytes:
 
 def _deserialize_enum(data: bytes, offset: int, expected_type: Type = None) -> tuple[Any, int]:
     """Deserialize Enum member."""
-    cname_len, len_size = _unpack_length(data[offset:])
+    cname_len, len_size = _unpack_length(data, offset)
     offset += len_size
     class_name = data[offset:offset + cname_len].decode('utf-8')
     offset += cname_len
 
-    mname_len, len_size = _unpack_length(data[offset:])
+    mname_len, len_size = _unpack_length(data, offset)
     offset += len_size
     member_name = data[offset:offset + mname_len].decode('utf-8')
     offset += mname_len
@@ -32,14 +32,24 @@ def recv_exact(sock: socket.socket, size: int) -> bytes:
         Received bytes
 
     Raises:
-        HTCPConnectionError: If connection is closed before receiving all bytes
+        HTCPConnectionError: If connection is closed before receiving all
+            bytes, or the socket times out after some were received
+        socket.timeout: If the socket times out before any byte arrives
     """
     buffer = bytearray(size)
     view = memoryview(buffer)
     received = 0
 
     while received < size:
-        chunk_size = sock.recv_into(view[received:], size - received)
+        try:
+            chunk_size = sock.recv_into(view[received:], size - received)
+        except socket.timeout as e:
+            if not received:
+                raise
+            # The bytes already read are lost to the caller: the stream is out of sync
+            raise HTCPConnectionError(
+                f"Timed out while reading (got {received}/{size} bytes)"
+            ) from e
         if chunk_size == 0:
             raise HTCPConnectionError(
                 f"Connection closed while reading (got {received}/{size} bytes)"
@@ -61,7 +71,10 @@ def recv_packet(sock: socket.socket, max_payload_size: int = MAX_PAYLOAD_SIZE) -
         Received Packet object
 
     Raises:
-        HTCPConnectionError: If connection is closed
+        HTCPConnectionError: If connection is closed, or the socket times out
+            partway through the packet
+        socket.timeout: If the socket times out before the packet starts; the
+            stream is untouched and reading may go on
         ProtocolError: If packet is malformed
         MaxPayloadExceededError: If payload exceeds max size
         UnknownPacketTypeError: If packet type is unknown
@@ -98,7 +111,10 @@ def recv_packet(sock: socket.socket, max_payload_size: int = MAX_PAYLOAD_SIZE) -
     # Read payload
     payload = b''
     if payload_length > 0:
-        payload = recv_exact(sock, payload_length)
+        try:
+            payload = recv_exact(sock, payload_length)
+        except socket.timeout as e:
+            raise HTCPConnectionError("Timed out between packet header and payload") from e
 
     return Packet(packet_type, payload)
 
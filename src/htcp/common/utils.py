@@ -3,10 +3,11 @@ HTCP Utilities Module
 Helper functions for the HTCP protocol.
 """
 
+import hashlib
 import inspect
 import dataclasses
 
-from typing import Any, Callable, Dict, Type, get_type_hints, get_origin, get_args, Union, Tuple
+from typing import Any, Callable, Dict, Optional, Type, get_type_hints, get_origin, get_args, Union, Tuple
 from .serialization import serialize, deserialize
 
 
@@ -43,21 +44,31 @@ def get_return_type(func: Callable) -> Type:
         return Any
 
 
-def prepare_arguments(func: Callable, raw_args: Dict[str, Any]) -> Dict[str, Any]:
+def prepare_arguments(
+    func: Callable,
+    raw_args: Dict[str, Any],
+    injected: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Prepare arguments for function call.
     Converts raw deserialized values to expected types using type hints.
+    Values in ``injected`` are passed as-is and override raw arguments of the same name.
     """
     param_types = get_function_signature(func)
     prepared = {}
 
     for name, value in raw_args.items():
+        if injected and name in injected:
+            continue
         expected_type = param_types.get(name)
         if expected_type is not None:
             prepared[name] = convert_to_type(value, expected_type)
         else:
             prepared[name] = value
 
+    if injected:
+        prepared.update(injected)
+
     return prepared
 
 
@@ -162,6 +173,16 @@ def convert_to_type(value: Any, expected_type: Type) -> Any:
     return value
 
 
+def compute_capabilities_hash(server_name: str, transactions: list[str], features: list[str] = ()) -> str:
+    """Hash a server's handshake capabilities for session resume."""
+    payload = serialize({
+        "server_name": server_name,
+        "transactions": sorted(transactions),
+        "features": sorted(features),
+    })
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
 def serialize_result(result: Any) -> bytes:
     """Serialize a function result."""
     return serialize(result)
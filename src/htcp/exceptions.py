@@ -3,6 +3,8 @@ HTCP Exceptions Module
 Exception hierarchy for HTCP protocol.
 """
 
+from typing import Optional
+
 
 class HTCPError(Exception):
     """Base exception for all HTCP errors."""
@@ -54,3 +56,11 @@ class UnknownPacketTypeError(ProtocolError):
 class HandshakeError(ConnectionError):
     """Handshake failed."""
     pass
+
+
+class ServerBusyError(ConnectionError):
+    """Server shed the connection; retry_after is its suggested wait in seconds, if any."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        super().__init__(message)
@@ -1,9 +1,37 @@
 """HTCP Server Package."""
 
-from .server import Server
+import importlib
+from typing import TYPE_CHECKING
+
 from .transaction import Transaction, TransactionRegistry
-from .connection import ServerClientConnection, ConnectionRegistry
 from .subscription import Subscription, SubscriptionRegistry, ActiveSubscription, ActiveSubscriptionRegistry
+from .session import SessionContext
+from .metrics import ServerMetrics, STATS_TRANSACTION
+
+if TYPE_CHECKING:
+    from .server import Server
+    from .connection import ServerClientConnection, ConnectionRegistry
+
+# Loaded on first access; the async server only needs the shared registries
+_LAZY_IMPORTS = {
+    'Server': '.server',
+    'ServerClientConnection': '.connection',
+    'ConnectionRegistry': '.connection',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     'Server',
@@ -15,4 +43,7 @@ __all__ = [
     'SubscriptionRegistry',
     'ActiveSubscription',
     'ActiveSubscriptionRegistry',
+    'SessionContext',
+    'ServerMetrics',
+    'STATS_TRANSACTION',
 ]
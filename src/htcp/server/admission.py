@@ -0,0 +1,69 @@
+"""
+HTCP Server Admission Module
+Connection rate limiting for servers.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class AdmissionController:
+    """
+    Token bucket limiting how fast new connections are accepted.
+
+    Up to ``burst`` connections are admitted at once, refilled at ``rate``
+    per second. A shed client is told when to come back, and successive shed
+    clients are handed retry slots one token apart, so a reconnect storm is
+    spread out at the admitted rate instead of returning all together.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initialize admission controller.
+
+        Args:
+            rate: Connections admitted per second
+            burst: Bucket size (defaults to one second's worth, at least 1)
+
+        Raises:
+            ValueError: If rate is not positive
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self._rate = rate
+        self._burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def burst(self) -> int:
+        return self._burst
+
+    def try_admit(self) -> Optional[float]:
+        """
+        Take a token for a new connection.
+
+        Returns:
+            None if the connection is admitted, otherwise the suggested
+            retry delay in seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+
+            slot = max(self._next_slot, now + (1 - self._tokens) / self._rate)
+            self._next_slot = slot + 1 / self._rate
+            return slot - now
@@ -7,6 +7,9 @@ import socket
 import threading
 from typing import Optional, Tuple
 
+from ..common.constants import DEFAULT_CONNECTION_SHARDS
+from .session import SessionContext
+
 
 class ServerClientConnection:
     """
@@ -26,6 +29,9 @@ class ServerClientConnection:
         self._address = address
         self._connected = True
         self._lock = threading.Lock()
+        self.session = SessionContext(address)
+        # Set by the handshake; clients that predate PING are dropped when idle instead
+        self.accepts_ping = False
 
         # Set socket timeouts
         if read_timeout is not None or write_timeout is not None:
@@ -76,19 +82,32 @@ class ConnectionRegistry:
     """
     Thread-safe registry for active client connections.
 
-    Provides atomic operations for connection management to avoid race conditions.
+    Connections are spread over lock-striped shards keyed by address, so
+    bursts of connects and disconnects from different peers don't serialize
+    on one lock. The connection limit is enforced with a non-blocking
+    semaphore, which keeps admission atomic without a registry-wide lock.
     """
 
-    def __init__(self, max_connections: int = 0):
+    def __init__(self, max_connections: int = 0, shards: int = DEFAULT_CONNECTION_SHARDS):
         """
         Initialize connection registry.
 
         Args:
             max_connections: Maximum allowed connections (0 = unlimited)
+            shards: Number of lock-striped shards
         """
-        self._connections: dict[Tuple[str, int], ServerClientConnection] = {}
-        self._lock = threading.Lock()
+        self._shards: list[tuple[dict[Tuple[str, int], ServerClientConnection], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(max(1, shards))
+        ]
         self._max_connections = max_connections
+        self._slots = threading.BoundedSemaphore(max_connections) if max_connections > 0 else None
+
+    def _shard(self, address: Tuple[str, int]) -> tuple[dict, threading.Lock]:
+        return self._shards[hash(address) % len(self._shards)]
+
+    def _release_slot(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
 
     def try_add(
         self,
@@ -112,14 +131,18 @@ class ConnectionRegistry:
         Returns:
             ServerClientConnection if added successfully, None if limit reached
         """
-        with self._lock:
-            # Atomic check and add
-            if 0 < self._max_connections <= len(self._connections):
-                return None
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            return None
+
+        conn = ServerClientConnection(sock, address, read_timeout, write_timeout)
+        connections, lock = self._shard(address)
+        with lock:
+            replaced = connections.get(address)
+            connections[address] = conn
 
-            conn = ServerClientConnection(sock, address, read_timeout, write_timeout)
-            self._connections[address] = conn
-            return conn
+        if replaced is not None:
+            self._release_slot()
+        return conn
 
     def remove(self, address: Tuple[str, int]) -> Optional[ServerClientConnection]:
         """
@@ -131,25 +154,32 @@ class ConnectionRegistry:
         Returns:
             Removed connection or None if not found
         """
-        with self._lock:
-            return self._connections.pop(address, None)
+        connections, lock = self._shard(address)
+        with lock:
+            conn = connections.pop(address, None)
+
+        if conn is not None:
+            self._release_slot()
+        return conn
 
     def get(self, address: Tuple[str, int]) -> Optional[ServerClientConnection]:
         """Get a connection by address."""
-        with self._lock:
-            return self._connections.get(address)
+        connections, _ = self._shard(address)
+        return connections.get(address)
 
     def close_all(self) -> None:
         """Close all connections."""
-        with self._lock:
-            for conn in self._connections.values():
+        for connections, lock in self._shards:
+            with lock:
+                closing = list(connections.values())
+                connections.clear()
+            for conn in closing:
                 conn.close()
-            self._connections.clear()
+                self._release_slot()
 
     def count(self) -> int:
         """Get current connection count."""
-        with self._lock:
-            return len(self._connections)
+        return sum(len(connections) for connections, _ in self._shards)
 
     def __len__(self) -> int:
         return self.count()
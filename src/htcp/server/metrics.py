@@ -0,0 +1,191 @@
+"""
+HTCP Server Metrics Module
+Transaction counters and latency/size histograms for servers.
+"""
+
+import threading
+import time
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# Code of the built-in transaction returning stats(), registered on request
+STATS_TRANSACTION = "__stats__"
+
+# Phases of a transaction, in the order they run
+PHASES = ("deserialize", "prepare", "execute", "serialize", "send")
+
+# Bucket upper bounds: 1 us to ~17 s in powers of two, and 64 B to 64 MiB
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(25))
+SIZE_BUCKETS = tuple(2 ** i for i in range(6, 27))
+
+# Every call to an unregistered code is counted under one name, so clients
+# cannot grow the stats without bound
+UNKNOWN_TRANSACTION = "<unknown>"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Observing a value is a binary search and a few additions; quantiles are
+    estimated from the buckets when a snapshot is taken, as the upper bound
+    of the bucket holding them.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Get the upper bound of the bucket holding quantile q (0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            # Upper bound -> count, empty buckets left out; None is the overflow bucket
+            "buckets": [
+                [self.bounds[i] if i < len(self.bounds) else None, n]
+                for i, n in enumerate(self.counts) if n
+            ],
+        }
+
+
+class TransactionStats:
+    """Counters and histograms of one transaction code."""
+
+    __slots__ = ("calls", "errors", "phases", "total", "request_size", "response_size")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.phases = tuple(Histogram(LATENCY_BUCKETS) for _ in PHASES)
+        self.total = Histogram(LATENCY_BUCKETS)
+        self.request_size = Histogram(SIZE_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "latency": self.total.snapshot(),
+            "phases": {name: h.snapshot() for name, h in zip(PHASES, self.phases)},
+            "request_size": self.request_size.snapshot(),
+            "response_size": self.response_size.snapshot(),
+        }
+
+
+class ServerMetrics:
+    """
+    Metrics a server keeps about the transactions it handles.
+
+    A server times each transaction at its phase boundaries and records the
+    whole call once it is sent, with one uncontended lock acquisition, so
+    collection stays on in production. Gauges (open connections, active
+    subscriptions) are not tracked here; the server reads them from its
+    registries when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transactions: Dict[str, TransactionStats] = {}
+        self._started = time.time()
+        self.connections_accepted = 0
+        self.connections_shed = 0
+        self.subscriptions_started = 0
+
+    def record_transaction(
+        self,
+        code: str,
+        marks: List[Optional[float]],
+        request_size: int,
+        response_size: int,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record one handled transaction.
+
+        Args:
+            code: Transaction code (UNKNOWN_TRANSACTION for unregistered ones)
+            marks: perf_counter() at the start, then at the end of each of
+                PHASES; None for a phase that did not run, in which case the
+                next phase is timed from the last mark
+            request_size: Payload bytes of the call
+            response_size: Payload bytes of the result
+            error: Error code name if the transaction did not succeed
+        """
+        with self._lock:
+            stats = self._transactions.get(code)
+            if stats is None:
+                stats = self._transactions[code] = TransactionStats()
+            stats.calls += 1
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+            last = marks[0]
+            for histogram, mark in zip(stats.phases, marks[1:]):
+                if mark is not None:
+                    histogram.observe(mark - last)
+                    last = mark
+            stats.total.observe(last - marks[0])
+            stats.request_size.observe(request_size)
+            stats.response_size.observe(response_size)
+
+    def connection_accepted(self) -> None:
+        with self._lock:
+            self.connections_accepted += 1
+
+    def connection_shed(self) -> None:
+        with self._lock:
+            self.connections_shed += 1
+
+    def subscription_started(self) -> None:
+        with self._lock:
+            self.subscriptions_started += 1
+
+    def snapshot(self, connections: int, subscriptions: int) -> Dict[str, Any]:
+        """
+        Get all metrics as plain data.
+
+        Args:
+            connections: Currently open connections
+            subscriptions: Currently active subscriptions
+        """
+        with self._lock:
+            transactions = {code: stats.snapshot() for code, stats in self._transactions.items()}
+            return {
+                "uptime": time.time() - self._started,
+                "connections": connections,
+                "subscriptions": subscriptions,
+                "connections_accepted": self.connections_accepted,
+                "connections_shed": self.connections_shed,
+                "subscriptions_started": self.subscriptions_started,
+                "transactions": transactions,
+            }
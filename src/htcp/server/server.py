@@ -6,14 +6,20 @@ TCP server with transaction and subscription decorator support.
 import socket
 import threading
 import logging
+import time
 
-from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
 
 from ..common.constants import (
     DEFAULT_LISTEN_BACKLOG,
     DEFAULT_MAX_CONNECTIONS,
     DEFAULT_READ_TIMEOUT,
     DEFAULT_WRITE_TIMEOUT,
+    DEFAULT_SHED_WORKERS,
+    REJECT_READ_TIMEOUT,
+    FEATURE_PING,
+    SERVER_FEATURES,
 )
 from ..common.proto import Packet, PacketType, ErrorCode
 from ..common.messages import (
@@ -22,6 +28,8 @@ from ..common.messages import (
     TransactionCall,
     TransactionResult,
     ErrorPacket,
+    PingPacket,
+    PongPacket,
     SubscribeRequest,
     UnsubscribeRequest,
     SubscribeData,
@@ -29,12 +37,15 @@ from ..common.messages import (
     SubscribeError,
 )
 from ..common.transport import recv_packet, send_packet
-from ..common.utils import prepare_arguments
+from ..common.utils import prepare_arguments, compute_capabilities_hash
 from ..exceptions import ConnectionError as HTCPConnectionError
 
-from .transaction import TransactionRegistry
+from .transaction import Transaction, TransactionRegistry
 from .connection import ServerClientConnection, ConnectionRegistry
 from .subscription import SubscriptionRegistry, ActiveSubscriptionRegistry
+from .session import session_arguments
+from .admission import AdmissionController
+from .metrics import ServerMetrics, STATS_TRANSACTION, UNKNOWN_TRANSACTION
 
 
 class Server:
@@ -58,6 +69,18 @@ class Server:
                 time.sleep(1)
 
         app.up()
+
+    With ``max_connect_rate`` set, new connections above that rate (per
+    second, after a ``connect_burst``) are shed with a SERVER_BUSY error
+    carrying a retry-after hint, as are connections over ``max_connections``.
+    At most ``shed_workers`` connections are turned away at a time; while they
+    are all busy, further shed connections are closed without the error.
+
+    Every transaction is timed per phase (deserialize, prepare, execute,
+    serialize, send) and counted per code along with its payload sizes;
+    stats() returns these with the open connection and subscription counts.
+    With ``expose_stats`` the same data is served as the ``__stats__``
+    transaction.
     """
 
     def __init__(
@@ -71,6 +94,10 @@ class Server:
         read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
         write_timeout: Optional[float] = DEFAULT_WRITE_TIMEOUT,
         listen_backlog: int = DEFAULT_LISTEN_BACKLOG,
+        max_connect_rate: Optional[float] = None,
+        connect_burst: Optional[int] = None,
+        expose_stats: bool = False,
+        shed_workers: int = DEFAULT_SHED_WORKERS,
     ):
         self.name = name
         self.host = host
@@ -81,6 +108,7 @@ class Server:
         self.read_timeout = read_timeout
         self.write_timeout = write_timeout
         self.listen_backlog = listen_backlog
+        self.shed_workers = shed_workers
 
         self._transactions = TransactionRegistry()
         self._subscriptions = SubscriptionRegistry()
@@ -89,6 +117,20 @@ class Server:
         self._running = False
         self._accept_thread: Optional[threading.Thread] = None
         self._clients = ConnectionRegistry(max_connections)
+        self._admission = (
+            AdmissionController(max_connect_rate, connect_burst) if max_connect_rate else None
+        )
+        self._metrics = ServerMetrics()
+        # One slot per shed worker, so queued sheds never pile up behind them
+        self._shed_executor: Optional[ThreadPoolExecutor] = None
+        self._shed_slots = threading.BoundedSemaphore(shed_workers)
+        if expose_stats:
+            self._transactions.register(STATS_TRANSACTION, self._stats_transaction)
+
+        # Built in up() once the registries are frozen
+        self._capabilities_hash: Optional[str] = None
+        self._handshake_packet: Optional[Packet] = None
+        self._handshake_ack_packet: Optional[Packet] = None
 
     def transaction(self, code: str) -> Callable:
         """
@@ -109,6 +151,21 @@ class Server:
 
         return decorator
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get server metrics.
+
+        Returns:
+            Dict with uptime, open connections, active subscriptions,
+            connection and subscription counters, and under "transactions"
+            per code: calls, errors by error code, latency histograms (total
+            and per phase, in seconds) and request/response size histograms
+        """
+        return self._metrics.snapshot(len(self._clients), len(self._active_subscriptions))
+
+    def _stats_transaction(self) -> Dict[str, Any]:
+        return self.stats()
+
     def subscription(self, event_type: str) -> Callable:
         """
         Decorator to register a subscription handler.
@@ -140,6 +197,11 @@ class Server:
             self.logger.warning("Server is already running")
             return
 
+        # Handlers are fixed from here on; lookups become lock-free reads
+        self._transactions.freeze()
+        self._subscriptions.freeze()
+        self._build_handshake()
+
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self._socket.bind((self.host, self.port))
@@ -181,6 +243,10 @@ class Server:
                 pass
             self._socket = None
 
+        if self._shed_executor:
+            self._shed_executor.shutdown(wait=False)
+            self._shed_executor = None
+
         self.logger.info(f"Server '{self.name}' stopped")
 
     def _accept_loop(self) -> None:
@@ -189,6 +255,15 @@ class Server:
             try:
                 client_sock, address = self._socket.accept()
 
+                if self._admission is not None:
+                    retry_after = self._admission.try_admit()
+                    if retry_after is not None:
+                        self._metrics.connection_shed()
+                        if self.logger.isEnabledFor(logging.DEBUG):
+                            self.logger.debug(f"Connection from {address} shed, retry after {retry_after:.2f}s")
+                        self._start_shed(client_sock, retry_after)
+                        continue
+
                 # Atomic check-and-add to prevent race condition
                 client = self._clients.try_add(
                     client_sock,
@@ -201,10 +276,13 @@ class Server:
                     self.logger.warning(
                         f"Connection from {address} rejected: max connections ({self.max_connections}) reached"
                     )
-                    client_sock.close()
+                    self._metrics.connection_shed()
+                    self._start_shed(client_sock, None)
                     continue
 
-                self.logger.info(f"New connection from {address[0]}:{address[1]}")
+                self._metrics.connection_accepted()
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"New connection from {address[0]}:{address[1]}")
 
                 thread = threading.Thread(
                     target=self._handle_client,
@@ -220,18 +298,74 @@ class Server:
                 if self._running:
                     self.logger.error(f"Error accepting connection: {e}")
 
+    def _start_shed(self, sock: socket.socket, retry_after: Optional[float]) -> None:
+        """Turn a connection away off the accept thread, or just close it if every shed worker is busy."""
+        if not self._shed_slots.acquire(blocking=False):
+            self._close_socket(sock)
+            return
+        try:
+            if self._shed_executor is None:
+                self._shed_executor = ThreadPoolExecutor(
+                    max_workers=self.shed_workers,
+                    thread_name_prefix=f"{self.name}-shed",
+                )
+            self._shed_executor.submit(self._shed, sock, retry_after)
+        except RuntimeError:
+            # Shut down meanwhile
+            self._shed_slots.release()
+            self._close_socket(sock)
+
+    def _shed(self, sock: socket.socket, retry_after: Optional[float]) -> None:
+        """
+        Turn a connection away with a SERVER_BUSY error.
+
+        The client's handshake is read first, so closing does not reset the
+        connection before the client has read the error.
+        """
+        try:
+            sock.settimeout(REJECT_READ_TIMEOUT)
+            recv_packet(sock)
+            send_packet(sock, ErrorPacket(ErrorCode.SERVER_BUSY, "Server busy", retry_after).to_packet())
+        except Exception:
+            pass
+        finally:
+            self._close_socket(sock)
+            self._shed_slots.release()
+
+    @staticmethod
+    def _close_socket(sock: socket.socket) -> None:
+        try:
+            sock.close()
+        except Exception:
+            pass
+
     def _handle_client(self, client: ServerClientConnection) -> None:
-        """Handle a single client connection."""
+        """
+        Handle a single client connection.
+
+        The socket timeout acts as the idle timer: the first timeout sends a
+        PING, a second one without any traffic in between drops the client.
+        Clients that did not announce PING in their handshake are dropped on
+        the first timeout, as before PING existed.
+        recv_packet only lets a timeout through before a packet has started;
+        one partway through a packet is a connection error and drops the
+        client, since the stream is out of sync.
+        """
+        ping_pending = False
         try:
             while self._running and client.connected:
                 try:
                     packet = recv_packet(client.socket)
+                    ping_pending = False
                     self._process_packet(client, packet)
                 except HTCPConnectionError:
                     break
                 except socket.timeout:
-                    self.logger.warning(f"Client {client.address} timed out")
-                    break
+                    if ping_pending or not client.accepts_ping:
+                        self.logger.warning(f"Client {client.address} timed out")
+                        break
+                    ping_pending = True
+                    self._send_packet(client, PingPacket().to_packet())
                 except Exception as e:
                     self.logger.error(f"Error processing packet from {client.address}: {e}")
                     self._send_error(client, ErrorCode.PROTOCOL_ERROR, str(e))
@@ -243,7 +377,8 @@ class Server:
 
             self._clients.remove(client.address)
             client.close()
-            self.logger.info(f"Client {client.address[0]}:{client.address[1]} disconnected")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Client {client.address[0]}:{client.address[1]} disconnected")
 
     def _process_packet(self, client: ServerClientConnection, packet: Packet) -> None:
         """Process incoming packet from client."""
@@ -259,23 +394,42 @@ class Server:
         elif packet.packet_type == PacketType.UNSUBSCRIBE_REQUEST:
             self._handle_unsubscribe(client, packet)
 
+        elif packet.packet_type == PacketType.PING:
+            self._send_packet(client, PongPacket().to_packet())
+
+        elif packet.packet_type == PacketType.PONG:
+            pass
+
         elif packet.packet_type == PacketType.DISCONNECT:
             client.connected = False
 
         else:
             self._send_error(client, ErrorCode.PROTOCOL_ERROR, f"Unknown packet type: {packet.packet_type}")
 
+    def _build_handshake(self) -> None:
+        """Precompute the full and resume handshake responses."""
+        transactions = self._transactions.list_codes() if self.expose_transactions else []
+        features = list(SERVER_FEATURES)
+        self._capabilities_hash = compute_capabilities_hash(self.name, transactions, features)
+        self._handshake_packet = HandshakeResponse(
+            server_name=self.name,
+            transactions=transactions,
+            capabilities_hash=self._capabilities_hash,
+            features=features
+        ).to_packet()
+        self._handshake_ack_packet = HandshakeResponse.acknowledge(self._capabilities_hash).to_packet()
+
     def _handle_handshake(self, client: ServerClientConnection, packet: Packet) -> None:
         """Handle handshake request."""
         try:
-            HandshakeRequest.from_packet(packet)
+            request = HandshakeRequest.from_packet(packet)
+            client.accepts_ping = FEATURE_PING in request.features
 
-            transactions = self._transactions.list_codes() if self.expose_transactions else []
-            response = HandshakeResponse(
-                server_name=self.name,
-                transactions=transactions
-            )
-            self._send_packet(client, response.to_packet())
+            if request.capabilities_hash is not None and request.capabilities_hash == self._capabilities_hash:
+                response_packet = self._handshake_ack_packet
+            else:
+                response_packet = self._handshake_packet
+            self._send_packet(client, response_packet)
 
         except Exception as e:
             self.logger.error(f"Handshake error: {e}")
@@ -283,58 +437,90 @@ class Server:
 
     def _handle_transaction(self, client: ServerClientConnection, packet: Packet) -> None:
         """Handle transaction call."""
+        # perf_counter() at the start and after each of PHASES; None if skipped
+        marks = [time.perf_counter(), None, None, None, None, None]
         try:
             call = TransactionCall.from_packet(packet)
             transaction_code = call.transaction_code
+            marks[1] = time.perf_counter()
 
-            self.logger.info(f"Transaction call '{transaction_code}' from {client.address[0]}:{client.address[1]}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Transaction call '{transaction_code}' from {client.address[0]}:{client.address[1]}")
 
             # Find transaction
             trans = self._transactions.get(transaction_code)
             if not trans:
-                self.logger.info(f"Unknown transaction: {transaction_code}")
-                self._send_result(client, TransactionResult(
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Unknown transaction: {transaction_code}")
+                transaction_code = UNKNOWN_TRANSACTION
+                result = TransactionResult(
                     success=False,
                     error_code=ErrorCode.UNKNOWN_TRANSACTION,
-                    error_message=f"Unknown transaction: {transaction_code}"
-                ))
-                return
-
-            # Prepare arguments with type conversion
-            try:
-                prepared_args = prepare_arguments(trans.func, call.arguments)
-            except Exception as e:
-                self.logger.error(f"Argument preparation error: {e}")
-                self._send_result(client, TransactionResult(
-                    success=False,
-                    error_code=ErrorCode.INVALID_ARGUMENTS,
-                    error_message=str(e)
-                ))
-                return
-
-            # Execute transaction
-            try:
-                result = trans.func(**prepared_args)
-
-                self.logger.debug(f"Transaction '{transaction_code}' completed successfully")
-                self._send_result(client, TransactionResult(
-                    success=True,
-                    result=result,
-                    error_code=ErrorCode.SUCCESS
-                ))
-
-            except Exception as e:
-                self.logger.error(f"Transaction execution error: {e}")
-                self._send_result(client, TransactionResult(
-                    success=False,
-                    error_code=ErrorCode.EXECUTION_ERROR,
-                    error_message=str(e)
-                ))
+                    error_message=f"Unknown transaction: {call.transaction_code}"
+                )
+            else:
+                result = self._execute_transaction(client, trans, call, marks)
+
+            response = result.to_packet()
+            marks[4] = time.perf_counter()
+            self._send_packet(client, response)
+            marks[5] = time.perf_counter()
+
+            self._metrics.record_transaction(
+                transaction_code,
+                marks,
+                len(packet.payload),
+                len(response.payload),
+                None if result.success else result.error_code.name,
+            )
 
         except Exception as e:
             self.logger.error(f"Transaction handling error: {e}")
             self._send_error(client, ErrorCode.INTERNAL_ERROR, str(e))
 
+    def _execute_transaction(
+        self,
+        client: ServerClientConnection,
+        trans: Transaction,
+        call: TransactionCall,
+        marks: list
+    ) -> TransactionResult:
+        """Prepare arguments and run a transaction, marking the end of each phase."""
+        # Prepare arguments with type conversion
+        try:
+            prepared_args = prepare_arguments(
+                trans.func, call.arguments, session_arguments(trans, client.session)
+            )
+        except Exception as e:
+            self.logger.error(f"Argument preparation error: {e}")
+            return TransactionResult(
+                success=False,
+                error_code=ErrorCode.INVALID_ARGUMENTS,
+                error_message=str(e)
+            )
+        marks[2] = time.perf_counter()
+
+        # Execute transaction
+        try:
+            result = trans.func(**prepared_args)
+        except Exception as e:
+            self.logger.error(f"Transaction execution error: {e}")
+            return TransactionResult(
+                success=False,
+                error_code=ErrorCode.EXECUTION_ERROR,
+                error_message=str(e)
+            )
+        finally:
+            marks[3] = time.perf_counter()
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Transaction '{call.transaction_code}' completed successfully")
+        return TransactionResult(
+            success=True,
+            result=result,
+            error_code=ErrorCode.SUCCESS
+        )
+
     def _handle_subscribe(self, client: ServerClientConnection, packet: Packet) -> None:
         """Handle subscription request."""
         try:
@@ -342,15 +528,17 @@ class Server:
             subscription_id = request.subscription_id
             event_type = request.event_type
 
-            self.logger.info(
-                f"Subscribe request '{event_type}' (id={subscription_id}) "
-                f"from {client.address[0]}:{client.address[1]}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"Subscribe request '{event_type}' (id={subscription_id}) "
+                    f"from {client.address[0]}:{client.address[1]}"
+                )
 
             # Find subscription handler
             sub = self._subscriptions.get(event_type)
             if not sub:
-                self.logger.info(f"Unknown subscription: {event_type}")
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Unknown subscription: {event_type}")
                 self._send_subscribe_error(
                     client, subscription_id,
                     ErrorCode.UNKNOWN_TRANSACTION,
@@ -360,7 +548,9 @@ class Server:
 
             # Prepare arguments
             try:
-                prepared_args = prepare_arguments(sub.func, request.arguments)
+                prepared_args = prepare_arguments(
+                    sub.func, request.arguments, session_arguments(sub, client.session)
+                )
             except Exception as e:
                 self.logger.error(f"Subscription argument preparation error: {e}")
                 self._send_subscribe_error(
@@ -382,6 +572,7 @@ class Server:
                     generator=generator,
                     is_async=sub.is_async
                 )
+                self._metrics.subscription_started()
 
                 # Run generator in separate thread
                 thread = threading.Thread(
@@ -442,15 +633,17 @@ class Server:
             request = UnsubscribeRequest.from_packet(packet)
             subscription_id = request.subscription_id
 
-            self.logger.info(
-                f"Unsubscribe request (id={subscription_id}) "
-                f"from {client.address[0]}:{client.address[1]}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"Unsubscribe request (id={subscription_id}) "
+                    f"from {client.address[0]}:{client.address[1]}"
+                )
 
             active_sub = self._active_subscriptions.remove(subscription_id)
             if active_sub:
                 active_sub.cancel()
-                self.logger.debug(f"Cancelled subscription '{subscription_id}'")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Cancelled subscription '{subscription_id}'")
 
         except Exception as e:
             self.logger.error(f"Unsubscribe handling error: {e}")
@@ -463,10 +656,6 @@ class Server:
             self.logger.error(f"Error sending packet: {e}")
             client.connected = False
 
-    def _send_result(self, client: ServerClientConnection, result: TransactionResult) -> None:
-        """Send transaction result to client."""
-        self._send_packet(client, result.to_packet())
-
     def _send_error(self, client: ServerClientConnection, error_code: ErrorCode, message: str) -> None:
         """Send error packet to client."""
         error = ErrorPacket(error_code, message)
@@ -0,0 +1,72 @@
+"""
+HTCP Server Session Module
+Connection-scoped session context for handlers.
+"""
+
+from typing import Any, Dict, Optional, Tuple, Type
+
+
+class SessionContext:
+    """
+    Per-connection session state.
+
+    Every client connection gets its own context, dropped when the client
+    disconnects. A handler receives it by declaring a parameter annotated
+    with ``SessionContext``; the server injects it, and a value sent by the
+    client under that name is ignored.
+
+    Typical use is an authenticate transaction that validates credentials
+    once and binds the resulting identity, so later handlers on the same
+    connection read ``session.identity`` instead of looking up a token on
+    every call:
+
+        @server.transaction(code="authenticate")
+        async def authenticate(token: str, session: SessionContext) -> bool:
+            session.bind(await users.by_token(token))
+            return session.authenticated
+
+        @server.transaction(code="get_profile")
+        async def get_profile(session: SessionContext) -> dict:
+            if not session.authenticated:
+                raise PermissionError("Not authenticated")
+            return session.identity.profile()
+    """
+
+    def __init__(self, address: Tuple[str, int]):
+        self._address = address
+        self.identity: Any = None
+        self.data: Dict[str, Any] = {}
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Get client address (host, port)."""
+        return self._address
+
+    @property
+    def authenticated(self) -> bool:
+        """Check if an identity is bound."""
+        return self.identity is not None
+
+    def bind(self, identity: Any) -> None:
+        """Bind an identity to the connection."""
+        self.identity = identity
+
+    def clear(self) -> None:
+        """Drop the bound identity and any session data."""
+        self.identity = None
+        self.data.clear()
+
+
+def find_session_param(param_types: Dict[str, Type]) -> Optional[str]:
+    """Get the name of the handler parameter annotated with SessionContext, if any."""
+    for name, param_type in param_types.items():
+        if param_type is SessionContext:
+            return name
+    return None
+
+
+def session_arguments(handler: Any, session: SessionContext) -> Optional[Dict[str, Any]]:
+    """Build the injected arguments for a Transaction or Subscription that takes a session."""
+    if handler.session_param is None:
+        return None
+    return {handler.session_param: session}
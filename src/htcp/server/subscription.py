@@ -9,6 +9,7 @@ import inspect
 from typing import Callable, Dict, Optional, Type, Any, Generator, AsyncGenerator
 
 from ..common.utils import get_function_signature
+from .session import find_session_param
 
 
 class Subscription:
@@ -20,13 +21,16 @@ class Subscription:
         func: Callable,
         param_types: Dict[str, Type],
         yield_type: Type,
-        is_async: bool
+        is_async: bool,
+        session_param: Optional[str] = None
     ):
         self.event_type = event_type
         self.func = func
         self.param_types = param_types
         self.yield_type = yield_type
         self.is_async = is_async
+        # Parameter that receives the connection's SessionContext
+        self.session_param = session_param
 
 
 def _get_yield_type(func: Callable) -> Type:
@@ -51,11 +55,16 @@ class SubscriptionRegistry:
     Thread-safe registry for server subscriptions.
 
     Provides methods to register and retrieve subscription handlers.
+
+    Registration is copy-on-write: the published dict is never mutated, so
+    lookups read it without taking a lock. The registry is frozen when the
+    server starts.
     """
 
     def __init__(self):
         self._subscriptions: Dict[str, Subscription] = {}
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._frozen = False
 
     def register(
         self,
@@ -78,6 +87,7 @@ class SubscriptionRegistry:
 
         Raises:
             ValueError: If event_type is already registered or func is not a generator
+            RuntimeError: If the registry is frozen
         """
         # Check if it's a generator function
         is_async = inspect.isasyncgenfunction(func)
@@ -99,16 +109,30 @@ class SubscriptionRegistry:
             func=func,
             param_types=param_types,
             yield_type=yield_type,
-            is_async=is_async
+            is_async=is_async,
+            session_param=find_session_param(param_types)
         )
 
         with self._lock:
+            if self._frozen:
+                raise RuntimeError(f"Cannot register subscription '{event_type}': registry is frozen")
             if event_type in self._subscriptions:
                 raise ValueError(f"Subscription '{event_type}' is already registered")
-            self._subscriptions[event_type] = sub
+            subscriptions = dict(self._subscriptions)
+            subscriptions[event_type] = sub
+            self._subscriptions = subscriptions
 
         return sub
 
+    def freeze(self) -> None:
+        """Disallow further registrations."""
+        with self._lock:
+            self._frozen = True
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
     def get(self, event_type: str) -> Optional[Subscription]:
         """
         Get a subscription by event_type.
@@ -119,8 +143,7 @@ class SubscriptionRegistry:
         Returns:
             Subscription object or None if not found
         """
-        with self._lock:
-            return self._subscriptions.get(event_type)
+        return self._subscriptions.get(event_type)
 
     def list_event_types(self) -> list[str]:
         """
@@ -129,16 +152,13 @@ class SubscriptionRegistry:
         Returns:
             List of event types
         """
-        with self._lock:
-            return list(self._subscriptions.keys())
+        return list(self._subscriptions.keys())
 
     def __len__(self) -> int:
-        with self._lock:
-            return len(self._subscriptions)
+        return len(self._subscriptions)
 
     def __contains__(self, event_type: str) -> bool:
-        with self._lock:
-            return event_type in self._subscriptions
+        return event_type in self._subscriptions
 
 
 class ActiveSubscription:
@@ -245,3 +265,7 @@ class ActiveSubscriptionRegistry:
         with self._lock:
             sub_ids = self._by_client.get(client_address, set())
             return [self._subscriptions[sid] for sid in sub_ids if sid in self._subscriptions]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
@@ -8,6 +8,7 @@ import threading
 from typing import Callable, Dict, Optional, Type
 
 from ..common.utils import get_function_signature, get_return_type
+from .session import find_session_param
 
 
 class Transaction:
@@ -18,12 +19,15 @@ class Transaction:
         code: str,
         func: Callable,
         param_types: Dict[str, Type],
-        return_type: Type
+        return_type: Type,
+        session_param: Optional[str] = None
     ):
         self.code = code
         self.func = func
         self.param_types = param_types
         self.return_type = return_type
+        # Parameter that receives the connection's SessionContext
+        self.session_param = session_param
 
 
 class TransactionRegistry:
@@ -31,11 +35,16 @@ class TransactionRegistry:
     Thread-safe registry for server transactions.
 
     Provides methods to register and retrieve transaction handlers.
+
+    Registration is copy-on-write: the published dict is never mutated, so
+    lookups read it without taking a lock. The registry is frozen when the
+    server starts.
     """
 
     def __init__(self):
         self._transactions: Dict[str, Transaction] = {}
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._frozen = False
 
     def register(
         self,
@@ -58,6 +67,7 @@ class TransactionRegistry:
 
         Raises:
             ValueError: If transaction code is already registered
+            RuntimeError: If the registry is frozen
         """
         if param_types is None:
             param_types = get_function_signature(func)
@@ -68,16 +78,30 @@ class TransactionRegistry:
             code=code,
             func=func,
             param_types=param_types,
-            return_type=return_type
+            return_type=return_type,
+            session_param=find_session_param(param_types)
         )
 
         with self._lock:
+            if self._frozen:
+                raise RuntimeError(f"Cannot register transaction '{code}': registry is frozen")
             if code in self._transactions:
                 raise ValueError(f"Transaction '{code}' is already registered")
-            self._transactions[code] = trans
+            transactions = dict(self._transactions)
+            transactions[code] = trans
+            self._transactions = transactions
 
         return trans
 
+    def freeze(self) -> None:
+        """Disallow further registrations."""
+        with self._lock:
+            self._frozen = True
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
     def get(self, code: str) -> Optional[Transaction]:
         """
         Get a transaction by code.
@@ -88,8 +112,7 @@ class TransactionRegistry:
         Returns:
             Transaction object or None if not found
         """
-        with self._lock:
-            return self._transactions.get(code)
+        return self._transactions.get(code)
 
     def list_codes(self) -> list[str]:
         """
@@ -98,13 +121,10 @@ class TransactionRegistry:
         Returns:
             List of transaction codes
         """
-        with self._lock:
-            return list(self._transactions.keys())
+        return list(self._transactions.keys())
 
     def __len__(self) -> int:
-        with self._lock:
-            return len(self._transactions)
+        return len(self._transactions)
 
     def __contains__(self, code: str) -> bool:
-        with self._lock:
-            return code in self._transactions
+        return code in self._transactions
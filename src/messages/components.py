@@ -10,15 +10,7 @@ class MessageBubble(ft.Container):
 
         sender_name = message.sender_user.display_name if message.sender_user else "Unknown"
         text_content = message.text or "(empty)"
-
-        time_str = ""
-        if message.created_at:
-            try:
-                from datetime import datetime
-                dt = datetime.fromisoformat(str(message.created_at))
-                time_str = dt.strftime("%H:%M")
-            except (ValueError, TypeError):
-                pass
+        time_str = message.time_label
 
         bubble_color = ft.Colors.PRIMARY_CONTAINER if is_mine else ft.Colors.SURFACE_CONTAINER
 
@@ -28,7 +20,27 @@ class MessageBubble(ft.Container):
                 ft.Text(sender_name, size=11, weight=ft.FontWeight.BOLD, color=ft.Colors.PRIMARY)
             )
         controls.append(ft.Text(text_content, size=14))
-        if time_str:
+        if message.failed:
+            controls.append(
+                ft.Row(
+                    [
+                        ft.Icon(ft.Icons.ERROR_OUTLINE, size=12, color=ft.Colors.ERROR),
+                        ft.Text("Not sent", size=10, color=ft.Colors.ERROR),
+                    ],
+                    spacing=4, tight=True,
+                )
+            )
+        elif message.pending:
+            controls.append(
+                ft.Row(
+                    [
+                        ft.Icon(ft.Icons.SCHEDULE, size=12, color=ft.Colors.ON_SURFACE_VARIANT),
+                        ft.Text(time_str, size=10, color=ft.Colors.ON_SURFACE_VARIANT),
+                    ],
+                    spacing=4, tight=True,
+                )
+            )
+        elif time_str:
             controls.append(
                 ft.Text(time_str, size=10, color=ft.Colors.ON_SURFACE_VARIANT)
             )
@@ -44,6 +56,7 @@ class MessageBubble(ft.Container):
         super().__init__(
             content=content,
             bgcolor=bubble_color,
+            opacity=0.6 if message.pending else 1.0,
             border_radius=ft.border_radius.all(12),
             padding=ft.padding.symmetric(horizontal=12, vertical=8),
             margin=ft.margin.only(
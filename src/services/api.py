@@ -1,20 +1,52 @@
 import asyncio
 import hashlib
 import logging
+import uuid
 from typing import Optional
 
 import flet as ft
 
 from src.htcp.aio_client import AsyncClient
-from src.common.models import Result
+from src.htcp.client import ReconnectPolicy
+from src.htcp.common import TypedDecoder
+from src.htcp.exceptions import ConnectionError as HTCPConnectionError, TimeoutError as HTCPTimeoutError
+from src.common.models import ACCOUNTS, Account, Message, MessageTag, Result
+from src.services.outbox import OP_DELETE, OP_EDIT, OP_SEND, OutboundOp, Outbox
 
 logger = logging.getLogger("ghosty.api")
 
+HEARTBEAT_INTERVAL = 30
+# Jittered backoff so clients dropped by a server restart do not return in lockstep
+RECONNECT_POLICY = ReconnectPolicy(base_delay=1.0, max_delay=60.0)
+# Binds the token to the connection when the server offers it
+SESSION_TRANSACTION = "authenticate"
+# Error code of a message operation parked in the outbox until the connection is back
+QUEUED = "queued"
+
+_OP_TRANSACTIONS = {OP_SEND: "send_message", OP_EDIT: "edit_message", OP_DELETE: "delete_message"}
+
+# History pages are decoded straight into Messages, senders shared through the account map;
+# messages and tags default missing fields as from_dict does rather than failing the page
+MESSAGE_PAGE = TypedDecoder(
+    Result[list[Message]],
+    factories={
+        Account: ACCOUNTS.from_dict,
+        Result: Result.from_raw,
+        Message: Message.from_fields,
+        MessageTag: MessageTag.from_fields,
+    },
+)
+
 
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode("utf-8")).hexdigest()
 
 
+def text_contents(text: str) -> list[dict]:
+    """Message contents for plain text, as send_message and edit_message send them."""
+    return [{"type": "text", "resource_name": "db", "content": text}]
+
+
 def detect_agent(page: ft.Page) -> str:
     if page.platform in (ft.PagePlatform.ANDROID, ft.PagePlatform.IOS):
         return "ghosty-mobile"
@@ -25,7 +57,10 @@ class ApiService:
     def __init__(self):
         self._client: Optional[AsyncClient] = None
         self._token: Optional[str] = None
-        self._call_lock = asyncio.Lock()
+        self._session_token: Optional[str] = None
+        self._session_lock = asyncio.Lock()
+        self.outbox = Outbox()
+        self._flush_lock = asyncio.Lock()
 
     @property
     def connected(self) -> bool:
@@ -34,13 +69,23 @@ class ApiService:
     async def connect(self, host: str, port: int):
         if self._client and self._client.connected:
             await self._client.disconnect()
-        self._client = AsyncClient(server_host=host, server_port=port)
+        self._session_token = None
+        self._client = AsyncClient(
+            server_host=host, server_port=port, heartbeat_interval=HEARTBEAT_INTERVAL,
+            multiplex=True,
+        )
         await self._client.connect()
 
     async def disconnect(self):
         if self._client and self._client.connected:
             await self._client.disconnect()
         self._client = None
+        self._session_token = None
+
+    @property
+    def has_heartbeat(self) -> bool:
+        """Whether protocol PINGs keep the connection alive; older servers do not support them."""
+        return self.connected and self._client.supports_ping
 
     def get_client(self) -> Optional[AsyncClient]:
         return self._client
@@ -53,53 +98,56 @@ class ApiService:
 
     def clear_token(self):
         self._token = None
-
-    async def create_subscription_client(self) -> Optional[AsyncClient]:
-        if not self._client:
-            return None
-        host = self._client.server_host
-        port = self._client.server_port
-        try:
-            sub_client = AsyncClient(server_host=host, server_port=port, read_timeout=None)
-            await sub_client.connect()
-            return sub_client
-        except Exception as e:
-            logger.warning(f"Subscription client connect failed: {e}")
-            return None
+        self._session_token = None
 
     async def reconnect(self) -> bool:
         if not self._client:
             return False
-        host = self._client.server_host
-        port = self._client.server_port
-        try:
-            await self._client.disconnect()
-        except Exception:
-            pass
+        self._session_token = None
         try:
-            self._client = AsyncClient(server_host=host, server_port=port)
-            await self._client.connect()
+            await self._client.reconnect(RECONNECT_POLICY)
             return True
         except Exception as e:
             logger.warning(f"Reconnect failed: {e}")
             return False
 
-    async def _call(self, transaction: str, **kwargs) -> Result:
+    async def _call(self, transaction: str, result_type=None, **kwargs) -> Result:
         if not self.connected:
             return Result(success=False, errors=[("connection", "Not connected to server")], data=None)
-        async with self._call_lock:
-            try:
-                raw = await self._client.call(transaction=transaction, **kwargs)
-                return Result.from_raw(raw)
-            except Exception as e:
-                logger.error(f"API call '{transaction}' failed: {e}")
-                return Result(success=False, errors=[("exception", str(e))], data=None)
+        try:
+            raw = await self._client.call(transaction=transaction, result_type=result_type, **kwargs)
+            return raw if isinstance(raw, Result) else Result.from_raw(raw)
+        except (HTCPConnectionError, HTCPTimeoutError, asyncio.TimeoutError) as e:
+            # The call may or may not have reached the server
+            logger.warning(f"API call '{transaction}' lost the connection: {e}")
+            return Result(success=False, errors=[("connection", f"Connection lost: {e}")], data=None)
+        except Exception as e:
+            logger.error(f"API call '{transaction}' failed: {e}")
+            return Result(success=False, errors=[("exception", str(e))], data=None)
 
     async def _auth_call(self, transaction: str, **kwargs) -> Result:
         if not self._token:
             return Result(success=False, errors=[("auth", "No token")], data=None)
+        if await self._bind_session():
+            return await self._call(transaction, **kwargs)
         return await self._call(transaction, token=self._token, **kwargs)
 
+    async def _bind_session(self) -> bool:
+        if self._session_token is not None and self._session_token == self._token:
+            return True
+        if not self.connected:
+            return False
+        if SESSION_TRANSACTION not in self._client.server_info()["available_transactions"]:
+            return False
+        async with self._session_lock:
+            if self._session_token != self._token:
+                token = self._token
+                result = await self._call(SESSION_TRANSACTION, token=token)
+                if not result.success:
+                    return False
+                self._session_token = token
+        return True
+
     # --- Auth ---
 
     async def login(self, username: str, password: str, agent: str) -> Result:
@@ -178,15 +226,93 @@ class ApiService:
         kwargs = {"chat_id": chat_id, "limit": limit}
         if before_id is not None:
             kwargs["before_id"] = before_id
-        return await self._auth_call("get_messages", **kwargs)
-
-    async def send_message(self, chat_id: int, text: str) -> Result:
-        contents = [{"type": "text", "resource_name": "db", "content": text}]
-        return await self._auth_call("send_message", chat_id=chat_id, contents=contents)
+        result = await self._auth_call("get_messages", result_type=MESSAGE_PAGE, **kwargs)
+        if result.success and result.data:
+            # A server that does not wrap its results falls back to dicts
+            result.data = Message.from_dicts(result.data)
+        return result
 
-    async def delete_message(self, message_id: int) -> Result:
-        return await self._auth_call("delete_message", message_id=message_id)
+    async def send_message(self, chat_id: int, text: str, key: str = None, after_id: int = None) -> Result:
+        """after_id: newest message id of the chat known now, to recognise this send if it is lost in flight."""
+        contents = text_contents(text)
+        return await self._outbound(
+            OP_SEND, chat_id, key, {"chat_id": chat_id, "contents": contents}, after_id=after_id,
+        )
 
-    async def edit_message(self, message_id: int, new_text: str) -> Result:
-        new_contents = [{"type": "text", "resource_name": "db", "content": new_text}]
-        return await self._auth_call("edit_message", message_id=message_id, new_contents=new_contents)
+    async def delete_message(self, message_id: int, chat_id: int = None, key: str = None) -> Result:
+        return await self._outbound(OP_DELETE, chat_id, key, {"message_id": message_id})
+
+    async def edit_message(self, message_id: int, new_text: str, chat_id: int = None, key: str = None) -> Result:
+        new_contents = text_contents(new_text)
+        return await self._outbound(OP_EDIT, chat_id, key, {"message_id": message_id, "new_contents": new_contents})
+
+    # --- Outbox ---
+
+    async def _outbound(
+        self, op: str, chat_id: Optional[int], key: Optional[str], args: dict, after_id: int = None,
+    ) -> Result:
+        """
+        Run a message operation now, or queue it under its idempotency key if
+        the connection is down or earlier operations for the chat still wait.
+        """
+        queued = OutboundOp(key=key or uuid.uuid4().hex, op=op, chat_id=chat_id, args=args, after_id=after_id)
+        if queued.key in self.outbox:
+            return self._queued_result()
+        if self.connected and not self.outbox.has_chat(chat_id):
+            result = await self._auth_call(_OP_TRANSACTIONS[op], **args)
+            if not self._not_connected(result):
+                return result
+            # It was on the wire when the connection dropped
+            queued.in_doubt = True
+
+        self.outbox.put(queued)
+        if self.connected:
+            results = await self.flush_outbox()
+            if queued.key in results:
+                return results[queued.key]
+        return self._queued_result()
+
+    async def flush_outbox(self) -> dict[str, Result]:
+        """
+        Send queued operations. Chats are flushed concurrently over the
+        multiplexed connection, each chat strictly in queue order; a chat
+        stops at the first operation that finds the connection down, and at a
+        send in doubt, which is not repeated until settled (Outbox.settle).
+
+        Returns:
+            Result per idempotency key of every operation that left the queue
+        """
+        results: dict[str, Result] = {}
+
+        async def flush_chat(ops: list[OutboundOp]):
+            for op in ops:
+                if (op.in_doubt and op.op == OP_SEND) or not self.connected:
+                    return
+                result = await self._auth_call(_OP_TRANSACTIONS[op.op], **op.args)
+                if self._not_connected(result):
+                    # Lost on the wire, not before it
+                    self.outbox.mark_in_doubt(op.key)
+                    return
+                self.outbox.remove(op.key)
+                results[op.key] = result
+
+        async with self._flush_lock:
+            groups = self.outbox.by_chat()
+            if groups and self.connected:
+                await asyncio.gather(*(flush_chat(ops) for ops in groups.values()))
+        return results
+
+    @staticmethod
+    def token_rejected(result: Result) -> bool:
+        """Whether a verify_token result refuses the token, as opposed to not reaching the server."""
+        if result.success:
+            return not result.data
+        return bool(result.errors) and result.errors[0][0] == "auth"
+
+    @staticmethod
+    def _not_connected(result: Result) -> bool:
+        return not result.success and bool(result.errors) and result.errors[0][0] == "connection"
+
+    @staticmethod
+    def _queued_result() -> Result:
+        return Result(success=False, errors=[(QUEUED, "Queued until the connection is back")], data=None)
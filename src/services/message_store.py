@@ -0,0 +1,344 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from src.common.models import Message
+
+logger = logging.getLogger("ghosty.store")
+
+MAX_MESSAGES_PER_CHAT = 500
+MAX_CACHED_CHATS = 50
+
+# get_messages only pages backwards, so a sync asks for a small newest page
+# first and walks back until it overlaps what is already stored
+DELTA_PAGE_SIZE = 20
+HISTORY_PAGE_SIZE = 50
+MAX_SYNC_PAGES = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chats (
+    chat_id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    last_access REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (chat_id, message_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _write(method):
+    """Queue a write on the store's worker thread; returns at once, writes apply in order."""
+    @functools.wraps(method)
+    def queue(self, *args, **kwargs):
+        try:
+            future = self._executor.submit(method, self, *args, **kwargs)
+        except RuntimeError:
+            # Closed while the caller was waiting on the server
+            return
+        future.add_done_callback(_log_failed_write)
+    return queue
+
+
+def _read(method):
+    """Run a read on the store's worker thread, after every write queued before it."""
+    @functools.wraps(method)
+    async def run(self, *args, **kwargs):
+        return await asyncio.wrap_future(self._executor.submit(method, self, *args, **kwargs))
+    return run
+
+
+def _log_failed_write(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"Local store write failed: {future.exception()}")
+
+
+def default_store_path(host: str, port: int, user_id: int) -> Path:
+    base = os.environ.get("FLET_APP_STORAGE_DATA") or os.path.join(Path.home(), ".ghosty")
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{host}_{port}_{user_id}")
+    return Path(base) / f"messages_{name}.sqlite3"
+
+
+class MessageStore:
+    """
+    On-disk cache of the chat list and recent messages, as the raw dicts the
+    server returns. Keeps at most max_messages_per_chat newest messages per
+    chat, and messages for at most max_cached_chats most recently used chats.
+
+    sqlite calls run on one worker thread, off the event loop: writes are
+    queued and return at once, reads are awaited. The thread runs them in
+    the order they were made, so a read sees every earlier write.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_messages_per_chat: int = MAX_MESSAGES_PER_CHAT,
+        max_cached_chats: int = MAX_CACHED_CHATS,
+    ):
+        self.max_messages_per_chat = max_messages_per_chat
+        self.max_cached_chats = max_cached_chats
+
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ghosty-store")
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> Future:
+        """Close once the queued writes are done, without waiting for them; the future tells when."""
+        closed = self._executor.submit(self._close)
+        self._executor.shutdown(wait=False)
+        return closed
+
+    def _close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Chats ---
+
+    @_read
+    def get_chats(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM chats ORDER BY position").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    @_write
+    def put_chats(self, chats: list[dict]):
+        rows = [
+            (c["chat_id"], position, json.dumps(c))
+            for position, c in enumerate(chats)
+            if isinstance(c, dict) and "chat_id" in c
+        ]
+        ids = [(r[0],) for r in rows]
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_chats (chat_id INTEGER PRIMARY KEY)")
+            self._conn.execute("DELETE FROM keep_chats")
+            self._conn.executemany("INSERT OR IGNORE INTO keep_chats VALUES (?)", ids)
+            # Chats we are no longer a member of take their messages with them
+            self._conn.execute("DELETE FROM messages WHERE chat_id NOT IN (SELECT chat_id FROM keep_chats)")
+            self._conn.execute("DELETE FROM chats WHERE chat_id NOT IN (SELECT chat_id FROM keep_chats)")
+            self._conn.executemany(
+                "INSERT INTO chats (chat_id, position, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET position = excluded.position, data = excluded.data",
+                rows,
+            )
+
+    # --- Messages ---
+
+    @_read
+    def get_messages(self, chat_id: int, limit: int = HISTORY_PAGE_SIZE) -> list[dict]:
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT data FROM messages WHERE chat_id = ? ORDER BY message_id DESC LIMIT ?",
+                (chat_id, limit),
+            ).fetchall()
+            self._touch(chat_id)
+        return [json.loads(data) for (data,) in reversed(rows)]
+
+    @_read
+    def newest_message_id(self, chat_id: int) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(message_id) FROM messages WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    @_write
+    def put_messages(self, chat_id: int, messages: list[dict]):
+        rows = [
+            (chat_id, m["message_id"], json.dumps(m))
+            for m in messages
+            if isinstance(m, dict) and "message_id" in m
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (chat_id, message_id, data) VALUES (?, ?, ?)", rows,
+            )
+            self._touch(chat_id)
+            self._trim(chat_id)
+            self._evict()
+
+    @_write
+    def delete_message(self, chat_id: int, message_id: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM messages WHERE chat_id = ? AND message_id = ?", (chat_id, message_id),
+            )
+
+    @_write
+    def edit_message(self, chat_id: int, message_id: int, contents: list):
+        """Replace the contents of a stored message; no-op if it is not stored."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT data FROM messages WHERE chat_id = ? AND message_id = ?", (chat_id, message_id),
+            ).fetchone()
+            if row is None:
+                return
+            data = json.loads(row[0])
+            data["contents"] = contents
+            self._conn.execute(
+                "UPDATE messages SET data = ? WHERE chat_id = ? AND message_id = ?",
+                (json.dumps(data), chat_id, message_id),
+            )
+
+    @_write
+    def delete_missing(self, chat_id: int, low: int, high: int, keep_ids: set[int]):
+        """Drop stored messages in [low, high] that the server no longer returned."""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT message_id FROM messages WHERE chat_id = ? AND message_id BETWEEN ? AND ?",
+                (chat_id, low, high),
+            ).fetchall()
+            gone = [(chat_id, mid) for (mid,) in rows if mid not in keep_ids]
+            self._conn.executemany(
+                "DELETE FROM messages WHERE chat_id = ? AND message_id = ?", gone,
+            )
+
+    @_write
+    def drop_messages(self, chat_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE chat_id = ?", (chat_id,))
+
+    @_write
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages")
+            self._conn.execute("DELETE FROM chats")
+            self._conn.execute("DELETE FROM outbox")
+
+    # --- Outbox ---
+
+    @_read
+    def get_outbox(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM outbox ORDER BY seq").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    @_write
+    def put_outbox(self, key: str, data: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, data) VALUES (?, ?)", (key, json.dumps(data)),
+            )
+
+    @_write
+    def update_outbox(self, key: str, data: dict):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE outbox SET data = ? WHERE key = ?", (json.dumps(data), key))
+
+    @_write
+    def delete_outbox(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM outbox WHERE key = ?", (key,))
+
+    # --- Bounds (caller holds the lock) ---
+
+    def _touch(self, chat_id: int):
+        self._conn.execute(
+            "UPDATE chats SET last_access = ? WHERE chat_id = ?", (time.time(), chat_id),
+        )
+
+    def _trim(self, chat_id: int):
+        self._conn.execute(
+            "DELETE FROM messages WHERE chat_id = ? AND message_id < ("
+            "SELECT message_id FROM messages WHERE chat_id = ? "
+            "ORDER BY message_id DESC LIMIT 1 OFFSET ?)",
+            (chat_id, chat_id, self.max_messages_per_chat - 1),
+        )
+
+    def _evict(self):
+        self._conn.execute(
+            "DELETE FROM messages WHERE chat_id IN ("
+            "SELECT m.chat_id FROM (SELECT DISTINCT chat_id FROM messages) m "
+            "LEFT JOIN chats c ON c.chat_id = m.chat_id "
+            "ORDER BY COALESCE(c.last_access, 0) DESC LIMIT -1 OFFSET ?)",
+            (self.max_cached_chats,),
+        )
+
+
+async def sync_messages(api, store: MessageStore, chat_id: int) -> bool:
+    """
+    Bring the stored messages of a chat up to date with the server.
+
+    Fetches newest-first until the pages overlap the newest stored message,
+    then drops stored messages in the fetched range that the server no longer
+    has (deletions). If the gap is too large to bridge, the chat's stored
+    history is replaced by what was fetched. Returns False if a request failed.
+    """
+    newest = await store.newest_message_id(chat_id)
+    limit = DELTA_PAGE_SIZE if newest is not None else HISTORY_PAGE_SIZE
+    before_id = None
+    fetched: list[Message] = []
+    reached_start = False
+    overlapped = False
+
+    for _ in range(MAX_SYNC_PAGES):
+        result = await api.get_messages(chat_id, limit=limit, before_id=before_id)
+        if not result.success:
+            return False
+        page = result.data or []
+        fetched.extend(page)
+        if len(page) < limit:
+            reached_start = True
+            break
+        oldest = min(m.message_id for m in page)
+        if newest is None or oldest <= newest:
+            overlapped = True
+            break
+        before_id = oldest
+        limit = HISTORY_PAGE_SIZE
+
+    if newest is not None:
+        if reached_start or overlapped:
+            ids = {m.message_id for m in fetched}
+            low = 0 if reached_start else min(ids)
+            high = max([newest, *ids])
+            store.delete_missing(chat_id, low, high, ids)
+        else:
+            logger.info(f"Chat {chat_id}: stored history too far behind, replacing it")
+            store.drop_messages(chat_id)
+
+    store.put_messages(chat_id, [m.to_dict() for m in fetched])
+    return True
+
+
+async def refresh_message(api, store: MessageStore, chat_id: int, message_id: int) -> bool:
+    """
+    Re-fetch one message into the store, dropping it if the server no longer
+    has it. A sync only re-reads the newest page, so changes to older stored
+    messages have to be written in one by one. Returns False if the request
+    failed.
+    """
+    # Pages end before before_id, so the one-message page before id + 1 holds it
+    result = await api.get_messages(chat_id, limit=1, before_id=message_id + 1)
+    if not result.success:
+        return False
+    found = [m for m in result.data or [] if m.message_id == message_id]
+    if found:
+        store.put_messages(chat_id, [found[0].to_dict()])
+    else:
+        store.delete_message(chat_id, message_id)
+    return True
@@ -0,0 +1,113 @@
+import logging
+import sqlite3
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from src.services.message_store import MessageStore
+
+logger = logging.getLogger("ghosty.outbox")
+
+OP_SEND = "send"
+OP_EDIT = "edit"
+OP_DELETE = "delete"
+
+
+@dataclass(slots=True)
+class OutboundOp:
+    key: str
+    op: str
+    chat_id: Optional[int]
+    args: dict
+    queued_at: float = field(default_factory=time.time)
+    # Newest message id of the chat when a send was made, to tell its copy from earlier ones
+    after_id: Optional[int] = None
+    # The connection dropped while it was on the wire: the server may have applied it
+    in_doubt: bool = False
+
+
+class Outbox:
+    """
+    Message operations waiting to reach the server, in the order they were made.
+
+    Each operation has an idempotency key; queueing a key that is already
+    queued is a no-op, so retrying an operation never sends it twice. While
+    a MessageStore is attached the queue is mirrored to disk and survives a
+    restart.
+
+    The server cannot deduplicate, so an operation lost with the connection
+    while on the wire is marked in doubt. Edits and deletes can simply be
+    repeated; a send must first be looked for on the server (see settle()).
+    """
+
+    def __init__(self):
+        self._ops: dict[str, OutboundOp] = {}
+        self._store: Optional[MessageStore] = None
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ops
+
+    async def attach(self, store: MessageStore):
+        """Persist to a store, taking over operations it kept from an earlier session."""
+        self._store = store
+        try:
+            saved = [OutboundOp(**d) for d in await store.get_outbox()]
+        except (sqlite3.Error, TypeError) as e:
+            logger.warning(f"Loading outbox failed: {e}")
+            return
+        for op in self._ops.values():
+            store.put_outbox(op.key, asdict(op))
+        merged = {op.key: op for op in saved}
+        merged.update(self._ops)
+        self._ops = dict(sorted(merged.items(), key=lambda item: item[1].queued_at))
+
+    def detach(self):
+        self._store = None
+
+    def put(self, op: OutboundOp) -> bool:
+        if op.key in self._ops:
+            return False
+        self._ops[op.key] = op
+        self._persist(lambda store: store.put_outbox(op.key, asdict(op)))
+        return True
+
+    def mark_in_doubt(self, key: str):
+        self._set_in_doubt(key, True)
+
+    def settle(self, key: str):
+        """Clear the in-doubt mark of an operation found not to have reached the server."""
+        self._set_in_doubt(key, False)
+
+    def _set_in_doubt(self, key: str, in_doubt: bool):
+        op = self._ops.get(key)
+        if op is not None and op.in_doubt != in_doubt:
+            op.in_doubt = in_doubt
+            self._persist(lambda store: store.update_outbox(key, asdict(op)))
+
+    def remove(self, key: str):
+        if self._ops.pop(key, None) is not None:
+            self._persist(lambda store: store.delete_outbox(key))
+
+    def has_chat(self, chat_id: Optional[int]) -> bool:
+        return any(op.chat_id == chat_id for op in self._ops.values())
+
+    def by_chat(self) -> dict[Optional[int], list[OutboundOp]]:
+        """Queued operations grouped per chat, each group in queue order."""
+        groups: dict[Optional[int], list[OutboundOp]] = {}
+        for op in self._ops.values():
+            groups.setdefault(op.chat_id, []).append(op)
+        return groups
+
+    def ops(self) -> list[OutboundOp]:
+        return list(self._ops.values())
+
+    def clear(self):
+        self._ops.clear()
+
+    def _persist(self, write):
+        # Queued on the store's thread, which logs a failed write
+        if self._store is not None:
+            write(self._store)
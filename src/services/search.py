@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from src.common.models import ACCOUNTS, Account, AccountMap
+
+logger = logging.getLogger("ghosty.search")
+
+# Wait for a pause in typing before asking the server
+SEARCH_DEBOUNCE = 0.3
+SEARCH_LIMIT = 20
+CACHE_SIZE = 64
+# Server results are reused for this long; accounts registered since show up after it
+CACHE_TTL = 60.0
+
+
+def matches(account: Account, query: str) -> bool:
+    return query in account.username.lower() or query in account.display_name.lower()
+
+
+class UserSearch:
+    """
+    Account search run as the user types a username.
+
+    query() debounces keystrokes and cancels the search it replaces, whether
+    it is still waiting or already on the wire, so results only ever arrive
+    for the latest query. Accounts already known locally are reported at
+    once. Server results are cached per query; a query that extends a cached
+    one whose results were not cut off by the limit is answered by filtering
+    those, without a request.
+    """
+
+    def __init__(
+        self,
+        api,
+        accounts: AccountMap = ACCOUNTS,
+        delay: float = SEARCH_DEBOUNCE,
+        limit: int = SEARCH_LIMIT,
+        cache_size: int = CACHE_SIZE,
+    ):
+        self.api = api
+        self.accounts = accounts
+        self.delay = delay
+        self.limit = limit
+        self.cache_size = cache_size
+        # query -> (fetched at, accounts, complete)
+        self._cache: OrderedDict[str, tuple[float, list[Account], bool]] = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def query(self, text: str, on_results: Callable[[str, list[Account]], None]):
+        """
+        Search for text. on_results(query, accounts) is called with the local
+        matches right away and again once server results are in.
+        """
+        self.cancel()
+        query = text.strip().lower()
+        if not query:
+            on_results(query, [])
+            return
+
+        cached = self._cached(query)
+        if cached is not None:
+            on_results(query, self._merge(self.local(query), cached))
+            return
+        on_results(query, self.local(query))
+        self._task = asyncio.create_task(self._search_later(query, on_results))
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def clear(self):
+        self.cancel()
+        self._cache.clear()
+
+    def local(self, query: str) -> list[Account]:
+        """Known accounts (chat members, message senders) matching a query."""
+        found = [a for a in self.accounts.values() if matches(a, query)]
+        found.sort(key=lambda a: (not a.username.lower().startswith(query), a.username.lower()))
+        return found[:self.limit]
+
+    async def _search_later(self, query: str, on_results: Callable[[str, list[Account]], None]):
+        await asyncio.sleep(self.delay)
+        result = await self.api.search_users(query, limit=self.limit)
+        if not result.success:
+            logger.warning(f"User search failed: {result.error_message}")
+            return
+        raw = [d for d in result.data or [] if isinstance(d, dict)]
+        found = [self.accounts.from_dict(d) for d in raw]
+        self._remember(query, found, complete=len(raw) < self.limit)
+        on_results(query, self._merge(self.local(query), found))
+
+    def _cached(self, query: str) -> Optional[list[Account]]:
+        now = time.monotonic()
+        for end in range(len(query), 0, -1):
+            prefix = query[:end]
+            entry = self._cache.get(prefix)
+            if entry is None:
+                continue
+            fetched_at, found, complete = entry
+            if now - fetched_at > CACHE_TTL:
+                del self._cache[prefix]
+                continue
+            if prefix == query:
+                self._cache.move_to_end(prefix)
+                return found
+            if complete:
+                # Everything matching the longer query was among these
+                return [a for a in found if matches(a, query)]
+        return None
+
+    def _remember(self, query: str, found: list[Account], complete: bool):
+        self._cache[query] = (time.monotonic(), found, complete)
+        self._cache.move_to_end(query)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _merge(first: list[Account], second: list[Account]) -> list[Account]:
+        seen = set()
+        merged = []
+        for account in first + second:
+            if account.account_id not in seen:
+                seen.add(account.account_id)
+                merged.append(account)
+        return merged
@@ -1,5 +1,12 @@
+import asyncio
+import logging
+from typing import Optional
+
 from flet.controls.services.shared_preferences import SharedPreferences
 
+logger = logging.getLogger("ghosty.storage")
+
+KEY_PREFIX = "ghosty_"
 KEY_TOKEN = "ghosty_auth_token"
 KEY_SERVER_HOST = "ghosty_server_host"
 KEY_SERVER_PORT = "ghosty_server_port"
@@ -11,50 +18,155 @@ KEY_USER_ID = "ghosty_user_id"
 DEFAULT_SERVER_HOST = "127.0.0.1"
 DEFAULT_SERVER_PORT = 4207
 
+# Settings the user can flip repeatedly are written at most once per window
+DEBOUNCE_DELAY = 0.5
+# Writes the host rejected are retried, backing off from the first delay up to the max
+FLUSH_RETRY_DELAY = 1.0
+FLUSH_RETRY_MAX_DELAY = 30.0
+
+_REMOVED = object()
+
 
 class StorageService:
+    """
+    Preferences backed by an in-memory snapshot of all ghosty_* keys.
+
+    The snapshot is read once, on first use; reads after that never touch
+    the Flet host. Writes update the snapshot immediately and are flushed in
+    the background, with writes made before a flush runs coalesced into one
+    batch (the last value per key wins). Writes that fail are kept and
+    retried with backoff. The token is the exception: set_token and
+    clear_token wait until it is written, since a lost token means logging
+    in again.
+    """
+
     def __init__(self):
         self._prefs = SharedPreferences()
+        self._values: dict[str, object] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+        self._pending: dict[str, object] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_at = 0.0
+        self._retry_delay = 0.0
+
+    async def load(self):
+        async with self._load_lock:
+            if self._loaded:
+                return
+            keys = await self._prefs.get_keys(KEY_PREFIX) or []
+            values = await asyncio.gather(*(self._prefs.get(key) for key in keys))
+            for key, value in zip(keys, values):
+                # A write made while loading is newer than what was read
+                if key not in self._pending:
+                    self._values[key] = value
+            self._loaded = True
+
+    async def flush(self) -> bool:
+        """Write the pending changes now; returns False if any failed and were kept for a retry."""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return True
+            results = await asyncio.gather(
+                *(
+                    self._prefs.remove(key) if value is _REMOVED else self._prefs.set(key, value)
+                    for key, value in pending.items()
+                ),
+                return_exceptions=True,
+            )
+            # set/remove report a write the host refused as False rather than raising
+            failed = [key for key, r in zip(pending, results) if r is False or isinstance(r, Exception)]
+            if not failed:
+                self._retry_delay = 0.0
+                return True
+            for key in failed:
+                # A newer write made during the flush wins over the failed one
+                self._pending.setdefault(key, pending[key])
+            self._retry_delay = min(max(self._retry_delay * 2, FLUSH_RETRY_DELAY), FLUSH_RETRY_MAX_DELAY)
+            logger.warning(f"Saving preferences failed: {', '.join(failed)}, retrying in {self._retry_delay:g}s")
+            self._schedule_flush(self._retry_delay)
+            return False
+
+    async def _get(self, key: str):
+        if not self._loaded:
+            await self.load()
+        return self._values.get(key)
+
+    def _set(self, key: str, value, delay: float = 0):
+        if value is _REMOVED:
+            self._values.pop(key, None)
+        else:
+            self._values[key] = value
+        self._pending[key] = value
+        self._schedule_flush(delay)
+
+    def _schedule_flush(self, delay: float):
+        loop = asyncio.get_running_loop()
+        flush_at = loop.time() + delay
+        if self._flush_task is not None:
+            if flush_at >= self._flush_at:
+                return
+            # Only a task that is still waiting is cancelled, see _flush_later
+            self._flush_task.cancel()
+        self._flush_at = flush_at
+        self._flush_task = asyncio.create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self.flush()
 
     async def get_token(self) -> str | None:
-        return await self._prefs.get(KEY_TOKEN)
+        return await self._get(KEY_TOKEN)
 
-    async def set_token(self, token: str):
-        await self._prefs.set(KEY_TOKEN, token)
+    async def set_token(self, token: str) -> bool:
+        self._set(KEY_TOKEN, token)
+        return await self.flush()
 
-    async def clear_token(self):
-        await self._prefs.remove(KEY_TOKEN)
+    async def clear_token(self) -> bool:
+        self._set(KEY_TOKEN, _REMOVED)
+        return await self.flush()
 
     async def get_server_address(self) -> tuple[str, int]:
-        host = await self._prefs.get(KEY_SERVER_HOST)
-        port = await self._prefs.get(KEY_SERVER_PORT)
+        host = await self._get(KEY_SERVER_HOST)
+        port = await self._get(KEY_SERVER_PORT)
         return (
             host or DEFAULT_SERVER_HOST,
             int(port) if port else DEFAULT_SERVER_PORT,
         )
 
     async def set_server_address(self, host: str, port: int):
-        await self._prefs.set(KEY_SERVER_HOST, host)
-        await self._prefs.set(KEY_SERVER_PORT, str(port))
+        self._set(KEY_SERVER_HOST, host)
+        self._set(KEY_SERVER_PORT, str(port))
 
     async def get_theme_mode(self) -> str:
-        mode = await self._prefs.get(KEY_THEME_MODE)
+        mode = await self._get(KEY_THEME_MODE)
         return mode or "light"
 
     async def set_theme_mode(self, mode: str):
-        await self._prefs.set(KEY_THEME_MODE, mode)
+        self._set(KEY_THEME_MODE, mode, DEBOUNCE_DELAY)
 
     async def save_user_info(self, username: str, display_name: str, user_id: int):
-        await self._prefs.set(KEY_USERNAME, username)
-        await self._prefs.set(KEY_DISPLAY_NAME, display_name)
-        await self._prefs.set(KEY_USER_ID, str(user_id))
+        self._set(KEY_USERNAME, username)
+        self._set(KEY_DISPLAY_NAME, display_name, DEBOUNCE_DELAY)
+        self._set(KEY_USER_ID, str(user_id))
 
     async def get_user_info(self) -> dict:
         return {
-            "username": await self._prefs.get(KEY_USERNAME),
-            "display_name": await self._prefs.get(KEY_DISPLAY_NAME),
-            "user_id": await self._prefs.get(KEY_USER_ID),
+            "username": await self._get(KEY_USERNAME),
+            "display_name": await self._get(KEY_DISPLAY_NAME),
+            "user_id": await self._get(KEY_USER_ID),
         }
 
     async def clear_all(self):
-        await self._prefs.clear()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        async with self._flush_lock:
+            self._retry_delay = 0.0
+            self._pending.clear()
+            self._values.clear()
+            await self._prefs.clear()